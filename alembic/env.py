@@ -38,6 +38,20 @@ target_metadata = SQLModel.metadata
 # ... etc.
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    """
+    autogenerate 時略過全文搜尋索引
+    
+    tasks_fts（SQLite 的 FTS5 虛擬表與其 tasks_fts_data 等影子表、PostgreSQL 的 tsvector 表與 GIN 索引）
+    由 app/core/models/search.py 以 DDL 建立，不在 metadata 中，否則會被產生為 drop_table。
+    """
+    if type_ == 'table' and name.startswith('tasks_fts'):
+        return False
+    if type_ == 'index' and name == 'ix_tasks_fts_document':
+        return False
+    return True
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -54,6 +68,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -77,7 +92,7 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata, include_object=include_object
         )
 
         with context.begin_transaction():
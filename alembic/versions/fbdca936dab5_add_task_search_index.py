@@ -0,0 +1,49 @@
+"""Add task search index
+
+Revision ID: fbdca936dab5
+Revises: abe033c6b17d
+Create Date: 2026-10-18 21:06:52.318540
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# 與 app/core/models/search.py 的 CJK 相同（PostgreSQL 的 regex 語法）；
+# 在每個中日韓文字前後加上空白，使每個字成為一個詞
+CJK_SEGMENT = r"regexp_replace({}, '[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af]', ' \& ', 'g')"
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'fbdca936dab5'
+down_revision: Union[str, None] = 'abe033c6b17d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 全文索引不是 SQLModel 的資料表，依資料庫建立（同 app/core/models/search.py）
+    if context.get_context().dialect.name == 'postgresql':
+        op.execute('CREATE TABLE tasks_fts (task_id INTEGER PRIMARY KEY REFERENCES tasks (id) ON DELETE CASCADE, document TSVECTOR NOT NULL)')
+        op.execute('CREATE INDEX ix_tasks_fts_document ON tasks_fts USING GIN (document)')
+        # 以既有的任務建立索引，斷詞規則同 TASK_SEARCH_TOKENIZER=cjk（預設）
+        op.execute(
+            'INSERT INTO tasks_fts (task_id, document) '
+            f"SELECT id, setweight(to_tsvector('simple', {CJK_SEGMENT.format('title')}), 'A') "
+            f"|| setweight(to_tsvector('simple', {CJK_SEGMENT.format('content')}), 'B') FROM tasks"
+        )
+    else:
+        op.execute("CREATE VIRTUAL TABLE tasks_fts USING fts5(title, content, tokenize = 'unicode61 remove_diacritics 2')")
+        op.execute('CREATE TRIGGER tasks_fts_delete AFTER DELETE ON tasks BEGIN DELETE FROM tasks_fts WHERE rowid = old.id; END')
+        # SQLite 沒有 regexp_replace，以未斷詞的文字建立索引（同 TASK_SEARCH_TOKENIZER=word）；
+        # 使用 cjk 時，升級後執行 rebuild_task_search.py 重新斷詞
+        op.execute('INSERT INTO tasks_fts (rowid, title, content) SELECT id, title, content FROM tasks')
+
+
+def downgrade() -> None:
+    if context.get_context().dialect.name != 'postgresql':
+        op.execute('DROP TRIGGER IF EXISTS tasks_fts_delete')
+    op.execute('DROP TABLE tasks_fts')
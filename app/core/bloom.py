@@ -0,0 +1,38 @@
+from hashlib import blake2b
+from threading import Lock
+import math
+
+
+class BloomFilter:
+    """
+    固定大小的 Bloom filter
+
+    查詢為 O(k)，不會有偽陰性；偽陽性機率約為 error_rate（元素數不超過 capacity 時）。
+    以 blake2b 產生兩個 64 位元雜湊，再用雙重雜湊推導出 k 個位置。
+    """
+    
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(capacity, 1)
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hash_count = max(int(round(self.size / capacity * math.log(2))), 1)
+        self.count = 0
+        
+        self._bits = bytearray((self.size + 7) // 8)
+        self._lock = Lock()
+    
+    def _positions(self, item: str):
+        digest = blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+    
+    def add(self, item: str) -> None:
+        positions = self._positions(item)
+        with self._lock:
+            for position in positions:
+                self._bits[position >> 3] |= 1 << (position & 7)
+            self.count += 1
+    
+    def __contains__(self, item: str) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
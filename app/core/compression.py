@@ -0,0 +1,199 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+import asyncio
+import zlib
+
+from fastapi import Request
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+# 可壓縮的回應類型；圖片等已壓縮的格式不再壓縮
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript', 'application/xml', 'image/svg+xml')
+# 分段壓縮時每次送出的未壓縮資料量
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_SCOPE_KEY = 'compression'
+
+
+def skip_compression(request: Request) -> None:
+    """
+    路由層級的 FastAPI 依賴，停用該路由的回應壓縮
+        
+        @router.get('/...', dependencies=[Depends(skip_compression)])
+    """
+    request.scope[_SCOPE_KEY] = False
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """依 Accept-Encoding（含 q 值）判斷用戶端是否接受 gzip"""
+    if not accept_encoding:
+        return False
+    
+    qualities = {}
+    for item in accept_encoding.split(','):
+        coding, _, params = item.strip().partition(';')
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qualities[coding.strip().lower()] = q
+    
+    q = qualities.get('gzip', qualities.get('x-gzip', qualities.get('*', 0.0)))
+    return q > 0
+
+
+def _is_compressible(headers: Headers) -> bool:
+    content_type = headers.get('content-type', '')
+    return 'content-encoding' not in headers and (
+        content_type.startswith(COMPRESSIBLE_TYPES) or '+json' in content_type
+    )
+
+
+def _vary(headers: MutableHeaders) -> None:
+    vary = headers.get('vary')
+    if not vary:
+        headers['Vary'] = 'Accept-Encoding'
+    elif 'accept-encoding' not in vary.lower():
+        headers['Vary'] = f'{vary}, Accept-Encoding'
+
+
+class CompressionMiddleware:
+    """
+    依 Accept-Encoding 協商的 gzip 回應壓縮
+    
+    - 小於 minimum_size 的回應不壓縮（壓縮的 CPU 成本大於節省的傳輸量）
+    - 一次送出的回應超過 stream_threshold 時，分段壓縮並以 chunked 傳送，
+      不需等整個回應壓縮完成才送出第一個位元組；StreamingResponse 則逐段壓縮
+    - 已有 Content-Encoding 或非文字類型的回應不壓縮，路由可以 skip_compression 停用
+    - 一次壓縮的資料達 thread_threshold 時在專用的執行緒池（workers 條執行緒）中壓縮，不阻塞事件迴圈，
+      也不佔用同步路由使用的 AnyIO 執行緒池；較小的資料直接壓縮，省去切換執行緒的成本
+    - 壓縮後的回應是不同的表示形式，強 ETag 改為弱 ETag；If-None-Match / If-Match 的比對忽略 W/
+    """
+    
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        level: int = 6,
+        stream_threshold: int = 256 * 1024,
+        thread_threshold: int = 16 * 1024,
+        workers: int = 2
+        ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+        self.stream_threshold = stream_threshold
+        self.thread_threshold = thread_threshold
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='gzip')
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http' or not accepts_gzip(Headers(scope=scope).get('accept-encoding')):
+            await self.app(scope, receive, send)
+            return
+        
+        await _GzipResponder(self, scope, send).run(receive)
+
+
+class _GzipResponder:
+    """處理單一回應：保留 http.response.start，看到第一段 body 後再決定是否壓縮"""
+    
+    def __init__(self, middleware: CompressionMiddleware, scope: Scope, send: Send):
+        self.middleware = middleware
+        self.scope = scope
+        self.send = send
+        
+        self.start: Optional[Message] = None
+        self.compressor = None
+        self.passthrough = False
+    
+    async def run(self, receive: Receive) -> None:
+        await self.middleware.app(self.scope, receive, self.send_wrapper)
+    
+    def _compressor(self):
+        # wbits = 16 + MAX_WBITS 輸出 gzip 格式
+        return zlib.compressobj(self.middleware.level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    
+    def _compress_sync(self, data, flush: bool) -> bytes:
+        compressed = self.compressor.compress(data)
+        return compressed + self.compressor.flush() if flush else compressed
+    
+    async def _compress(self, data, flush: bool = False) -> bytes:
+        # 同一個 compressor 的呼叫依序 await，不會在多個執行緒中同時使用
+        if len(data) >= self.middleware.thread_threshold:
+            return await asyncio.get_running_loop().run_in_executor(
+                self.middleware.executor, self._compress_sync, data, flush
+            )
+        return self._compress_sync(data, flush)
+    
+    def _start_compressed(self, start: Message, content_length: Optional[int]) -> Message:
+        headers = MutableHeaders(raw=start['headers'])
+        headers['Content-Encoding'] = 'gzip'
+        _vary(headers)
+        etag = headers.get('etag')
+        if etag and not etag.startswith('W/'):
+            headers['ETag'] = f'W/{etag}'
+        if content_length is None:
+            del headers['Content-Length']
+        else:
+            headers['Content-Length'] = str(content_length)
+        return start
+    
+    async def send_wrapper(self, message: Message) -> None:
+        if message['type'] == 'http.response.start':
+            headers = Headers(raw=message['headers'])
+            self.passthrough = (
+                self.scope.get(_SCOPE_KEY) is False
+                or message['status'] < 200
+                or message['status'] in (204, 304)
+                or not _is_compressible(headers)
+            )
+            if self.passthrough:
+                await self.send(message)
+            else:
+                # 等第一段 body 決定是否壓縮後再送出
+                self.start = message
+            return
+        
+        if self.passthrough or message['type'] != 'http.response.body':
+            await self.send(message)
+            return
+        
+        body = message.get('body', b'')
+        more_body = message.get('more_body', False)
+        
+        if self.start is not None:
+            start, self.start = self.start, None
+            if not more_body and len(body) < self.middleware.minimum_size:
+                # 太小不壓縮，但回應仍會依 Accept-Encoding 而不同
+                _vary(MutableHeaders(raw=start['headers']))
+                self.passthrough = True
+                await self.send(start)
+                await self.send(message)
+                return
+            
+            self.compressor = self._compressor()
+            if not more_body and len(body) < self.middleware.stream_threshold:
+                compressed = await self._compress(body, flush=True)
+                await self.send(self._start_compressed(start, len(compressed)))
+                await self.send({'type': 'http.response.body', 'body': compressed})
+                return
+            
+            await self.send(self._start_compressed(start, None))
+        
+        await self._send_chunks(body, more_body)
+    
+    async def _send_chunks(self, body: bytes, more_body: bool) -> None:
+        view = memoryview(body)
+        for offset in range(0, len(view), STREAM_CHUNK_SIZE):
+            chunk = await self._compress(view[offset:offset + STREAM_CHUNK_SIZE])
+            if chunk:
+                await self.send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        
+        tail = b'' if more_body else self.compressor.flush()
+        if tail or not more_body:
+            await self.send({'type': 'http.response.body', 'body': tail, 'more_body': more_body})
@@ -1,5 +1,5 @@
 
-from typing import List, Union
+from typing import List, Literal, Optional, Union
 
 from pydantic import AnyHttpUrl, model_validator, ConfigDict
 from pydantic_settings import BaseSettings
@@ -10,10 +10,86 @@ class Settings(BaseSettings):
     BACKEND_CORS_ORIGINS: List[AnyHttpUrl] = []
     
     DATABASE_URL: str
+    # 非同步路由使用的連線字串，未設定時由 DATABASE_URL 推導（aiosqlite / asyncpg）
+    ASYNC_DATABASE_URL: Optional[str] = None
+    # 唯讀副本（JSON 陣列），GET 請求的查詢會分散到這些資料庫
+    DATABASE_REPLICA_URLS: List[str] = []
+    
+    # 連線池：pool_recycle 為 -1 表示不回收；pre_ping 會在取出連線時先檢查是否存活
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = -1
+    DB_POOL_PRE_PING: bool = False
+    
+    # SQLite 效能設定：WAL、讀寫分離的 engine（僅對檔案型 SQLite 生效）；
+    # 同步與非同步的寫入端各限一條連線，兩者之間的寫入由 SQLITE_BUSY_TIMEOUT_MS 等待
+    SQLITE_PERFORMANCE_PROFILE: bool = False
+    SQLITE_MMAP_SIZE: int = 268435456
+    SQLITE_CACHE_SIZE: int = -64000
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
     
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: float
+    REFRESH_TOKEN_EXPIRE_DAYS: float = 14
+    
+    # 已撤銷 access token 的 Bloom filter：容量、誤判率與從資料庫重建的間隔
+    REVOCATION_FILTER_CAPACITY: int = 100000
+    REVOCATION_FILTER_ERROR_RATE: float = 0.001
+    REVOCATION_FILTER_REFRESH_SECONDS: float = 60
+    
+    # 分頁總數：exact 每次 COUNT(*)、none 不計算（只回傳 has_next）、cached 依用戶快取並於寫入時失效
+    PAGINATION_COUNT_MODE: Literal['exact', 'none', 'cached'] = 'exact'
+    PAGINATION_COUNT_CACHE_MAXSIZE: int = 10000
+    PAGINATION_COUNT_CACHE_TTL_SECONDS: float = 300
+    
+    # 公開標籤的行程內快取；其他 worker 的修改最多延遲這麼久才會看到
+    PUBLIC_TAG_CACHE_TTL_SECONDS: float = 300
+    
+    # 批次建立任務：單次請求的任務數上限，以及每批 INSERT 的任務數
+    TASK_BULK_MAX_ITEMS: int = 500
+    TASK_BULK_BATCH_SIZE: int = 100
+    # 批次更新 / 刪除：單次呼叫最多更新或刪除的資料筆數
+    BULK_UPDATE_MAX_ROWS: int = 1000
+    BULK_DELETE_MAX_ROWS: int = 1000
+    # 任務行事曆：單次查詢的最大天數
+    TASK_CALENDAR_MAX_DAYS: int = 366
+    # 任務全文搜尋的斷詞：cjk 將中日韓文字逐字切分並以片語比對，word 只依空白與標點切分；
+    # 變更後需執行 rebuild_task_search.py 重建索引
+    TASK_SEARCH_TOKENIZER: Literal['cjk', 'word'] = 'cjk'
+    
+    # 回應壓縮（gzip）：小於 MINIMUM_SIZE 位元組不壓縮，超過 STREAM_THRESHOLD 時分段壓縮傳送，
+    # 一次壓縮達 THREAD_THRESHOLD 位元組時在專用的執行緒池中進行，WORKERS 為執行緒數；
+    # 預設開啟，但只有帶 Accept-Encoding: gzip 的用戶端會收到壓縮的回應，其他用戶端的回應不變
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_LEVEL: int = 6
+    COMPRESSION_STREAM_THRESHOLD: int = 262144
+    COMPRESSION_THREAD_THRESHOLD: int = 16384
+    COMPRESSION_WORKERS: int = 2
+    # 以 pydantic-core 直接將回應模型序列化為 JSON（FastJSONRoute），需明確開啟；False 時沿用 FastAPI 的序列化
+    FAST_JSON_RESPONSES: bool = False
+    
+    # 已驗證身分（token / principal）的行程內快取；用戶異動只會使本行程的快取失效，
+    # 其他 worker 最多延遲 TTL 秒才會看到角色變更或用戶刪除
+    AUTH_CACHE_MAXSIZE: int = 10000
+    AUTH_CACHE_TTL_SECONDS: float = 60
+    
+    # 密碼雜湊執行緒池：同時執行數與可排隊數
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_QUEUE: int = 32
+    
+    # 登入限流：視窗內允許的嘗試次數與逐次倍增的封鎖時間
+    # 來源 IP 取自直接連線的對象；部署在反向代理或負載平衡器之後時，需在 TRUSTED_PROXIES（JSON 陣列，IP 或 CIDR）
+    # 列出這些代理，改由 X-Forwarded-For 取得用戶端 IP，否則所有用戶共用代理的 IP，IP 限流會變成全域的登入限制
+    TRUSTED_PROXIES: List[str] = []
+    LOGIN_THROTTLE_ENABLED: bool = True
+    LOGIN_THROTTLE_USERNAME_LIMIT: int = 5
+    LOGIN_THROTTLE_IP_LIMIT: int = 20
+    LOGIN_THROTTLE_WINDOW_SECONDS: float = 60
+    LOGIN_THROTTLE_BACKOFF_BASE_SECONDS: float = 30
+    LOGIN_THROTTLE_BACKOFF_MAX_SECONDS: float = 900
     
     MEDIA_PATH : str
     HEADSHOT_PATH : str
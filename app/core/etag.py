@@ -0,0 +1,88 @@
+from typing import Optional
+import hashlib
+
+from fastapi import HTTPException, Request, Response, status
+
+
+def make_etag(*parts) -> str:
+    """由組成內容的版本號與參數產生強 ETag"""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def entity_etag(version: int, *variant) -> str:
+    """
+    單一資源的 ETag：前段為資料列的版本號，後段為回應形式（fields / include 等）的雜湊
+    
+    同一版本的不同形式有不同的 ETag；If-Match 只比對版本號，任何形式取得的 ETag 都可用於更新。
+    """
+    return f'"{version}-{make_etag(*variant)[1:-1]}"'
+
+
+def _parse(header: Optional[str]) -> list[str]:
+    if not header:
+        return []
+    # 弱比較：忽略 W/ 前綴
+    return [tag.strip().removeprefix('W/') for tag in header.split(',') if tag.strip()]
+
+
+class Conditional:
+    """
+    條件式請求（If-None-Match / If-Match）的 FastAPI 依賴
+    
+    服務在查詢完整內容之前先以版本號算出 ETag 並呼叫 not_modified，
+    內容未變更時直接回傳 304，不執行列表或關聯的查詢。
+    """
+    
+    class Exceptions:
+        @staticmethod
+        def not_modified(etag: str) -> HTTPException:
+            return HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        
+        PRECONDITION_FAILED = HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail='Resource has been modified'
+        )
+    
+    def __init__(self, request: Request, response: Response):
+        self.if_none_match = _parse(request.headers.get('If-None-Match'))
+        self.if_match = _parse(request.headers.get('If-Match'))
+        self.response = response
+    
+    @property
+    def has_if_none_match(self) -> bool:
+        return bool(self.if_none_match)
+    
+    def set_etag(self, etag: str) -> None:
+        self.response.headers['ETag'] = etag
+    
+    def not_modified(self, etag: str) -> None:
+        """設定回應的 ETag；與 If-None-Match 相符時拋出 304"""
+        self.set_etag(etag)
+        if '*' in self.if_none_match or etag in self.if_none_match:
+            raise self.Exceptions.not_modified(etag)
+    
+    @property
+    def expected_versions(self) -> Optional[set[int]]:
+        """If-Match 中的版本號，沒有 If-Match（或為 *）時回傳 None，表示不限制版本"""
+        if not self.if_match or '*' in self.if_match:
+            return None
+        
+        versions = set()
+        for tag in self.if_match:
+            version, _, _ = tag.strip('"').partition('-')
+            if version.isdigit():
+                versions.add(int(version))
+        return versions
+    
+    def require_version(self, version: int) -> None:
+        """
+        有 If-Match 時，其中需有目前版本的 ETag，否則拋出 412
+        
+        RFC 9110 規定 If-Match 使用強比較，這裡則忽略 W/：CompressionMiddleware 壓縮回應時會將強 ETag 改為弱 ETag，
+        用戶端從壓縮的回應取得的 ETag 在強比較下永遠不符。只比對 ETag 中的版本號，
+        而版本號在資料列的每次修改都會遞增，與回應的編碼無關，弱 ETag 同樣足以判斷資料列是否已被修改。
+        """
+        versions = self.expected_versions
+        if versions is not None and version not in versions:
+            raise self.Exceptions.PRECONDITION_FAILED
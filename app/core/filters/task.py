@@ -1,9 +1,88 @@
 # from sqlmodel import SQLModel, Field
 
+from datetime import datetime
 from enum import Enum
+from typing import Optional
+
+from fastapi import HTTPException, Query, status
+
+from app.core.models import Difficulty, Priority
 
 
 class TaskRangeParams(Enum):
     today = 'today'
     week = 'week'
-    month = 'month'
\ No newline at end of file
+    month = 'month'
+
+
+class TagMatch(Enum):
+    any = 'any'
+    all = 'all'
+
+
+# 排序鍵；priority 依重要程度（HIGH 在前），加上 - 前綴為反向
+TASK_SORT_KEYS = ('priority', 'deadline', 'create_at')
+# 單次查詢最多可篩選的標籤數
+TASK_FILTER_MAX_TAGS = 20
+
+
+class Exceptions:
+    @staticmethod
+    def invalid_sort(keys: list[str]) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f'Invalid sort: {", ".join(keys)} (allowed: {", ".join(TASK_SORT_KEYS)}, prefixed with - for descending)'
+        )
+
+
+def parse_sort(value: Optional[str]) -> Optional[tuple[tuple[str, bool], ...]]:
+    """將「priority,-deadline」解析為 ((鍵, 是否反向), ...)；鍵不可重複"""
+    if value is None:
+        return None
+    
+    items = [item.strip() for item in value.split(',') if item.strip()]
+    sort = tuple((item.removeprefix('-'), item.startswith('-')) for item in items)
+    keys = [key for key, _ in sort]
+    invalid = [item for item, key in zip(items, keys) if key not in TASK_SORT_KEYS]
+    if invalid or not sort or len(set(keys)) != len(keys):
+        raise Exceptions.invalid_sort(invalid or items)
+    return sort
+
+
+def task_filters(
+    tag_ids: Optional[list[int]] = Query(default=None, max_length=TASK_FILTER_MAX_TAGS, description='標籤 id，可重複指定'),
+    tag_match: TagMatch = Query(default=TagMatch.any, description='any：有任一標籤；all：有全部標籤'),
+    priority: Optional[list[Priority]] = Query(default=None, description='優先度，可重複指定'),
+    difficulty: Optional[list[Difficulty]] = Query(default=None, description='難度，可重複指定'),
+    deadline_from: Optional[datetime] = Query(default=None, description='deadline 不早於（含）'),
+    deadline_to: Optional[datetime] = Query(default=None, description='deadline 不晚於（含）'),
+    created_from: Optional[datetime] = Query(default=None, description='建立時間不早於（含）'),
+    created_to: Optional[datetime] = Query(default=None, description='建立時間不晚於（含）'),
+    no_deadline: Optional[bool] = Query(default=None, description='true：只列出沒有 deadline 的任務；false：只列出有 deadline 的任務'),
+    ) -> dict:
+    """
+    任務列表篩選參數的 FastAPI 依賴
+    
+    回傳的 dict 併入列表的 query；多值參數轉為 tuple，可作為 ETag 與總數快取的鍵。
+    """
+    return {
+        'tag_ids': tuple(dict.fromkeys(tag_ids)) if tag_ids else None,
+        'tag_match': tag_match,
+        'priority': tuple(priority) if priority else None,
+        'difficulty': tuple(difficulty) if difficulty else None,
+        'deadline_from': deadline_from,
+        'deadline_to': deadline_to,
+        'created_from': created_from,
+        'created_to': created_to,
+        'no_deadline': no_deadline
+    }
+
+
+def task_sort(
+    sort: Optional[str] = Query(
+        default=None,
+        description=f'以逗號分隔的排序鍵（{", ".join(TASK_SORT_KEYS)}），加上 - 為反向；未指定時依 deadline 排序'
+    ),
+    ) -> dict:
+    """任務列表排序參數的 FastAPI 依賴（游標分頁固定依 deadline 排序，不使用）"""
+    return {'sort': parse_sort(sort)}
\ No newline at end of file
@@ -0,0 +1,112 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import BoundedSemaphore, Lock
+from typing import Callable
+import asyncio
+import time
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from app.core.config import settings
+
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+class PasswordHasher:
+    """
+    密碼雜湊專用的執行緒池
+    
+    bcrypt 在雜湊期間會釋放 GIL，因此獨立的執行緒池即可與其他請求並行，
+    不需要額外的行程池。同時執行數受 max_workers 限制，排隊數超過
+    max_queue 時直接回傳 503，避免大量登入佔滿 AnyIO 的共用執行緒池。
+    """
+    
+    class Exceptions:
+        BUSY = HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail='伺服器忙碌中，請稍後再試',
+            headers={'Retry-After': '1'}
+        )
+    
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='password-hasher')
+        self._slots = BoundedSemaphore(max_workers + max_queue)
+        self._lock = Lock()
+        self._reset_metrics()
+    
+    def _reset_metrics(self):
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.rejected = 0
+        self.completed = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.run_seconds_total = 0.0
+        self.run_seconds_max = 0.0
+    
+    def _submit(self, fn: Callable, *args) -> Future:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise self.Exceptions.BUSY
+        
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        
+        enqueued_at = time.perf_counter()
+        
+        def run():
+            started_at = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                self._record(started_at - enqueued_at, time.perf_counter() - started_at)
+        
+        return self._executor.submit(run)
+    
+    def _record(self, wait: float, run: float):
+        with self._lock:
+            self.in_flight -= 1
+            self.completed += 1
+            self.wait_seconds_total += wait
+            self.wait_seconds_max = max(self.wait_seconds_max, wait)
+            self.run_seconds_total += run
+            self.run_seconds_max = max(self.run_seconds_max, run)
+        self._slots.release()
+    
+    def hash(self, password: str) -> str:
+        return self._submit(pwd_context.hash, password).result()
+    
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return self._submit(pwd_context.verify, plain_password, hashed_password).result()
+    
+    async def hash_async(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit(pwd_context.hash, password))
+    
+    async def verify_async(self, plain_password: str, hashed_password: str) -> bool:
+        return await asyncio.wrap_future(self._submit(pwd_context.verify, plain_password, hashed_password))
+    
+    def stats(self) -> dict:
+        with self._lock:
+            completed = self.completed
+            return {
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'in_flight': self.in_flight,
+                'queued': max(self.in_flight - self.max_workers, 0),
+                'peak_in_flight': self.peak_in_flight,
+                'rejected': self.rejected,
+                'completed': completed,
+                'avg_wait_ms': self.wait_seconds_total / completed * 1000 if completed else 0.0,
+                'max_wait_ms': self.wait_seconds_max * 1000,
+                'avg_run_ms': self.run_seconds_total / completed * 1000 if completed else 0.0,
+                'max_run_ms': self.run_seconds_max * 1000
+            }
+
+
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_QUEUE)
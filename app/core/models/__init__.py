@@ -1,15 +1,26 @@
 from typing import Annotated
 from sqlalchemy.orm import Session
-from fastapi import Depends
+from fastapi import Depends, Request
 
-from .database import SessionLocal
+from .database import SessionLocal, ReaderSessionLocal, AsyncSessionLocal
 from .task import *
 from .user import *
 from .tag import *
+from .auth import *
+from .stats import *
+from .versioning import touch_collections, touch_tagged_tasks
+from .search import index_tasks, match_tasks, reindex_tasks
 
-def get_db():
-    db = SessionLocal()
+# 唯讀的請求方法改用讀取端連線（replica 或 SQLite profile 下 query_only 的連線池）
+READ_METHODS = ('GET', 'HEAD')
+
+def get_db(request: Request):
+    db = ReaderSessionLocal() if request.method in READ_METHODS else SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
\ No newline at end of file
@@ -0,0 +1,31 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import datetime
+
+
+class RefreshToken(SQLModel, table=True):
+    """
+    換發用的 refresh token，只保存雜湊值
+
+    每次換發都會撤銷舊 token 並在同一個 family 下發出新 token；
+    已撤銷的 token 被重複使用時，整個 family 都會被撤銷。
+    """
+    __tablename__ = 'refresh_tokens'
+    
+    id: int = Field(primary_key=True, index=True)
+    user_id: int = Field(foreign_key='users.id', ondelete='CASCADE', index=True)
+    
+    token_hash: str = Field(nullable=False, unique=True, index=True)
+    family_id: str = Field(nullable=False, index=True)
+    
+    create_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
+    expires_at: datetime = Field(nullable=False)
+    revoked_at: Optional[datetime] = Field(nullable=True, default=None)
+
+
+class RevokedToken(SQLModel, table=True):
+    """已撤銷、但尚未過期的 access token（以 jti 識別）"""
+    __tablename__ = 'revoked_tokens'
+    
+    jti: str = Field(primary_key=True)
+    expires_at: datetime = Field(nullable=False, index=True)
\ No newline at end of file
@@ -1,15 +1,201 @@
 from sqlmodel import create_engine
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 from app.core.config import settings
+from .pool_metrics import InstrumentedQueuePool, InstrumentedAsyncQueuePool, instrument_engine
+from .routing import RoutingSession
 
 
 DATABASE_URL = settings.DATABASE_URL
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
-)
+# 非同步驅動：未指定 ASYNC_DATABASE_URL 時，由 DATABASE_URL 推導
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+}
+
+
+def to_async_url(url: str) -> str:
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername)).render_as_string(hide_password=False)
+
+
+def pool_options(url: str, poolclass) -> dict:
+    """連線池設定；SQLite 記憶體資料庫使用單一連線，不套用"""
+    url = make_url(url)
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        return {}
+    
+    return {
+        'poolclass': poolclass,
+        'pool_size': settings.DB_POOL_SIZE,
+        'max_overflow': settings.DB_MAX_OVERFLOW,
+        'pool_timeout': settings.DB_POOL_TIMEOUT,
+        'pool_recycle': settings.DB_POOL_RECYCLE,
+        'pool_pre_ping': settings.DB_POOL_PRE_PING,
+    }
+
+
+def enable_sqlite_foreign_keys(engine: Engine) -> None:
+    """
+    SQLite 預設不檢查外鍵，每條新連線都需開啟
+    
+    批次刪除依賴外鍵的 ON DELETE CASCADE 清除關聯資料，而不是由 ORM 逐筆載入刪除。
+    """
+    @event.listens_for(engine, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute('PRAGMA foreign_keys=ON')
+        finally:
+            cursor.close()
+
+
+def is_sqlite_file(url: str) -> bool:
+    url = make_url(url)
+    return url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:')
+
+
+def sqlite_pragmas(query_only: bool = False) -> list[str]:
+    """SQLITE_PERFORMANCE_PROFILE 啟用時，每條新連線執行的 PRAGMA"""
+    pragmas = [
+        'PRAGMA journal_mode=WAL',
+        'PRAGMA synchronous=NORMAL',
+        f'PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}',
+        f'PRAGMA cache_size={settings.SQLITE_CACHE_SIZE}',
+        f'PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}',
+        'PRAGMA temp_store=MEMORY',
+    ]
+    if query_only:
+        pragmas.append('PRAGMA query_only=ON')
+    return pragmas
+
+
+def apply_sqlite_pragmas(engine: Engine, query_only: bool = False) -> None:
+    pragmas = sqlite_pragmas(query_only)
+    
+    @event.listens_for(engine, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+def create_sqlite_engines(url: str, profile: bool) -> tuple[Engine, Engine]:
+    """
+    建立 SQLite 的 (寫入, 讀取) engine
+    
+    未啟用 profile 時兩者為同一個 engine，維持原本的行為；
+    啟用時寫入端只保留一條連線（SQLite 同時只允許一個寫入者，排隊在連線池比搶鎖便宜），
+    讀取端則是 query_only 的連線池，在 WAL 模式下不會被寫入阻塞。
+    """
+    connect_args = {"check_same_thread": False}
+    if not profile:
+        engine = create_engine(
+            url,
+            connect_args=connect_args,
+            pool_logging_name='primary',
+            **pool_options(url, InstrumentedQueuePool)
+        )
+        return engine, engine
+    
+    writer = create_engine(
+        url,
+        connect_args=connect_args,
+        pool_logging_name='primary',
+        **{**pool_options(url, InstrumentedQueuePool), 'pool_size': 1, 'max_overflow': 0}
+    )
+    apply_sqlite_pragmas(writer)
+    
+    reader = create_engine(
+        url,
+        connect_args=connect_args,
+        pool_logging_name='reader',
+        **pool_options(url, InstrumentedQueuePool)
+    )
+    apply_sqlite_pragmas(reader, query_only=True)
+    return writer, reader
+
+
+def async_pool_options(url: str, profile: bool) -> dict:
+    """
+    非同步 engine 的連線池設定
+    
+    非同步 engine 連到 primary，同樣是寫入端；啟用 SQLite profile 時也只保留一條連線。
+    同步與非同步的寫入端各有一條連線，兩者之間的寫入由 busy_timeout 等待，不會立即回傳 database is locked。
+    """
+    options = pool_options(url, InstrumentedAsyncQueuePool)
+    if profile and is_sqlite_file(url):
+        options.update(pool_size=1, max_overflow=0)
+    return options
+
+
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or to_async_url(DATABASE_URL)
+SQLITE_PROFILE = settings.SQLITE_PERFORMANCE_PROFILE and is_sqlite_file(DATABASE_URL)
+
+if is_sqlite_file(DATABASE_URL):
+    engine, reader_engine = create_sqlite_engines(DATABASE_URL, SQLITE_PROFILE)
+else:
+    engine = create_engine(
+        DATABASE_URL,
+        connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {},
+        pool_logging_name='primary',
+        **pool_options(DATABASE_URL, InstrumentedQueuePool)
+    )
+    reader_engine = engine
+
+if make_url(DATABASE_URL).get_backend_name() == 'sqlite':
+    enable_sqlite_foreign_keys(engine)
+
+instrument_engine(engine, 'primary')
+if reader_engine is not engine:
+    instrument_engine(reader_engine, 'reader')
+
+# 唯讀副本：設定 DATABASE_REPLICA_URLS 後，GET 請求的查詢改由 replica 處理
+replica_engines = []
+for index, url in enumerate(settings.DATABASE_REPLICA_URLS):
+    replica = create_engine(
+        url,
+        connect_args={"check_same_thread": False} if "sqlite" in url else {},
+        pool_logging_name=f'replica_{index}',
+        **pool_options(url, InstrumentedQueuePool)
+    )
+    if SQLITE_PROFILE and is_sqlite_file(url):
+        apply_sqlite_pragmas(replica, query_only=True)
+    instrument_engine(replica, f'replica_{index}')
+    replica_engines.append(replica)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# GET 請求使用：有 replica 時以 RoutingSession 分流，否則連到 reader_engine
+#（未啟用 SQLite profile 時即為 primary）
+if replica_engines:
+    ReaderSessionLocal = sessionmaker(
+        class_=RoutingSession,
+        autocommit=False,
+        autoflush=False,
+        primary=engine,
+        replicas=replica_engines
+    )
+else:
+    ReaderSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=reader_engine)
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    pool_logging_name='primary_async',
+    **async_pool_options(ASYNC_DATABASE_URL, SQLITE_PROFILE)
+)
+if make_url(ASYNC_DATABASE_URL).get_backend_name() == 'sqlite':
+    enable_sqlite_foreign_keys(async_engine.sync_engine)
+if SQLITE_PROFILE and is_sqlite_file(ASYNC_DATABASE_URL):
+    apply_sqlite_pragmas(async_engine.sync_engine)
+instrument_engine(async_engine.sync_engine, 'primary_async')
+# 非同步 session 無法在 commit 後延遲載入，因此不讓物件過期
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
 
 Base = declarative_base()
\ No newline at end of file
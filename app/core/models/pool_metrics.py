@@ -0,0 +1,116 @@
+from sqlalchemy import event, exc
+from sqlalchemy.pool import Pool, QueuePool, AsyncAdaptedQueuePool
+from threading import Lock
+import time
+
+
+class PoolMetrics:
+    """
+    連線池指標：取得連線的等待時間、使用中連線數、溢出連線數與逾時次數
+    
+    使用中與溢出的連線數由 checkout / checkin 事件維護；
+    等待時間與逾時則由 InstrumentedQueuePool 在取得連線時記錄。
+    """
+    
+    def __init__(self):
+        self._lock = Lock()
+        self.reset()
+    
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.in_use = 0
+            self.peak_in_use = 0
+            self.peak_overflow = 0
+            self.timeouts = 0
+            self.wait_seconds_total = 0.0
+            self.wait_seconds_max = 0.0
+    
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+    
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+    
+    def on_checkout(self, pool: Pool):
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+            if isinstance(pool, QueuePool):
+                self.peak_overflow = max(self.peak_overflow, pool.overflow())
+    
+    def on_checkin(self):
+        with self._lock:
+            self.in_use = max(self.in_use - 1, 0)
+    
+    def stats(self, pool: Pool) -> dict:
+        with self._lock:
+            stats = {
+                'checkouts': self.checkouts,
+                'in_use': self.in_use,
+                'peak_in_use': self.peak_in_use,
+                'peak_overflow': self.peak_overflow,
+                'timeouts': self.timeouts,
+                'avg_wait_ms': self.wait_seconds_total / self.checkouts * 1000 if self.checkouts else 0.0,
+                'max_wait_ms': self.wait_seconds_max * 1000,
+            }
+        if isinstance(pool, QueuePool):
+            stats.update(size=pool.size(), overflow=pool.overflow(), idle=pool.checkedin())
+        return stats
+
+
+# pool_logging_name -> PoolMetrics；engine.dispose() 會重建連線池，因此以名稱而非實例保存
+_pool_metrics: dict[str, PoolMetrics] = {}
+_pools: dict[str, Pool] = {}
+
+
+class InstrumentedPoolMixin:
+    def connect(self):
+        metrics = _pool_metrics.get(self._orig_logging_name)
+        if metrics is None:
+            return super().connect()
+        
+        started_at = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            metrics.record_timeout()
+            raise
+        finally:
+            metrics.record_wait(time.perf_counter() - started_at)
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def instrument_engine(engine, name: str) -> PoolMetrics:
+    """為 engine 的連線池註冊 checkout / checkin 事件並記錄指標"""
+    metrics = _pool_metrics.setdefault(name, PoolMetrics())
+    _pools[name] = engine.pool
+    
+    @event.listens_for(engine, 'checkout')
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.on_checkout(_pools[name])
+    
+    @event.listens_for(engine, 'checkin')
+    def on_checkin(dbapi_connection, connection_record):
+        metrics.on_checkin()
+    
+    @event.listens_for(engine, 'engine_disposed')
+    def on_disposed(engine_):
+        _pools[name] = engine_.pool
+    
+    return metrics
+
+
+def pool_stats() -> dict:
+    return {name: metrics.stats(_pools[name]) for name, metrics in _pool_metrics.items()}
@@ -0,0 +1,49 @@
+from typing import Optional, Sequence
+import itertools
+
+from sqlalchemy import Select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+
+class RoutingSession(Session):
+    """
+    讀取導向 replica、寫入留在 primary 的 Session
+    
+    一個 Session 只會使用一個 replica，同一請求內的多次讀取看到的是同一份資料；
+    一旦 flush 或執行過寫入語句，之後的讀取都改走 primary，確保讀得到自己剛寫入的資料。
+    """
+    
+    _counter = itertools.count()
+    
+    def __init__(self, primary: Engine, replicas: Sequence[Engine], **kwargs):
+        super().__init__(**kwargs)
+        self.primary = primary
+        self.replica: Optional[Engine] = replicas[next(self._counter) % len(replicas)] if replicas else None
+        self.use_primary = False
+    
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs) -> Engine:
+        # bind_arguments 明確指定的 bind 優先（見 primary_bind）
+        if bind is not None:
+            return bind
+        
+        if self.use_primary or self.replica is None:
+            return self.primary
+        
+        if self._flushing or (clause is not None and not isinstance(clause, Select)):
+            self.use_primary = True
+            return self.primary
+        
+        return self.replica
+
+
+def primary_bind(db: Session) -> dict:
+    """
+    必須讀到最新已提交資料的查詢（例如 token 撤銷清單）的 bind_arguments
+    
+    RoutingSession 的讀取可能落後 primary 一段複寫延遲，改在 primary 上執行；
+    其他 Session 的連線本身就能讀到已提交的資料，不需指定。
+    """
+    if isinstance(db, RoutingSession):
+        return {'bind': db.primary}
+    return {}
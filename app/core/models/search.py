@@ -0,0 +1,156 @@
+from typing import Iterable, Optional
+import re
+
+from sqlalchemy import DDL, Connection, Select, column, delete, event, func, insert, inspect, literal_column, select, table
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from .task import Task
+
+
+# 中日韓文字（假名、漢字、諺文），cjk 斷詞時每個字各自成為一個詞
+CJK = re.compile(r'[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af]')
+WORD = re.compile(r'\w+')
+
+# SQLite：FTS5 虛擬表，rowid 即任務 id，title 與 content 分欄以便加權
+sqlite_tasks_fts = table('tasks_fts', column('rowid'), column('title'), column('content'))
+# PostgreSQL：title（權重 A）與 content（權重 B）合併的 tsvector，以 GIN 索引
+postgresql_tasks_fts = table('tasks_fts', column('task_id'), column('document'))
+
+SQLITE_DDL = (
+    "CREATE VIRTUAL TABLE tasks_fts USING fts5(title, content, tokenize = 'unicode61 remove_diacritics 2')",
+    # 虛擬表沒有外鍵，任務被刪除（包含刪除用戶時的 CASCADE）時以觸發器刪除索引
+    'CREATE TRIGGER tasks_fts_delete AFTER DELETE ON tasks BEGIN DELETE FROM tasks_fts WHERE rowid = old.id; END',
+)
+POSTGRESQL_DDL = (
+    'CREATE TABLE tasks_fts (task_id INTEGER PRIMARY KEY REFERENCES tasks (id) ON DELETE CASCADE, document TSVECTOR NOT NULL)',
+    'CREATE INDEX ix_tasks_fts_document ON tasks_fts USING GIN (document)',
+)
+
+# 索引不是 SQLModel 的資料表，隨 tasks 一起建立與刪除（create_all / drop_all）
+for statement in SQLITE_DDL:
+    event.listen(Task.__table__, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+for statement in POSTGRESQL_DDL:
+    event.listen(Task.__table__, 'after_create', DDL(statement).execute_if(dialect='postgresql'))
+event.listen(Task.__table__, 'before_drop', DDL('DROP TABLE IF EXISTS tasks_fts'))
+
+# 不依語言做詞幹處理，只轉小寫
+_TS_CONFIG = literal_column("'simple'::regconfig")
+
+
+def segment(text: str) -> str:
+    """
+    依 TASK_SEARCH_TOKENIZER 切分文字，索引與查詢使用相同的規則
+    
+    - cjk：在每個中日韓文字前後加上空白，使每個字成為一個詞；查詢時以片語（相鄰的詞）比對，
+      任意長度的中文詞都能搜尋，不需要詞典
+    - word：交給資料庫的斷詞器，只依空白與標點切分（連續的中文會成為一個詞）
+    """
+    if settings.TASK_SEARCH_TOKENIZER == 'cjk':
+        return CJK.sub(r' \g<0> ', text)
+    return text
+
+
+def _dialect(db: Session | Connection) -> str:
+    return (db.get_bind() if isinstance(db, Session) else db).dialect.name
+
+
+def index_tasks(db: Session | Connection, tasks: Iterable[tuple[int, str, str]]) -> None:
+    """以任務的 (id, title, content) 新增或取代搜尋索引，不提交"""
+    rows = [(id, segment(title), segment(content)) for id, title, content in tasks]
+    if not rows:
+        return
+    
+    if _dialect(db) == 'postgresql':
+        stmt = postgresql.insert(postgresql_tasks_fts).values([
+            {
+                'task_id': id,
+                'document': func.setweight(func.to_tsvector(_TS_CONFIG, title), 'A').op('||')(
+                    func.setweight(func.to_tsvector(_TS_CONFIG, content), 'B')
+                )
+            }
+            for id, title, content in rows
+        ])
+        db.execute(stmt.on_conflict_do_update(index_elements=['task_id'], set_={'document': stmt.excluded.document}))
+    else:
+        db.execute(
+            insert(sqlite_tasks_fts)
+            .prefix_with('OR REPLACE')
+            .values([{'rowid': id, 'title': title, 'content': content} for id, title, content in rows])
+        )
+
+
+def reindex_tasks(db: Session, batch_size: int = 1000) -> int:
+    """清空並以所有任務重建搜尋索引（變更 TASK_SEARCH_TOKENIZER 後執行），不提交；回傳任務數"""
+    db.execute(delete(sqlite_tasks_fts if _dialect(db) == 'sqlite' else postgresql_tasks_fts))
+    
+    count, after_id = 0, 0
+    while True:
+        tasks = db.execute(
+            select(Task.id, Task.title, Task.content).where(Task.id > after_id).order_by(Task.id).limit(batch_size)
+        ).all()
+        if not tasks:
+            return count
+        index_tasks(db, tasks)
+        count += len(tasks)
+        after_id = tasks[-1].id
+
+
+@event.listens_for(Task, 'after_insert')
+def index_inserted_task(mapper, connection: Connection, target: Task) -> None:
+    """
+    ORM 新增的任務，在同一個 flush（同一個交易）中以 flush 的連線寫入搜尋索引
+    
+    使用 Task 的 mapper 事件，只有 flush 中包含任務時才會執行；以 Core insert 批次新增的任務由呼叫端呼叫 index_tasks。
+    """
+    index_tasks(connection, [(target.id, target.title, target.content)])
+
+
+@event.listens_for(Task, 'after_update')
+def index_updated_task(mapper, connection: Connection, target: Task) -> None:
+    """title 或 content 有變更的任務更新搜尋索引，只更新其他欄位時不寫入"""
+    state = inspect(target)
+    if state.attrs.title.history.has_changes() or state.attrs.content.history.has_changes():
+        index_tasks(connection, [(target.id, target.title, target.content)])
+
+
+def _terms(q: str) -> list[list[str]]:
+    terms = [WORD.findall(segment(term).lower()) for term in q.split()]
+    return [words for words in terms if words]
+
+
+def match_tasks(db: Session, stmt: Select, q: str, prefix: bool = True) -> Optional[Select]:
+    """
+    在 select(Task) 的查詢上加上全文搜尋條件，並依相關度排序（標題的權重高於內容）
+    
+    q 以空白分隔的每個字詞都必須出現，字詞內的多個詞以片語比對；
+    prefix 為 True 時最後一個字詞以前綴比對，用於輸入時即時搜尋。
+    q 中沒有可搜尋的字詞時回傳 None。
+    """
+    terms = _terms(q)
+    if not terms:
+        return None
+    
+    if _dialect(db) == 'postgresql':
+        phrases = [' <-> '.join(f"'{word}'" for word in words) for words in terms]
+        if prefix:
+            phrases[-1] += ':*'
+        query = func.to_tsquery(_TS_CONFIG, ' & '.join(phrases))
+        fts = postgresql_tasks_fts
+        return (
+            stmt.join(fts, fts.c.task_id == Task.id)
+            .where(fts.c.document.op('@@')(query))
+            .order_by(func.ts_rank_cd(fts.c.document, query).desc(), Task.id)
+        )
+    
+    phrases = [f'"{" ".join(words)}"' for words in terms]
+    if prefix:
+        phrases[-1] += '*'
+    fts = sqlite_tasks_fts
+    return (
+        stmt.join(fts, fts.c.rowid == Task.id)
+        .where(literal_column('tasks_fts').op('MATCH')(' '.join(phrases)))
+        # bm25 越小越相關；標題的權重為內容的 10 倍
+        .order_by(func.bm25(literal_column('tasks_fts'), 10.0, 1.0), Task.id)
+    )
\ No newline at end of file
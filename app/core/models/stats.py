@@ -0,0 +1,21 @@
+from sqlmodel import SQLModel, Field
+
+from .task import Difficulty, Priority
+
+
+class UserTaskStats(SQLModel, table=True):
+    """
+    每個用戶依完成狀態、優先度與難度分組的任務數
+    
+    任務的新增、修改與刪除在同一個交易中以增量（count = count + n）更新，
+    讀取統計只需依主鍵讀取該用戶最多 18 列，與任務數量無關。
+    若與 tasks 不一致，以 rebuild_task_stats.py 重新計算。
+    """
+    __tablename__ = 'user_task_stats'
+    
+    user_id: int = Field(foreign_key='users.id', primary_key=True, ondelete='CASCADE')
+    is_completed: bool = Field(primary_key=True)
+    priority: Priority = Field(primary_key=True)
+    difficulty: Difficulty = Field(primary_key=True)
+    
+    count: int = Field(default=0, nullable=False)
\ No newline at end of file
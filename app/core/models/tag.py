@@ -1,7 +1,9 @@
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index, text
 from typing import TYPE_CHECKING, Optional
 
 from .task import TaskTagLink
+from .versioning import Versioned
 
 if TYPE_CHECKING:
     from .user import User
@@ -12,13 +14,22 @@ class TagBase(SQLModel):
     name: str = Field(nullable=False)
     
     
-class Tag(TagBase, table=True):
+class Tag(TagBase, Versioned, table=True):
     __tablename__ = 'tags'
+    __table_args__ = (
+        # 公開標籤的部分索引，列出公開標籤時不需掃描所有用戶的私人標籤
+        Index(
+            'ix_tags_public_id', 'id',
+            sqlite_where=text('is_public = 1'),
+            postgresql_where=text('is_public')
+        ),
+    )
     
     id: int = Field(primary_key=True, index=True)
-    owner_id: int = Field(foreign_key='users.id', ondelete='CASCADE')
+    owner_id: int = Field(foreign_key='users.id', ondelete='CASCADE', index=True)
     
     is_public: bool = Field(default=False, nullable=False)
+    version: int = Field(default=1, nullable=False)
     
     owner: 'User' = Relationship(back_populates='tags')
     tasks: list['Task'] = Relationship(back_populates='tags', link_model=TaskTagLink)
\ No newline at end of file
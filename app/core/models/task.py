@@ -1,8 +1,11 @@
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index, text
 from typing import TYPE_CHECKING, Optional
 from enum import Enum
 from datetime import datetime
 
+from .versioning import Versioned
+
 if TYPE_CHECKING:
     from .user import User
     from .tag import Tag
@@ -19,11 +22,16 @@ class Priority(Enum):
     HIGH = 'HIGH'
     
     
+# 優先度的排序值（HIGH 為 0）；查詢需使用與索引完全相同的運算式，資料庫才能以索引排序
+PRIORITY_RANK_SQL = "CASE priority WHEN 'HIGH' THEN 0 WHEN 'MEDIUM' THEN 1 ELSE 2 END"
+    
+    
 class TaskTagLink(SQLModel, table=True):
     __tablename__ = 'task_tag_link'
     
     task_id: int = Field(foreign_key='tasks.id', primary_key=True, ondelete='CASCADE')
-    tag_id: int = Field(foreign_key='tags.id', primary_key=True, ondelete='CASCADE')
+    # 主鍵以 task_id 開頭，依標籤查任務需要另外的索引
+    tag_id: int = Field(foreign_key='tags.id', primary_key=True, ondelete='CASCADE', index=True)
 
 
 class TaskBase(SQLModel):
@@ -34,14 +42,34 @@ class TaskBase(SQLModel):
     deadline: Optional[datetime] = Field(nullable=True, default=None)
 
 
-class Task(TaskBase, table=True):
+class Task(TaskBase, Versioned, table=True):
     __tablename__ = 'tasks'
+    __table_args__ = (
+        # 任務列表：依 user_id、is_completed 篩選並依 deadline 排序
+        Index('ix_tasks_user_id_is_completed_deadline', 'user_id', 'is_completed', 'deadline'),
+        # 未完成任務（預設列表）的部分索引，只包含未完成的任務
+        Index(
+            'ix_tasks_open_user_id_deadline', 'user_id', 'deadline',
+            sqlite_where=text('is_completed = 0'),
+            postgresql_where=text('NOT is_completed')
+        ),
+        # 行事曆：依 user_id 與 date(deadline) 範圍讀取並依日期、優先度分組，涵蓋查詢需要的所有欄位
+        Index('ix_tasks_user_id_deadline_date', 'user_id', text('date(deadline)'), 'priority', 'is_completed', 'deadline'),
+        # 任務列表依優先度排序（同優先度依 deadline）；PostgreSQL 的運算式索引欄位需加上括號
+        Index('ix_tasks_user_id_is_completed_priority_rank', 'user_id', 'is_completed', text(f'({PRIORITY_RANK_SQL})'), 'deadline'),
+        # 任務列表依建立時間篩選或排序
+        Index('ix_tasks_user_id_is_completed_create_at', 'user_id', 'is_completed', 'create_at'),
+    )
     
     id: int = Field(primary_key=True, index=True)
     user_id: int = Field(foreign_key='users.id', ondelete='CASCADE')
     
     create_at: datetime = Field(default_factory=datetime.now, nullable=False)
     is_completed: bool = Field(default=False, nullable=False)
+    # 樂觀並行控制與 ETag 使用，標籤的增減也會遞增
+    version: int = Field(default=1, nullable=False)
+    
+    __versioned_collections__ = ('tags',)
     
     user: 'User' = Relationship(back_populates='tasks')
     tags: list['Tag'] = Relationship(back_populates='tasks', link_model=TaskTagLink)
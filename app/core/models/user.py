@@ -1,16 +1,15 @@
 from sqlmodel import SQLModel, Field, Relationship
 from pydantic import EmailStr
-from passlib.context import CryptContext
 from typing import TYPE_CHECKING, Optional
 from enum import IntEnum
 
+from app.core.hashing import password_hasher, pwd_context
+from .versioning import Versioned
+
 if TYPE_CHECKING:
     from .task import Task, Tag
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-
 class Role(IntEnum):
     ADMIN = 1
     SUPERUSER = 2
@@ -23,16 +22,20 @@ class UserBase(SQLModel):
     nickname: Optional[str] = Field(nullable=True, default=None)
     
     
-class User(UserBase, table=True):
+class User(UserBase, Versioned, table=True):
     __tablename__ = 'users'
     
     id : int = Field(primary_key=True, index=True)
-    role_id: int = Field(foreign_key='user_roles.id', default=Role.USER)
+    role_id: int = Field(foreign_key='user_roles.id', default=Role.USER, index=True)
     
     password: str
     
     coin: float = Field(default=0, nullable=True)
     
+    version: int = Field(default=1, nullable=False)
+    # 用戶的任務或標籤有任何寫入時遞增，作為列表與 /users/me/ 的 ETag
+    collection_version: int = Field(default=1, nullable=False)
+    
     role: 'UserRole' = Relationship(back_populates='users')
     tasks: list['Task'] = Relationship(back_populates='user')
     tags: list['Tag'] = Relationship(back_populates='owner')
@@ -40,10 +43,16 @@ class User(UserBase, table=True):
     headshot_filepath: str = Field(nullable=True, default=None)
     
     def encode_password(self):        
-        self.password = pwd_context.hash(self.password)
+        self.password = password_hasher.hash(self.password)
         
     def verify_password(self, plain_password):
-        return pwd_context.verify(plain_password, self.password)
+        return password_hasher.verify(plain_password, self.password)
+    
+    async def encode_password_async(self):
+        self.password = await password_hasher.hash_async(self.password)
+        
+    async def verify_password_async(self, plain_password):
+        return await password_hasher.verify_async(plain_password, self.password)
     
 
 class UserRole(SQLModel, table=True):
@@ -0,0 +1,91 @@
+from typing import Iterable
+
+from sqlalchemy import Select, event, inspect, select, update
+from sqlalchemy.orm import Session, declared_attr
+
+
+class Versioned:
+    """
+    以 version 欄位做樂觀並行控制的模型（子類別需定義 version 欄位）
+    
+    flush 時，欄位或 __versioned_collections__ 中的關聯有變更就遞增 version；
+    ORM 的 UPDATE / DELETE 會帶上 WHERE version = 原本的版本，期間被其他交易修改時
+    拋出 StaleDataError，不需要持有資料列鎖。
+    繞過 ORM 的批次 UPDATE 需自行設定 version = version + 1。
+    """
+    __versioned_collections__: tuple[str, ...] = ()
+    
+    @declared_attr
+    def __mapper_args__(cls):
+        return {'version_id_col': cls.__table__.c.version, 'version_id_generator': False}
+
+
+def _is_changed(session: Session, obj: Versioned) -> bool:
+    state = inspect(obj)
+    # 已手動遞增版本的物件（例如以 Core 語句修改了關聯）不再重複遞增
+    if state.attrs.version.history.has_changes():
+        return False
+    if session.is_modified(obj, include_collections=False):
+        return True
+    
+    return any(state.attrs[name].history.has_changes() for name in obj.__versioned_collections__)
+
+
+@event.listens_for(Session, 'before_flush')
+def bump_versions(session: Session, flush_context, instances) -> None:
+    for obj in session.dirty:
+        if isinstance(obj, Versioned) and _is_changed(session, obj):
+            obj.version += 1
+
+
+def touch_collections(db: Session, user_ids: Iterable[int]) -> None:
+    """
+    遞增用戶的 collection_version
+    
+    任務或標籤有任何寫入時呼叫，列表與 /users/me/ 的 ETag 由它產生，
+    條件式請求只需讀取這一個欄位即可判斷內容是否改變。
+    """
+    from .user import User
+    
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    if not user_ids:
+        return
+    
+    db.execute(
+        update(User)
+        .where(User.id.in_(user_ids))
+        .values(collection_version=User.collection_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def touch_tagged_tasks(db: Session, tag_ids: Iterable[int] | Select) -> list[int]:
+    """
+    遞增使用這些標籤的任務的 version，以及任務擁有者的 collection_version，回傳這些擁有者的 id
+    
+    任務的回應包含標籤內容，標籤更新或刪除時呼叫；刪除時需在關聯被 CASCADE 刪除之前執行，
+    回傳的用戶的任務列表（標籤篩選）總數也需失效。
+    tag_ids 可為 id 的子查詢，兩個 UPDATE 都以集合條件完成，不載入任務。
+    """
+    from .task import Task, TaskTagLink
+    from .user import User
+    
+    if not isinstance(tag_ids, Select):
+        tag_ids = list(tag_ids)
+    tasks = select(TaskTagLink.task_id).where(TaskTagLink.tag_id.in_(tag_ids))
+    
+    user_ids = db.scalars(
+        update(User)
+        .where(User.id.in_(select(Task.user_id).where(Task.id.in_(tasks))))
+        .values(collection_version=User.collection_version + 1)
+        .returning(User.id)
+        .execution_options(synchronize_session=False)
+    ).all()
+    db.execute(
+        update(Task)
+        .where(Task.id.in_(tasks))
+        .values(version=Task.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    
+    return list(user_ids)
\ No newline at end of file
@@ -0,0 +1,302 @@
+from datetime import date, datetime
+from threading import Lock
+from typing import Any, Callable, Generic, Hashable, Optional, Sequence, TypeVar
+import base64
+import binascii
+import heapq
+import itertools
+import json
+
+from fastapi import HTTPException, Query, status
+from fastapi_pagination import Page as BasePage
+from fastapi_pagination.api import create_page, resolve_params
+from fastapi_pagination.bases import AbstractParams, RawParams
+from fastapi_pagination.ext.sqlalchemy import create_count_query, create_paginate_query
+from pydantic import BaseModel
+from sqlalchemy import Select, tuple_
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+
+T = TypeVar('T')
+
+
+class Page(BasePage[T], Generic[T]):
+    """
+    OFFSET 分頁的回應，另外提供 has_next
+    
+    PAGINATION_COUNT_MODE 為 none 時不計算總數，total 與 pages 為 None，
+    是否有下一頁只能由 has_next 判斷。
+    """
+    has_next: Optional[bool] = None
+
+
+class CountCache:
+    """
+    分頁總數的快取
+    
+    以 (資源, 範圍) 為單位失效，範圍通常是用戶 id，None 表示整個資源。
+    失效時只遞增版本號，舊的項目不會再被命中，之後由 LRU 或 TTL 淘汰；
+    計數期間若發生失效，結果會存到舊版本的鍵下，不會被讀到。
+    
+    版本號存在與總數相同容量與 TTL 的快取中；項目被淘汰後改用新的版本號，
+    舊版本下的總數不會再被命中，只會多一次計數。
+    """
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize, ttl)
+        # (資源, 範圍) -> 版本號
+        self._versions = TTLCache(maxsize, ttl)
+        self._counter = itertools.count(1)
+        self._lock = Lock()
+    
+    def _scope_version(self, resource: str, scope: Hashable) -> int:
+        version = self._versions.get((resource, scope))
+        if version is None:
+            version = next(self._counter)
+            self._versions.set((resource, scope), version)
+        return version
+    
+    def _version(self, resource: str, scope: Hashable) -> tuple[int, int]:
+        with self._lock:
+            return self._scope_version(resource, None), self._scope_version(resource, scope)
+    
+    def get_or_count(self, resource: str, scope: Hashable, key: Hashable, count: Callable[[], int]) -> int:
+        cache_key = (resource, scope, key, self._version(resource, scope))
+        total = self._cache.get(cache_key)
+        if total is None:
+            total = count()
+            self._cache.set(cache_key, total)
+        return total
+    
+    def invalidate(self, resource: str, scope: Hashable = None) -> None:
+        """使某個範圍（scope 為 None 時為整個資源）的總數失效"""
+        with self._lock:
+            self._versions.set((resource, scope), next(self._counter))
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._versions.clear()
+        self._cache.clear()
+    
+    def stats(self) -> dict:
+        return {'mode': settings.PAGINATION_COUNT_MODE, **self._cache.stats()}
+
+
+count_cache = CountCache(settings.PAGINATION_COUNT_CACHE_MAXSIZE, settings.PAGINATION_COUNT_CACHE_TTL_SECONDS)
+
+
+class _Window(AbstractParams):
+    """以任意的 limit / offset 套用 fastapi_pagination 的分頁查詢（不受 size 上限限制）"""
+    
+    def __init__(self, limit: int, offset: int):
+        self.limit = limit
+        self.offset = offset
+    
+    def to_raw_params(self) -> RawParams:
+        return RawParams(limit=self.limit, offset=self.offset)
+
+
+def page_window() -> tuple[int, int]:
+    """目前請求的 (limit, offset)，用於 ETag 等需要區分不同頁的地方"""
+    raw = resolve_params().to_raw_params().as_limit_offset()
+    return raw.limit, raw.offset
+
+
+def _count(db: Session, stmt: Select, count_key: Optional[tuple[str, Hashable, Hashable]]) -> Optional[int]:
+    """依 PAGINATION_COUNT_MODE 計算 stmt 的總數，none 時回傳 None"""
+    mode = settings.PAGINATION_COUNT_MODE
+    if mode == 'cached' and count_key is not None:
+        resource, scope, key = count_key
+        return count_cache.get_or_count(resource, scope, key, lambda: db.scalar(create_count_query(stmt)))
+    if mode != 'none':
+        return db.scalar(create_count_query(stmt))
+    return None
+
+
+def paginate(
+    db: Session,
+    stmt: Select,
+    *,
+    transformer: Callable[[list], list] = None,
+    count_key: Optional[tuple[str, Hashable, Hashable]] = None
+    ) -> Page:
+    """
+    OFFSET 分頁，總數的計算方式由 PAGINATION_COUNT_MODE 決定
+    
+    - exact：每次執行 COUNT(*)
+    - none：不計算總數，多取一筆判斷是否有下一頁
+    - cached：總數存在 count_cache，鍵為 count_key（資源, 範圍, 篩選條件）；
+      未提供 count_key 時同 exact
+    """
+    params = resolve_params()
+    raw = params.to_raw_params().as_limit_offset()
+    total = _count(db, stmt, count_key)
+    
+    limit = raw.limit + 1 if total is None else raw.limit
+    rows = list(db.execute(create_paginate_query(stmt, _Window(limit, raw.offset))).scalars())
+    items = rows[:raw.limit]
+    has_next = len(rows) > raw.limit if total is None else raw.offset + len(items) < total
+    
+    return create_page(transformer(items) if transformer else items, total, params, has_next=has_next)
+
+
+def paginate_sequence(items: Sequence, *, transformer: Callable[[list], list] = None) -> Page:
+    """對已在記憶體中的完整列表分頁，總數即為列表長度，不需查詢資料庫"""
+    params = resolve_params()
+    raw = params.to_raw_params().as_limit_offset()
+    
+    page = list(items[raw.offset:raw.offset + raw.limit])
+    has_next = raw.offset + len(page) < len(items)
+    
+    return create_page(transformer(page) if transformer else page, len(items), params, has_next=has_next)
+
+
+def paginate_merged(
+    db: Session,
+    stmt: Select,
+    items: Sequence,
+    key: Callable[[Any], Any],
+    *,
+    transformer: Callable[[list], list] = None,
+    count_key: Optional[tuple[str, Hashable, Hashable]] = None
+    ) -> Page:
+    """
+    OFFSET 分頁：已在記憶體中的 items 與 stmt 的查詢結果依 key 合併後分頁
+    
+    items 與 stmt 都需依 key 排序，且兩者沒有重複的項目。合併後第 offset 筆之前最多只有 len(items) 筆來自 items，
+    stmt 因此從第 max(0, offset - len(items)) 筆開始查詢，最多取 limit + len(items) + 1 筆，不需載入全部的資料列；
+    查詢結果不足時即可得知總數，只有還有更多資料列時才依 PAGINATION_COUNT_MODE 計算總數。
+    """
+    params = resolve_params()
+    raw = params.to_raw_params().as_limit_offset()
+    
+    skip = max(0, raw.offset - len(items))
+    limit = raw.offset + raw.limit + 1 - skip
+    rows = list(db.execute(create_paginate_query(stmt, _Window(limit, skip))).scalars())
+    
+    # 略過的 skip 筆資料列都排在 rows 之前，合併後每個項目的位置為 skip + 索引；
+    # skip 不為 0 時 offset - skip 即為 len(items)，排在 rows 之前的 items 不會落在這一頁
+    merged = list(heapq.merge(items, rows, key=key))
+    start = raw.offset - skip
+    page = merged[start:start + raw.limit]
+    has_next = len(merged) > start + raw.limit
+    
+    if len(rows) < limit and (rows or not skip):
+        total = len(items) + skip + len(rows)
+    else:
+        total = _count(db, stmt, count_key)
+        total = None if total is None else len(items) + total
+    
+    return create_page(transformer(page) if transformer else page, total, params, has_next=has_next)
+
+
+class CursorPage(BaseModel, Generic[T]):
+    """
+    游標分頁的回應
+    
+    next_cursor 為 None 表示已經是最後一頁；取下一頁時將它原封不動傳回 cursor 參數。
+    """
+    items: list[T]
+    size: int
+    next_cursor: Optional[str] = None
+
+
+class CursorParams(BaseModel):
+    cursor: Optional[list] = None
+    size: int
+
+
+class Exceptions:
+    INVALID_CURSOR = HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail='Invalid cursor'
+    )
+
+
+def _default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} is not cursor serializable')
+
+
+def encode_cursor(values: Sequence) -> str:
+    """將排序鍵的值編碼為不透明的游標字串"""
+    raw = json.dumps(list(values), default=_default, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise Exceptions.INVALID_CURSOR from None
+    
+    if not isinstance(values, list):
+        raise Exceptions.INVALID_CURSOR
+    return values
+
+
+def parse_cursor(values: Optional[list], *parsers: Callable) -> Optional[list]:
+    """依序以 parsers 轉換游標中的各個值，數量或格式不符時回傳 400"""
+    if values is None:
+        return None
+    
+    if len(values) != len(parsers):
+        raise Exceptions.INVALID_CURSOR
+    try:
+        return [parser(value) for parser, value in zip(parsers, values)]
+    except (TypeError, ValueError):
+        raise Exceptions.INVALID_CURSOR from None
+
+
+def cursor_params(
+    cursor: Optional[str] = Query(default=None, description='上一頁回傳的 next_cursor，未指定時從第一筆開始'),
+    size: int = Query(default=50, ge=1, le=100, description='每頁筆數')
+    ) -> CursorParams:
+    """游標分頁查詢參數的 FastAPI 依賴"""
+    return CursorParams(cursor=decode_cursor(cursor) if cursor else None, size=size)
+
+
+def seek_query(stmt: Select, keys: Sequence, after: Optional[Sequence], limit: int) -> Select:
+    """
+    依 keys 排序，取出排在 after 之後的 limit 筆
+    
+    以 (k1, k2) > (v1, v2) 的比較取代 OFFSET，資料庫可直接從索引中的位置開始讀取，
+    不需要掃過前面的資料列；keys 的最後一個欄位必須唯一（通常是 id）。
+    """
+    if after is not None:
+        if len(keys) == 1:
+            stmt = stmt.where(keys[0] > after[0])
+        else:
+            stmt = stmt.where(tuple_(*keys) > tuple(after))
+    
+    return stmt.order_by(None).order_by(*keys).limit(limit)
+
+
+def seek(db: Session, stmt: Select, keys: Sequence, after: Optional[Sequence], limit: int) -> list:
+    return list(db.execute(seek_query(stmt, keys, after, limit)).scalars())
+
+
+def cursor_page(
+    rows: list,
+    params: CursorParams,
+    key: Callable[[Any], Sequence],
+    transformer: Callable[[list], list] = None
+    ) -> CursorPage:
+    """
+    由多取一筆的查詢結果建立 CursorPage
+    
+    rows 最多為 size + 1 筆，多出的那筆只用來判斷是否還有下一頁。
+    """
+    items = rows[:params.size]
+    next_cursor = encode_cursor(key(items[-1])) if len(rows) > params.size else None
+    
+    return CursorPage(
+        items=transformer(items) if transformer else items,
+        size=params.size,
+        next_cursor=next_cursor
+    )
@@ -0,0 +1,126 @@
+from functools import lru_cache
+from typing import Any, Callable, NamedTuple, Optional
+
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel, ConfigDict, create_model
+from sqlalchemy.orm import load_only
+
+
+class Relation(NamedTuple):
+    """回應中的一個關聯：載入它的 loader option，以及父表需要一併查詢的外鍵欄位"""
+    option: Any
+    columns: tuple[str, ...] = ()
+
+
+@lru_cache
+def partial(schema: type[BaseModel]) -> type[BaseModel]:
+    """
+    所有欄位皆為選填的回應 schema
+    
+    搭配 response_model_exclude_unset=True 使用，只輸出實際查詢的欄位；
+    未指定 fields / include 時所有欄位都有值，輸出與原本的 schema 相同。
+    """
+    fields = {name: (Optional[info.annotation], None) for name, info in schema.model_fields.items()}
+    return create_model(
+        f'{schema.__name__}Partial',
+        __config__=ConfigDict(from_attributes=True),
+        __doc__=f'{schema.__name__}，僅包含 fields / include 指定的欄位',
+        **fields
+    )
+
+
+class Projection:
+    """一次請求實際要查詢的欄位（fields）與要載入的關聯（include）"""
+    
+    def __init__(self, spec: 'ProjectionSpec', fields: Optional[list[str]], include: Optional[list[str]]):
+        self.spec = spec
+        self.is_sparse = fields is not None
+        self.fields = spec.columns if fields is None else ['id', *(name for name in fields if name != 'id')]
+        self.include = list(spec.relations) if include is None else include
+    
+    def options(self) -> list:
+        """查詢需要的 loader options：未請求的欄位不出現在 SELECT 中，未請求的關聯不查詢"""
+        relations = [self.spec.relations[name] for name in self.include]
+        options = [relation.option for relation in relations]
+        if self.is_sparse:
+            columns = dict.fromkeys([
+                *self.fields,
+                *self.spec.required,
+                *(column for relation in relations for column in relation.columns)
+            ])
+            options.append(load_only(*(getattr(self.spec.model, column) for column in columns)))
+        return options
+    
+    @property
+    def key(self) -> tuple:
+        """回應的形式，用於 ETag：相同資料以不同 fields / include 取得時 ETag 不同"""
+        return tuple(self.fields), tuple(self.include)
+    
+    def dump(self, obj) -> dict:
+        return {name: getattr(obj, name) for name in (*self.fields, *self.include)}
+    
+    def dump_all(self, objs) -> list[dict]:
+        return [self.dump(obj) for obj in objs]
+
+
+class ProjectionSpec:
+    """
+    某個資源可供投影的欄位與關聯
+    
+    欄位取自回應 schema 中不屬於關聯的欄位；relations 的鍵需與 schema、ORM 的關聯名稱相同。
+    required 為服務本身需要的欄位（例如權限檢查用的 user_id），不論是否請求都會查詢。
+    """
+    
+    class Exceptions:
+        @staticmethod
+        def unknown_names(param: str, names: list[str], allowed: list[str]) -> HTTPException:
+            return HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f'Unknown {param}: {", ".join(names)} (allowed: {", ".join(allowed)})'
+            )
+    
+    def __init__(
+        self,
+        model,
+        schema: type[BaseModel],
+        relations: dict[str, Relation] = None,
+        required: tuple[str, ...] = ()
+        ):
+        self.model = model
+        self.schema = schema
+        self.relations = relations or {}
+        self.required = required
+        self.columns = [name for name in schema.model_fields if name not in self.relations]
+    
+    def _parse(self, param: str, value: Optional[str], allowed: list[str]) -> Optional[list[str]]:
+        if value is None:
+            return None
+        
+        names = list(dict.fromkeys(name.strip() for name in value.split(',') if name.strip()))
+        unknown = [name for name in names if name not in allowed]
+        if unknown:
+            raise self.Exceptions.unknown_names(param, unknown, allowed)
+        return names
+    
+    def resolve(self, fields: Optional[str] = None, include: Optional[str] = None) -> Projection:
+        return Projection(
+            self,
+            self._parse('fields', fields, self.columns),
+            self._parse('include', include, list(self.relations))
+        )
+    
+    def query(self) -> Callable[..., Projection]:
+        """fields / include 查詢參數的 FastAPI 依賴"""
+        def dependency(
+            fields: Optional[str] = Query(
+                default=None,
+                description=f'以逗號分隔要回傳的欄位，id 一律回傳；未指定時回傳全部（{", ".join(self.columns)}）'
+            ),
+            include: Optional[str] = Query(
+                default=None,
+                description=f'以逗號分隔要載入的關聯，空字串表示不載入；未指定時載入全部（{", ".join(self.relations)}）'
+            )
+            ) -> Projection:
+            return self.resolve(fields, include)
+        
+        return dependency
@@ -1,4 +1,5 @@
 from .user import *
 from .task import *
 from .tag import *
-from .auth import *
\ No newline at end of file
+from .auth import *
+from .bulk import *
\ No newline at end of file
@@ -1,3 +1,4 @@
+from typing import NamedTuple, Optional
 from sqlmodel import SQLModel
 
 
@@ -5,10 +6,28 @@ class AuthLogin(SQLModel):
     username: str
     password: str
     
-class AuthLoginResponse(SQLModel):
+class AuthRefresh(SQLModel):
+    refresh_token: str
+    
+class AuthLogout(SQLModel):
+    refresh_token: Optional[str] = None
+    
+class AuthTokenResponse(SQLModel):
     access_token: str
+    refresh_token: str
     token_type: str
+    
+class AuthLoginResponse(AuthTokenResponse):
     user: 'AuthLoginUser'
     
 class AuthLoginUser(SQLModel):
     id: int
+    
+class Principal(NamedTuple):
+    """
+    已驗證身分的精簡紀錄，只保留授權判斷所需的欄位；
+    version 用來辨識快取是否在載入期間被失效
+    """
+    id: int
+    role_id: int
+    version: int
@@ -0,0 +1,7 @@
+from sqlmodel import SQLModel
+
+
+class BulkDeleteResponse(SQLModel):
+    count: int
+    # 刪除筆數達到 BULK_DELETE_MAX_ROWS 時為 True，可能還有符合條件的資料，需再次呼叫
+    has_more: bool
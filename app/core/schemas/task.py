@@ -1,7 +1,11 @@
-from datetime import datetime
+from datetime import date as date_type, datetime
+from typing import Optional
+from pydantic import model_validator
 from sqlmodel import Field, SQLModel
 
-from app.core.models import TaskBase
+from app.core.config import settings
+from app.core.filters import TaskRangeParams
+from app.core.models import TaskBase, Difficulty, Priority
 from .tag import TagResponse
 
 
@@ -15,4 +19,101 @@ class TaskResponse(TaskBase):
     user_id: int
     create_at: datetime
     is_completed: bool = Field(default=False)
-    tags: list['TagResponse']
\ No newline at end of file
+    tags: list['TagResponse']
+    
+    
+class TaskBulkCreate(SQLModel):
+    tasks: list[TaskCreate] = Field(min_length=1, max_length=settings.TASK_BULK_MAX_ITEMS)
+    # True：任一項目失敗則全部不建立；False：建立成功的項目，並回報失敗的項目
+    atomic: bool = Field(default=True)
+    
+    
+class TaskBulkError(SQLModel):
+    index: int
+    status_code: int
+    detail: str
+    
+    
+class TaskBulkResponse(SQLModel):
+    created: list[TaskResponse]
+    errors: list[TaskBulkError]
+    
+    
+class TaskBulkFilter(SQLModel):
+    """與任務列表相同的篩選條件"""
+    range: Optional[TaskRangeParams] = Field(default=None)
+    date: Optional[date_type] = Field(default=None)
+    # None 表示不限完成狀態
+    is_completed: Optional[bool] = Field(default=False)
+    
+    
+class TaskBulkUpdateValues(SQLModel):
+    """要更新的欄位，只套用有指定的欄位"""
+    is_completed: Optional[bool] = Field(default=None)
+    deadline: Optional[datetime] = Field(default=None)
+    difficulty: Optional[Difficulty] = Field(default=None)
+    priority: Optional[Priority] = Field(default=None)
+    
+    @model_validator(mode='after')
+    def check_values(self):
+        if not self.model_fields_set:
+            raise ValueError('At least one field must be set')
+        for field in ('is_completed', 'difficulty', 'priority'):
+            if field in self.model_fields_set and getattr(self, field) is None:
+                raise ValueError(f'{field} cannot be null')
+        return self
+    
+    
+class TaskBulkUpdate(SQLModel):
+    """以 ids 或 filter（兩者皆指定時取交集）選擇要更新的任務，只會更新自己的任務"""
+    ids: Optional[list[int]] = Field(default=None, min_length=1, max_length=settings.TASK_BULK_MAX_ITEMS)
+    filter: Optional[TaskBulkFilter] = Field(default=None)
+    values: TaskBulkUpdateValues
+    # 是否回傳更新後的任務
+    returning: bool = Field(default=False)
+    
+    @model_validator(mode='after')
+    def check_target(self):
+        if self.ids is None and self.filter is None:
+            raise ValueError('Either ids or filter must be set')
+        return self
+    
+    
+class TaskBulkUpdateResponse(SQLModel):
+    count: int
+    # 更新筆數達到 BULK_UPDATE_MAX_ROWS 時為 True，可能還有符合條件的任務；
+    # 更新後仍符合 filter 的任務會再次被選到，需縮小篩選範圍或改以 ids 指定
+    has_more: bool
+    tasks: Optional[list[TaskResponse]] = None    
+    
+class TaskCalendarDay(SQLModel):
+    date: date_type
+    total: int
+    completed: int
+    # 未完成且 deadline 已過
+    overdue: int
+    # 各優先度的任務數，所有優先度都會列出
+    by_priority: dict[Priority, int]
+    
+    
+class TaskCalendar(SQLModel):
+    """start 到 end（含）之間每天的任務統計，只列出有任務的日子"""
+    start: date_type
+    end: date_type
+    days: list[TaskCalendarDay]
+    
+    
+class TaskStatsCount(SQLModel):
+    open: int
+    completed: int
+    
+    
+class TaskStats(SQLModel):
+    """用戶的任務統計，各優先度與難度都會列出"""
+    total: int
+    open: int
+    completed: int
+    # 未完成且 deadline 在本週（週一至週日）
+    due_this_week: int
+    by_priority: dict[Priority, TaskStatsCount]
+    by_difficulty: dict[Difficulty, TaskStatsCount]
\ No newline at end of file
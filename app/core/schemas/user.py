@@ -1,7 +1,7 @@
 from typing import Optional
 from sqlmodel import SQLModel
 
-from app.core.models import UserBase, Role, UserRole
+from app.core.models import UserBase, Role
 from .task import TaskResponse
 from .tag import TagResponse
 
@@ -19,9 +19,16 @@ class AdminUserCreate(UserBase):
 class UserPasswordUpdate(SQLModel):
     password: str
     
+class RoleResponse(SQLModel):
+    id: int
+    name: str
+    
+    class Config:
+        from_attributes = True
+    
 class UserResponse(UserBase):
     id: int
-    role: 'UserRole'
+    role: RoleResponse
     coin: float
     tasks: list['TaskResponse']
     tags: list['TagResponse']
@@ -0,0 +1,111 @@
+from functools import wraps
+from typing import Any, Callable
+import asyncio
+import inspect
+
+from fastapi import Response
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.dependencies.utils import get_typed_signature
+from fastapi.routing import APIRoute
+from pydantic import TypeAdapter
+
+from app.core.config import settings
+
+
+class JSONBytesResponse(Response):
+    """內容已經是 JSON bytes 的回應，不再經過 json.dumps"""
+    media_type = 'application/json'
+
+
+class ResponseSerializer:
+    """
+    以 pydantic-core 將端點的回傳值直接序列化為 JSON bytes
+    
+    TypeAdapter 在建立路由時建立一次；回傳值（ORM 物件、dict 或 pydantic 模型）以 from_attributes
+    驗證為回應模型後由 dump_json 輸出，Enum 與 datetime 由 pydantic-core 處理，
+    省去 FastAPI 的 model_dump、jsonable 轉換與標準庫 json 的編碼。
+    """
+    
+    def __init__(self, response_model: Any, exclude_unset: bool, exclude_defaults: bool, exclude_none: bool, by_alias: bool):
+        self.adapter = TypeAdapter(response_model)
+        self.options = {
+            'exclude_unset': exclude_unset,
+            'exclude_defaults': exclude_defaults,
+            'exclude_none': exclude_none,
+            'by_alias': by_alias
+        }
+    
+    def dumps(self, value: Any) -> bytes:
+        return self.adapter.dump_json(self.adapter.validate_python(value, from_attributes=True), **self.options)
+    
+    def render(self, value: Any, response: Response, status_code: int) -> Response:
+        if isinstance(value, Response):
+            return value
+        
+        rendered = JSONBytesResponse(self.dumps(value), status_code=response.status_code or status_code)
+        # 依賴注入的 Response 上設定的標頭（ETag 等）
+        rendered.headers.raw.extend(response.headers.raw)
+        return rendered
+
+
+_RESPONSE_PARAM = '_serializer_response'
+
+
+def _wrap_endpoint(endpoint: Callable, serializer: ResponseSerializer, status_code: int) -> Callable:
+    """
+    包裝端點，使其回傳已序列化的 Response，FastAPI 因此不再處理 response_model
+    
+    包裝後的簽名多一個 Response 參數，取得依賴中設定的標頭與狀態碼。
+    """
+    signature = get_typed_signature(endpoint)
+    parameters = [
+        *signature.parameters.values(),
+        inspect.Parameter(_RESPONSE_PARAM, inspect.Parameter.KEYWORD_ONLY, annotation=Response)
+    ]
+    
+    if asyncio.iscoroutinefunction(endpoint):
+        @wraps(endpoint)
+        async def wrapper(**kwargs):
+            response = kwargs.pop(_RESPONSE_PARAM)
+            return serializer.render(await endpoint(**kwargs), response, status_code)
+    else:
+        # 同步端點在執行緒池中執行，序列化也一併在執行緒池中完成，不佔用事件迴圈
+        @wraps(endpoint)
+        def wrapper(**kwargs):
+            response = kwargs.pop(_RESPONSE_PARAM)
+            return serializer.render(endpoint(**kwargs), response, status_code)
+    
+    wrapper.__signature__ = signature.replace(parameters=parameters)
+    wrapper.__serializer__ = serializer
+    return wrapper
+
+
+class FastJSONRoute(APIRoute):
+    """
+    以 ResponseSerializer 序列化回應的路由，以 APIRouter(route_class=FastJSONRoute) 啟用
+    
+    只作用於明確指定 response_model 的路由；OpenAPI 文件不變。
+    使用 response_model_include / exclude 的路由，或 FAST_JSON_RESPONSES 為 False 時，沿用 FastAPI 的序列化。
+    """
+    
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs):
+        response_model = kwargs.get('response_model')
+        if (
+            settings.FAST_JSON_RESPONSES
+            # include_router 以已包裝的端點重新建立路由
+            and not hasattr(endpoint, '__serializer__')
+            and response_model is not None
+            and not isinstance(response_model, DefaultPlaceholder)
+            and kwargs.get('response_model_include') is None
+            and kwargs.get('response_model_exclude') is None
+        ):
+            serializer = ResponseSerializer(
+                response_model,
+                exclude_unset=kwargs.get('response_model_exclude_unset', False),
+                exclude_defaults=kwargs.get('response_model_exclude_defaults', False),
+                exclude_none=kwargs.get('response_model_exclude_none', False),
+                by_alias=kwargs.get('response_model_by_alias', True)
+            )
+            endpoint = _wrap_endpoint(endpoint, serializer, kwargs.get('status_code') or 200)
+        
+        super().__init__(path, endpoint, **kwargs)
@@ -0,0 +1,194 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from threading import Lock
+from typing import Optional
+import math
+import time
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+
+
+class ThrottleStorage(ABC):
+    """
+    限流狀態的儲存介面
+    
+    預設使用行程內的 LocalThrottleStorage；多個 worker 需要共用狀態時，
+    可實作此介面改接 Redis 等外部儲存。
+    """
+    
+    @abstractmethod
+    def add_attempt(self, key: str, now: float, window: float) -> int:
+        """記錄一次嘗試，並回傳滑動視窗內的嘗試次數（含本次）"""
+    
+    @abstractmethod
+    def get_penalty(self, key: str, now: float) -> tuple[int, float]:
+        """回傳 (累計封鎖次數, 封鎖到期時間)"""
+    
+    @abstractmethod
+    def set_penalty(self, key: str, strikes: int, blocked_until: float, expire_at: float) -> None:
+        """寫入封鎖狀態並清空視窗內紀錄，expire_at 之後累計次數歸零"""
+    
+    @abstractmethod
+    def reset(self, key: str) -> None:
+        """清除該鍵的所有狀態"""
+    
+    @abstractmethod
+    def clear(self) -> None:
+        """清除所有狀態"""
+
+
+class LocalThrottleStorage(ThrottleStorage):
+    """行程內的滑動視窗紀錄，超過 maxsize 個鍵時淘汰最久未使用的鍵"""
+    
+    def __init__(self, maxsize: int = 100000):
+        self.maxsize = maxsize
+        
+        self._attempts: OrderedDict[str, deque] = OrderedDict()
+        self._penalties: dict[str, tuple[int, float, float]] = {}
+        self._lock = Lock()
+    
+    def add_attempt(self, key: str, now: float, window: float) -> int:
+        with self._lock:
+            attempts = self._attempts.get(key)
+            if attempts is None:
+                attempts = self._attempts[key] = deque()
+            self._attempts.move_to_end(key)
+            
+            while attempts and attempts[0] <= now - window:
+                attempts.popleft()
+            attempts.append(now)
+            
+            while len(self._attempts) > self.maxsize:
+                evicted, _ = self._attempts.popitem(last=False)
+                self._penalties.pop(evicted, None)
+            
+            return len(attempts)
+    
+    def get_penalty(self, key: str, now: float) -> tuple[int, float]:
+        with self._lock:
+            penalty = self._penalties.get(key)
+            if penalty is None:
+                return 0, 0.0
+            
+            strikes, blocked_until, expire_at = penalty
+            if expire_at <= now:
+                del self._penalties[key]
+                return 0, 0.0
+            
+            return strikes, blocked_until
+    
+    def set_penalty(self, key: str, strikes: int, blocked_until: float, expire_at: float) -> None:
+        with self._lock:
+            self._penalties[key] = (strikes, blocked_until, expire_at)
+            if key in self._attempts:
+                self._attempts[key].clear()
+    
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._attempts.pop(key, None)
+            self._penalties.pop(key, None)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._attempts.clear()
+            self._penalties.clear()
+
+
+class LoginThrottle:
+    """
+    登入嘗試的滑動視窗限流，分別以用戶名稱與來源 IP 計算
+    
+    視窗內嘗試次數超過上限即封鎖該鍵，封鎖時間隨累計次數倍增
+    （backoff_base * 2^(n-1)，最多 backoff_max 秒）。
+    檢查在查詢資料庫與驗證密碼之前進行，被拒絕的嘗試不會消耗 bcrypt。
+    """
+    
+    class Exceptions:
+        @staticmethod
+        def too_many_attempts(retry_after: float) -> HTTPException:
+            return HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail='登入嘗試次數過多，請稍後再試',
+                headers={'Retry-After': str(math.ceil(retry_after))}
+            )
+    
+    def __init__(
+        self,
+        storage: ThrottleStorage,
+        username_limit: int,
+        ip_limit: int,
+        window: float,
+        backoff_base: float,
+        backoff_max: float,
+        enabled: bool = True
+        ):
+        self.storage = storage
+        self.limits = {'user': username_limit, 'ip': ip_limit}
+        self.window = window
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.enabled = enabled
+        
+        # 同步路由在多個執行緒中呼叫 check，計數需加鎖（儲存的鎖可能在外部，不共用）
+        self.rejected = 0
+        self._lock = Lock()
+    
+    def _reject(self, retry_after: float) -> HTTPException:
+        with self._lock:
+            self.rejected += 1
+        return self.Exceptions.too_many_attempts(retry_after)
+    
+    @staticmethod
+    def _keys(username: str, client_ip: Optional[str]) -> list[tuple[str, str]]:
+        keys = [('user', f'user:{username.strip().lower()}')]
+        if client_ip:
+            keys.append(('ip', f'ip:{client_ip}'))
+        return keys
+    
+    def check(self, username: str, client_ip: Optional[str]) -> None:
+        """記錄一次登入嘗試，超過上限或仍在封鎖期間則拋出 429"""
+        if not self.enabled:
+            return
+        
+        now = time.time()
+        keys = self._keys(username, client_ip)
+        
+        for _, key in keys:
+            _, blocked_until = self.storage.get_penalty(key, now)
+            if blocked_until > now:
+                raise self._reject(blocked_until - now)
+        
+        for kind, key in keys:
+            attempts = self.storage.add_attempt(key, now, self.window)
+            if attempts > self.limits[kind]:
+                strikes, _ = self.storage.get_penalty(key, now)
+                strikes += 1
+                duration = min(self.backoff_base * 2 ** (strikes - 1), self.backoff_max)
+                blocked_until = now + duration
+                self.storage.set_penalty(key, strikes, blocked_until, blocked_until + self.backoff_max)
+                
+                raise self._reject(duration)
+    
+    def reset(self, username: str) -> None:
+        """登入成功後清除該用戶名稱的紀錄（來源 IP 的紀錄保留）"""
+        self.storage.reset(self._keys(username, None)[0][1])
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'rejected': self.rejected
+            }
+
+
+login_throttle = LoginThrottle(
+    LocalThrottleStorage(),
+    username_limit=settings.LOGIN_THROTTLE_USERNAME_LIMIT,
+    ip_limit=settings.LOGIN_THROTTLE_IP_LIMIT,
+    window=settings.LOGIN_THROTTLE_WINDOW_SECONDS,
+    backoff_base=settings.LOGIN_THROTTLE_BACKOFF_BASE_SECONDS,
+    backoff_max=settings.LOGIN_THROTTLE_BACKOFF_MAX_SECONDS,
+    enabled=settings.LOGIN_THROTTLE_ENABLED
+)
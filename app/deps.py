@@ -1,14 +1,50 @@
 from fastapi import  Depends
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Annotated
 
-from app.core.models import get_db, User
-from app.services.auth import AuthService
+from app.core.etag import Conditional
+from app.core.filters import task_filters, task_sort
+from app.core.models import get_db, get_async_db, User
+from app.core.pagination import CursorParams, cursor_params
+from app.core.projection import Projection
+from app.core.schemas import Principal
+from app.services.auth import AuthService, OAuth2
+from app.services.aio import AsyncAuthService
+from app.services.task import TASK_PROJECTION
+from app.services.tag import TAG_PROJECTION
+from app.services.user import USER_PROJECTION
 
 # DB Session
 SessionDEP = Annotated[Session, Depends(get_db)]
+AsyncSessionDEP = Annotated[AsyncSession, Depends(get_async_db)]
 
 # Authorization
-UserDEP = Annotated[User, Depends(AuthService.is_user)]
-SuperUserDEP = Annotated[User, Depends(AuthService.is_superuser)]
-AdminDEP = Annotated[User, Depends(AuthService.is_admin)]
\ No newline at end of file
+TokenDEP = Annotated[str, Depends(OAuth2)]
+UserDEP = Annotated[Principal, Depends(AuthService.is_user)]
+SuperUserDEP = Annotated[Principal, Depends(AuthService.is_superuser)]
+AdminDEP = Annotated[Principal, Depends(AuthService.is_admin)]
+
+# 需要完整 ORM 物件時使用
+CurrentUserDEP = Annotated[User, Depends(AuthService.get_current_user)]
+
+# 非同步路由使用（與 AsyncSessionDEP 搭配）
+AsyncUserDEP = Annotated[Principal, Depends(AsyncAuthService.is_user)]
+AsyncSuperUserDEP = Annotated[Principal, Depends(AsyncAuthService.is_superuser)]
+AsyncAdminDEP = Annotated[Principal, Depends(AsyncAuthService.is_admin)]
+AsyncCurrentUserDEP = Annotated[User, Depends(AsyncAuthService.get_current_user)]
+
+# 游標分頁：cursor / size 查詢參數
+CursorDEP = Annotated[CursorParams, Depends(cursor_params)]
+
+# 條件式請求：If-None-Match / If-Match 與回應的 ETag
+ConditionalDEP = Annotated[Conditional, Depends(Conditional)]
+
+# 任務列表的篩選（標籤、優先度、難度、時間範圍）與排序查詢參數
+TaskFilterDEP = Annotated[dict, Depends(task_filters)]
+TaskSortDEP = Annotated[dict, Depends(task_sort)]
+
+# 稀疏欄位：fields / include 查詢參數
+TaskProjectionDEP = Annotated[Projection, Depends(TASK_PROJECTION.query())]
+TagProjectionDEP = Annotated[Projection, Depends(TAG_PROJECTION.query())]
+UserProjectionDEP = Annotated[Projection, Depends(USER_PROJECTION.query())]
\ No newline at end of file
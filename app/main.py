@@ -1,7 +1,10 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi_pagination import add_pagination
+from sqlalchemy.orm.exc import StaleDataError
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
 
 from .v1.api import router as v1_router
@@ -19,14 +22,37 @@ def get_application():
         allow_credentials=False,
         allow_methods=["*"],
         allow_headers=["*"],
+        # 跨來源的前端需要讀取 ETag（If-Match / If-None-Match）與 503 / 429 的 Retry-After
+        expose_headers=["ETag", "Retry-After"],
     )
     
+    if settings.COMPRESSION_ENABLED:
+        _app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+            level=settings.COMPRESSION_LEVEL,
+            stream_threshold=settings.COMPRESSION_STREAM_THRESHOLD,
+            thread_threshold=settings.COMPRESSION_THREAD_THRESHOLD,
+            workers=settings.COMPRESSION_WORKERS,
+        )
+    
     return _app
 
 
+async def stale_data_handler(request: Request, exc: StaleDataError):
+    # UPDATE / DELETE 的 WHERE version 不符：讀取後資料已被其他請求修改
+    return JSONResponse(
+        status_code=status.HTTP_409_CONFLICT,
+        content={'detail': 'Resource was modified by another request'}
+    )
+
+
 app = get_application()
 
 app.include_router(v1_router)
 
+# 樂觀並行控制的衝突
+app.add_exception_handler(StaleDataError, stale_data_handler)
+
 # Pagination
 add_pagination(app)
\ No newline at end of file
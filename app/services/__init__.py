@@ -1,4 +1,6 @@
 from .user import *
 from .task import *
 from .tag import *
-from .auth import *
\ No newline at end of file
+from .auth import *
+from .stats import *
+from .aio import *
\ No newline at end of file
@@ -0,0 +1,10 @@
+"""
+非同步版本的服務層，搭配 AsyncSession 使用
+
+與同步版本共用快取、例外與查詢條件；路由可以逐一改用
+AsyncSessionDEP 與這裡的服務，同步路徑（測試、init_db.py）維持不變。
+"""
+from .user import *
+from .task import *
+from .tag import *
+from .auth import *
\ No newline at end of file
@@ -0,0 +1,166 @@
+from sqlalchemy import select, update, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException, Depends, status
+from datetime import datetime
+from typing import Optional
+
+from app.core.throttle import login_throttle
+from app.core.models import get_async_db, User, Role, RefreshToken, RevokedToken
+from app.core.schemas import AuthLogin, Principal
+from app.services.auth import AuthService, OAuth2
+from app.core.bloom import BloomFilter
+
+
+class AsyncAuthService:
+    """AuthService 的非同步版本，快取與撤銷清單和同步版本共用"""
+    
+    Exceptions = AuthService.Exceptions
+    
+    @classmethod
+    async def _issue_tokens(cls, db: AsyncSession, user_id: int, role_id: int, family_id: str = None) -> dict:
+        refresh_token, row = AuthService._new_refresh_token(user_id, family_id)
+        db.add(row)
+        await db.commit()
+        
+        return AuthService._token_response(user_id, role_id, refresh_token)
+    
+    @classmethod
+    async def login(cls, db: AsyncSession, data: AuthLogin, client_ip: Optional[str] = None):
+        login_throttle.check(data.username, client_ip)
+        
+        user = await db.scalar(select(User).where(User.username == data.username))
+        if not user:
+            raise cls.Exceptions.USER_NOT_FOUND
+        
+        # bcrypt 在專用執行緒池執行，等待期間不佔用事件迴圈
+        if not await user.verify_password_async(data.password):
+            raise cls.Exceptions.WRONG_PASSWORD
+        
+        login_throttle.reset(data.username)
+        
+        response = await cls._issue_tokens(db, user.id, user.role_id)
+        response['user'] = user
+        
+        return response
+    
+    @classmethod
+    async def refresh(cls, db: AsyncSession, refresh_token: str) -> dict:
+        now = datetime.utcnow()
+        token = await db.scalar(select(RefreshToken).where(
+            RefreshToken.token_hash == AuthService._hash_refresh_token(refresh_token)
+        ))
+        if not token or token.expires_at <= now:
+            raise cls.Exceptions.INVALID_REFRESH_TOKEN
+        
+        rotated = await db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.id == token.id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        if not rotated.rowcount:
+            await cls.revoke_refresh_tokens(db, family_id=token.family_id)
+            await db.commit()
+            raise cls.Exceptions.INVALID_REFRESH_TOKEN
+        
+        principal = await cls._load_principal(db, token.user_id)
+        
+        return await cls._issue_tokens(db, principal.id, principal.role_id, token.family_id)
+    
+    @classmethod
+    async def logout(cls, db: AsyncSession, token: str, refresh_token: Optional[str] = None) -> None:
+        user_id, jti, exp = AuthService._decode_token(token)
+        
+        if refresh_token:
+            refresh = await db.scalar(select(RefreshToken).where(
+                RefreshToken.token_hash == AuthService._hash_refresh_token(refresh_token),
+                RefreshToken.user_id == user_id
+            ))
+            if refresh:
+                await cls.revoke_refresh_tokens(db, family_id=refresh.family_id)
+        
+        if jti and exp:
+            await cls.revoke_access_token(db, jti, datetime.utcfromtimestamp(exp))
+        
+        await db.commit()
+    
+    @classmethod
+    async def revoke_refresh_tokens(cls, db: AsyncSession, user_id: int = None, family_id: str = None) -> None:
+        statement = update(RefreshToken).where(RefreshToken.revoked_at.is_(None))
+        if user_id is not None:
+            statement = statement.where(RefreshToken.user_id == user_id)
+        if family_id is not None:
+            statement = statement.where(RefreshToken.family_id == family_id)
+        
+        await db.execute(
+            statement.values(revoked_at=datetime.utcnow()).execution_options(synchronize_session=False)
+        )
+    
+    @classmethod
+    async def revoke_access_token(cls, db: AsyncSession, jti: str, expires_at: datetime) -> None:
+        await db.execute(
+            delete(RevokedToken)
+            .where(RevokedToken.expires_at <= datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        await db.merge(RevokedToken(jti=jti, expires_at=expires_at))
+        
+        (await cls._revocation_filter(db)).add(jti)
+    
+    @classmethod
+    async def _revocation_filter(cls, db: AsyncSession) -> BloomFilter:
+        if AuthService._revocation_filter_stale():
+            jtis = (await db.scalars(AuthService._revocation_filter_query())).all()
+            return AuthService._build_revocation_filter(jtis)
+        
+        return AuthService._revoked_filter
+    
+    @classmethod
+    async def is_revoked(cls, db: AsyncSession, jti: Optional[str]) -> bool:
+        if not jti or jti not in await cls._revocation_filter(db):
+            return False
+        
+        return await db.get(RevokedToken, jti) is not None
+    
+    @classmethod
+    async def _load_principal(cls, db: AsyncSession, user_id: int) -> Principal:
+        principal, version = AuthService._cached_principal(user_id)
+        if principal is not None:
+            return principal
+        
+        row = (await db.execute(AuthService._principal_query(user_id))).first()
+        return AuthService._store_principal(row, version)
+    
+    @classmethod
+    async def is_user(cls, db: AsyncSession = Depends(get_async_db), token: str = Depends(OAuth2)) -> Principal:
+        user_id, jti, _ = AuthService._decode_token(token)
+        if await cls.is_revoked(db, jti):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+        
+        return await cls._load_principal(db, user_id)
+    
+    @classmethod
+    async def is_superuser(cls, db: AsyncSession = Depends(get_async_db), token: str = Depends(OAuth2)) -> Principal:
+        user = await cls.is_user(db, token)
+        if user.role_id in (Role.SUPERUSER, Role.ADMIN):
+            return user
+        else:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="使用者權限不足，無法進行此操作")
+    
+    @classmethod
+    async def is_admin(cls, db: AsyncSession = Depends(get_async_db), token: str = Depends(OAuth2)) -> Principal:
+        user = await cls.is_user(db, token)
+        if user.role_id == Role.ADMIN:
+            return user
+        else:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="使用者權限不足，無法進行此操作")
+    
+    @classmethod
+    async def get_current_user(cls, db: AsyncSession = Depends(get_async_db), token: str = Depends(OAuth2)) -> User:
+        principal = await cls.is_user(db, token)
+        
+        user = await db.get(User, principal.id)
+        if not user:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+        
+        return user
\ No newline at end of file
@@ -0,0 +1,70 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.models import Tag, Role, touch_collections, touch_tagged_tasks
+from app.core.pagination import Page
+from app.core.schemas import TagCreate, Principal
+from app.services.tag import TagService
+from app.services.utils import update_instance, validate_user_access
+
+
+class AsyncTagService:
+    """TagService 的非同步版本"""
+    
+    Exceptions = TagService.Exceptions
+    
+    @classmethod
+    async def _get_tag_by_id(cls, db: AsyncSession, id: int) -> Tag:
+        tag = await db.get(Tag, id)
+        if not tag:
+            raise cls.Exceptions.tag_not_found(id)
+        
+        return tag
+    
+    @classmethod
+    async def list_tags(cls, db: AsyncSession, user: Principal, is_public) -> Page[dict]:
+        """與 TagService.list_tags 相同，公開標籤來自行程內的快取，只以 SQL 分頁用戶自己的標籤"""
+        return await db.run_sync(TagService.list_tags, user, is_public)
+    
+    @classmethod
+    async def create_tag(cls, db: AsyncSession, user: Principal, data: TagCreate) -> Tag:
+        new_tag = Tag(
+            **data.model_dump(),
+            owner_id=user.id
+        )
+        
+        if user.role_id == Role.ADMIN:
+            new_tag.is_public = True
+        
+        db.add(new_tag)
+        await db.run_sync(touch_collections, [user.id])
+        await db.commit()
+        TagService._invalidate_caches(new_tag)
+        
+        return new_tag
+    
+    @classmethod
+    async def update_tag(cls, db: AsyncSession, user: Principal, id: int, data: TagCreate) -> Tag:
+        tag = await cls._get_tag_by_id(db, id)
+        validate_user_access(user, tag.owner_id)
+        
+        was_public = tag.is_public
+        update_instance(tag, data)
+        if db.is_modified(tag):
+            await db.run_sync(touch_tagged_tasks, [tag.id])
+            await db.run_sync(touch_collections, [tag.owner_id])
+        await db.commit()
+        TagService._invalidate_caches(tag, was_public)
+        
+        return tag
+    
+    @classmethod
+    async def delete_tag(cls, db: AsyncSession, user: Principal, id: int) -> None:
+        tag = await cls._get_tag_by_id(db, id)
+        validate_user_access(user, tag.owner_id)
+        
+        task_owner_ids = await db.run_sync(touch_tagged_tasks, [tag.id])
+        await db.run_sync(touch_collections, [tag.owner_id])
+        await db.delete(tag)
+        await db.commit()
+        TagService._invalidate_caches(tag)
+        TagService._invalidate_task_counts(task_owner_ids)
\ No newline at end of file
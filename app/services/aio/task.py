@@ -0,0 +1,110 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.models import Tag, Task, touch_collections
+from app.core.pagination import Page, count_cache
+from app.core.schemas import TaskCreate, Principal
+from app.services.stats import TaskStatsService
+from app.services.task import TaskService, TASK_RESPONSE_OPTIONS
+from app.services.utils import update_instance, validate_user_access
+
+
+class AsyncTaskService:
+    """TaskService 的非同步版本"""
+    
+    Exceptions = TaskService.Exceptions
+    
+    @classmethod
+    async def _get_task_by_id(cls, db: AsyncSession, id: int) -> Task:
+        # 非同步 session 無法延遲載入，回應需要的 tags 先一併載入
+        task = await db.scalar(select(Task).options(*TASK_RESPONSE_OPTIONS).where(Task.id == id))
+        if not task:
+            raise cls.Exceptions.task_not_found(id)
+        
+        return task
+    
+    @classmethod
+    async def list_tasks(cls, db: AsyncSession, user: Principal, query) -> Page[dict]:
+        """與 TaskService.list_tasks 相同，依 PAGINATION_COUNT_MODE 計算總數"""
+        return await db.run_sync(TaskService.list_tasks, user, query)
+    
+    @classmethod
+    async def get_task(cls, db: AsyncSession, user: Principal, id: int) -> Task:
+        task = await cls._get_task_by_id(db, id)
+        validate_user_access(user, task.user_id)
+        
+        return task
+    
+    @classmethod
+    async def _get_visible_tags(cls, db: AsyncSession, user: Principal, tag_ids: list[int]) -> list[Tag]:
+        """同 TaskService._get_visible_tags：以一次查詢取得標籤，不存在或無權使用時拋出例外"""
+        tag_ids = list(dict.fromkeys(tag_ids))
+        if not tag_ids:
+            return []
+        
+        tags = {tag.id: tag for tag in await db.scalars(select(Tag).where(Tag.id.in_(tag_ids)))}
+        error = TaskService._check_tags(user, tag_ids, tags)
+        if error:
+            raise error
+        
+        return [tags[tag_id] for tag_id in tag_ids]
+    
+    @classmethod
+    async def create_task(cls, db: AsyncSession, user: Principal, data: TaskCreate) -> Task:
+        data = data.model_dump()
+        tag_ids = data.pop('tag_ids')
+        
+        new_task = Task(
+            **data,
+            user_id=user.id
+        )
+        # 標籤驗證失敗時任務尚未寫入；驗證通過後任務與 task_tag_link 在同一次 flush 中寫入
+        new_task.tags = await cls._get_visible_tags(db, user, tag_ids)
+        
+        db.add(new_task)
+        await db.flush()
+        
+        await db.run_sync(touch_collections, [user.id])
+        await db.run_sync(TaskStatsService.apply, user.id, {TaskStatsService.key(new_task): 1})
+        await db.commit()
+        count_cache.invalidate('tasks', user.id)
+        
+        return await cls._get_task_by_id(db, new_task.id)
+    
+    @classmethod
+    async def update_task(cls, db: AsyncSession, user: Principal, id: int, data: TaskCreate) -> Task:
+        task = await cls._get_task_by_id(db, id)
+        validate_user_access(user, task.user_id)
+        
+        tag_ids = list(dict.fromkeys(data.tag_ids))
+        current_tags = {tag.id: tag for tag in task.tags}
+        # 只有新加入的標籤需要驗證，以一次查詢取得
+        new_tags = {
+            tag.id: tag
+            for tag in await cls._get_visible_tags(db, user, [tag_id for tag_id in tag_ids if tag_id not in current_tags])
+        }
+        # 由 ORM 比對集合的差異並遞增版本，在同一次 flush 中刪除與新增 task_tag_link
+        task.tags = [current_tags.get(tag_id) or new_tags[tag_id] for tag_id in tag_ids]
+        
+        old_key = TaskStatsService.key(task)
+        update_instance(task, data)
+        await db.run_sync(touch_collections, [task.user_id])
+        await db.run_sync(TaskStatsService.apply, task.user_id, TaskStatsService.moved(old_key, TaskStatsService.key(task)))
+        await db.commit()
+        count_cache.invalidate('tasks', task.user_id)
+        
+        db.expunge(task)
+        return await cls._get_task_by_id(db, id)
+    
+    @classmethod
+    async def delete_task(cls, db: AsyncSession, user: Principal, id: int) -> Task:
+        task = await cls._get_task_by_id(db, id)
+        validate_user_access(user, task.user_id)
+        
+        await db.delete(task)
+        await db.run_sync(touch_collections, [task.user_id])
+        await db.run_sync(TaskStatsService.apply, task.user_id, {TaskStatsService.key(task): -1})
+        await db.commit()
+        count_cache.invalidate('tasks', task.user_id)
+        
+        return task
\ No newline at end of file
@@ -0,0 +1,142 @@
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import UploadFile
+from uuid import uuid4
+import os
+
+import anyio
+
+from app.core.models import Tag, User, touch_tagged_tasks
+from app.core.pagination import Page, count_cache
+from app.core.schemas import UserCreate, AdminUserCreate, UserPasswordUpdate, Principal
+from app.services.user import UserService, HEADSHOT_PATH, USER_RESPONSE_OPTIONS
+from app.services.auth import AuthService
+from app.services.tag import TagService, public_tags
+from app.services.utils import update_instance
+from .auth import AsyncAuthService
+
+
+class AsyncUserService:
+    """UserService 的非同步版本"""
+    
+    Exceptions = UserService.Exceptions
+    
+    @classmethod
+    async def _get_user_by_username(cls, db: AsyncSession, username: str) -> Optional[User]:
+        return await db.scalar(select(User).where(User.username == username))
+    
+    @classmethod
+    async def _get_user_by_email(cls, db: AsyncSession, email: str) -> Optional[User]:
+        return await db.scalar(select(User).where(User.email == email))
+    
+    @classmethod
+    async def validate_unique_fields(cls, db: AsyncSession, data: UserCreate, user: User = None) -> None:
+        if user:
+            if user.username != data.username and await cls._get_user_by_username(db, data.username):
+                raise cls.Exceptions.USERNAME_EXISTS
+            if user.email != data.email and await cls._get_user_by_email(db, data.email):
+                raise cls.Exceptions.EMAIL_EXISTS
+        else:
+            if await cls._get_user_by_username(db, data.username):
+                raise cls.Exceptions.USERNAME_EXISTS
+            if await cls._get_user_by_email(db, data.email):
+                raise cls.Exceptions.EMAIL_EXISTS
+    
+    @classmethod
+    async def get_user_by_id(cls, db: AsyncSession, id: int) -> User:
+        user = await db.scalar(
+            select(User)
+            .options(*USER_RESPONSE_OPTIONS)
+            .where(User.id == id)
+            .execution_options(populate_existing=True)
+        )
+        if not user:
+            raise cls.Exceptions.user_not_found(id)
+        return user
+    
+    @classmethod
+    async def list_users(cls, db: AsyncSession, role_id: Optional[int]) -> Page[dict]:
+        """與 UserService.list_users 相同，依 PAGINATION_COUNT_MODE 計算總數"""
+        return await db.run_sync(UserService.list_users, role_id)
+    
+    @classmethod
+    async def get_user(cls, db: AsyncSession, cur_user: Principal, id: int = None) -> User:
+        return await cls.get_user_by_id(db, id or cur_user.id)
+    
+    @classmethod
+    async def create_user(cls, db: AsyncSession, data: UserCreate | AdminUserCreate) -> User:
+        await cls.validate_unique_fields(db, data)
+        
+        new_user = User(**data.model_dump())
+        await new_user.encode_password_async()
+        
+        db.add(new_user)
+        await db.commit()
+        count_cache.invalidate('users')
+        return await cls.get_user_by_id(db, new_user.id)
+    
+    @classmethod
+    async def create_admin(cls, db: AsyncSession, data: AdminUserCreate) -> User:
+        return await cls.create_user(db, data)
+    
+    @classmethod
+    async def update_user(cls, db: AsyncSession, cur_user: Principal, data: UserCreate, id: int = None) -> User:
+        user = await cls.get_user_by_id(db, id or cur_user.id)
+        
+        await cls.validate_unique_fields(db, data, user)
+        
+        update_instance(user, data)
+        await db.commit()
+        AuthService.invalidate_user(user.id)
+        return user
+    
+    @classmethod
+    async def update_user_password(cls, db: AsyncSession, cur_user: Principal, data: UserPasswordUpdate) -> User:
+        user = await cls.get_user_by_id(db, cur_user.id)
+        
+        user.password = data.password
+        await user.encode_password_async()
+        await AsyncAuthService.revoke_refresh_tokens(db, user_id=user.id)
+        
+        await db.commit()
+        AuthService.invalidate_user(user.id)
+        return user
+    
+    @classmethod
+    async def delete_user(cls, db: AsyncSession, cur_user: Principal, id: int = None) -> None:
+        user = await cls.get_user_by_id(db, id or cur_user.id)
+        
+        task_owner_ids = await db.run_sync(touch_tagged_tasks, select(Tag.id).where(Tag.owner_id == user.id))
+        await db.delete(user)
+        await db.commit()
+        AuthService.invalidate_user(user.id)
+        count_cache.invalidate('users')
+        count_cache.invalidate('tasks', user.id)
+        TagService._invalidate_task_counts(task_owner_ids)
+        count_cache.invalidate('tags')
+        public_tags.invalidate()
+    
+    @classmethod
+    async def upload_headshot(cls, db: AsyncSession, cur_user: Principal, file: UploadFile):
+        user = await db.get(User, cur_user.id)
+        
+        if not file.content_type.startswith('image/'):
+            raise cls.Exceptions.INVALID_IMAGE_TYPE
+        
+        file_ext = file.filename.split('.')[-1]
+        filename = f"{uuid4()}.{file_ext}"
+        
+        upload_dir = anyio.Path(HEADSHOT_PATH, f'{user.id}/')
+        await upload_dir.mkdir(parents=True, exist_ok=True)
+        
+        file_path = os.path.join(str(upload_dir), filename)
+        await anyio.Path(file_path).write_bytes(await file.read())
+        
+        if user.headshot_filepath and await anyio.Path(user.headshot_filepath).exists():
+            await anyio.Path(user.headshot_filepath).unlink()
+        
+        user.headshot_filepath = file_path
+        await db.commit()
+        
+        return {'filepath': user.headshot_filepath}
\ No newline at end of file
@@ -1,12 +1,23 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, Depends, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt
+from jose import jwt, JWTError
 from datetime import datetime, timedelta
+from hashlib import sha256
+from itertools import count
+from typing import Optional
+from uuid import uuid4
+import secrets
+import time
 
+from app.core.bloom import BloomFilter
+from app.core.cache import TTLCache
 from app.core.config import settings
-from app.core.models import get_db, User, Role
-from app.core.schemas import AuthLogin
+from app.core.throttle import login_throttle
+from app.core.models import get_db, User, Role, RefreshToken, RevokedToken
+from app.core.models.routing import primary_bind
+from app.core.schemas import AuthLogin, Principal
 
 
 SECRET_KEY = settings.SECRET_KEY
@@ -16,65 +27,330 @@ OAuth2 = OAuth2PasswordBearer(tokenUrl='/api/auth/token/')
 
 
 class AuthService:
+    class Exceptions:
+        USER_NOT_FOUND = HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail='該用戶不存在'
+        )
+        WRONG_PASSWORD = HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail='密碼不正確'
+        )
+        INVALID_REFRESH_TOKEN = HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail='refresh token 無效或已過期'
+        )
+    
+    # token -> (user_id, jti, exp)，存活時間不超過 token 本身的 exp
+    token_cache = TTLCache(settings.AUTH_CACHE_MAXSIZE, settings.AUTH_CACHE_TTL_SECONDS)
+    # user_id -> Principal
+    principal_cache = TTLCache(settings.AUTH_CACHE_MAXSIZE, settings.AUTH_CACHE_TTL_SECONDS)
+    
+    # user_id -> 目前的版本號，與 principal_cache 有相同的容量與 TTL；
+    # 項目被淘汰後改用新的版本號，快取中舊版本的 principal 只會多一次未命中
+    _principal_versions = TTLCache(settings.AUTH_CACHE_MAXSIZE, settings.AUTH_CACHE_TTL_SECONDS)
+    _version_counter = count(1)
+    
+    # 已撤銷 jti 的 Bloom filter，定期由 revoked_tokens 重建
+    _revoked_filter: Optional[BloomFilter] = None
+    _revoked_filter_built_at: float = 0.0
+    
     @classmethod
     def create_access_token(cls, data: dict):
         to_encode = data.copy()
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         
-        to_encode.update(exp=expire)
+        to_encode.update(exp=expire, jti=uuid4().hex)
         access_token = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
         
         return access_token
     
+    @staticmethod
+    def _hash_refresh_token(refresh_token: str) -> str:
+        return sha256(refresh_token.encode()).hexdigest()
+    
     @classmethod
-    def login(cls, db: Session, data: AuthLogin):
-        user = db.query(User).filter(User.username == data.username).first()
-        if not user:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='該用戶不存在')
-        
-        if not user.verify_password(data.password):
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='密碼不正確')
-        
+    def _new_refresh_token(cls, user_id: int, family_id: str = None) -> tuple[str, RefreshToken]:
+        refresh_token = secrets.token_urlsafe(32)
+        row = RefreshToken(
+            user_id=user_id,
+            token_hash=cls._hash_refresh_token(refresh_token),
+            family_id=family_id or uuid4().hex,
+            expires_at=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+        )
+        return refresh_token, row
+    
+    @classmethod
+    def _token_response(cls, user_id: int, role_id: int, refresh_token: str) -> dict:
         access_token = cls.create_access_token(
             data={
-                'sub': str(user.id),
-                'role_id': user.role_id
+                'sub': str(user_id),
+                'role_id': role_id
             }
         )
         
-        response = {
+        return {
             'access_token': access_token,
-            'token_type': 'bearer',
-            'user': user
+            'refresh_token': refresh_token,
+            'token_type': 'bearer'
         }
+    
+    @classmethod
+    def _issue_tokens(cls, db: Session, user_id: int, role_id: int, family_id: str = None) -> dict:
+        """發出一組 access token 與 refresh token"""
+        refresh_token, row = cls._new_refresh_token(user_id, family_id)
+        db.add(row)
+        db.commit()
+        
+        return cls._token_response(user_id, role_id, refresh_token)
+    
+    @classmethod
+    def login(cls, db: Session, data: AuthLogin, client_ip: Optional[str] = None):
+        # 在查詢資料庫與驗證密碼之前先限流
+        login_throttle.check(data.username, client_ip)
+        
+        user = db.query(User).filter(User.username == data.username).first()
+        if not user:
+            raise cls.Exceptions.USER_NOT_FOUND
+        
+        if not user.verify_password(data.password):
+            raise cls.Exceptions.WRONG_PASSWORD
+        
+        login_throttle.reset(data.username)
+        
+        response = cls._issue_tokens(db, user.id, user.role_id)
+        response['user'] = user
         
         return response
     
     @classmethod
-    def is_user(cls, db: Session = Depends(get_db), token: str = Depends(OAuth2)) -> User:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    def refresh(cls, db: Session, refresh_token: str) -> dict:
+        """以 refresh token 換發新的 token 組，舊的 refresh token 隨即失效"""
+        now = datetime.utcnow()
+        token = db.query(RefreshToken).filter(
+            RefreshToken.token_hash == cls._hash_refresh_token(refresh_token)
+        ).first()
+        if not token or token.expires_at <= now:
+            raise cls.Exceptions.INVALID_REFRESH_TOKEN
+        
+        # 以條件式更新撤銷，確保同一個 token 只能換發一次
+        rotated = db.query(RefreshToken).filter(
+            RefreshToken.id == token.id,
+            RefreshToken.revoked_at.is_(None)
+        ).update({RefreshToken.revoked_at: now}, synchronize_session=False)
+        if not rotated:
+            # 已撤銷的 token 被重複使用，視為外洩，撤銷整個 family
+            cls.revoke_refresh_tokens(db, family_id=token.family_id)
+            db.commit()
+            raise cls.Exceptions.INVALID_REFRESH_TOKEN
+        
+        principal = cls._load_principal(db, token.user_id)
+        
+        return cls._issue_tokens(db, principal.id, principal.role_id, token.family_id)
+    
+    @classmethod
+    def logout(cls, db: Session, token: str, refresh_token: Optional[str] = None) -> None:
+        """撤銷目前的 access token，以及（若有提供）同一個 session 的 refresh token"""
+        user_id, jti, exp = cls._decode_token(token)
+        
+        if refresh_token:
+            refresh = db.query(RefreshToken).filter(
+                RefreshToken.token_hash == cls._hash_refresh_token(refresh_token),
+                RefreshToken.user_id == user_id
+            ).first()
+            if refresh:
+                cls.revoke_refresh_tokens(db, family_id=refresh.family_id)
+        
+        if jti and exp:
+            cls.revoke_access_token(db, jti, datetime.utcfromtimestamp(exp))
+        
+        db.commit()
+    
+    @classmethod
+    def revoke_refresh_tokens(cls, db: Session, user_id: int = None, family_id: str = None) -> None:
+        """撤銷某用戶或某個 family 的所有 refresh token（由呼叫端 commit）"""
+        query = db.query(RefreshToken).filter(RefreshToken.revoked_at.is_(None))
+        if user_id is not None:
+            query = query.filter(RefreshToken.user_id == user_id)
+        if family_id is not None:
+            query = query.filter(RefreshToken.family_id == family_id)
+        
+        query.update({RefreshToken.revoked_at: datetime.utcnow()}, synchronize_session=False)
+    
+    @classmethod
+    def revoke_access_token(cls, db: Session, jti: str, expires_at: datetime) -> None:
+        """將 access token 加入撤銷清單（由呼叫端 commit），並順便清除已過期的項目"""
+        db.query(RevokedToken).filter(RevokedToken.expires_at <= datetime.utcnow()).delete(synchronize_session=False)
+        db.merge(RevokedToken(jti=jti, expires_at=expires_at))
+        
+        cls._revocation_filter(db).add(jti)
+    
+    @classmethod
+    def _revocation_filter_stale(cls) -> bool:
+        return (
+            cls._revoked_filter is None
+            or time.monotonic() - cls._revoked_filter_built_at > settings.REVOCATION_FILTER_REFRESH_SECONDS
+        )
+    
+    @classmethod
+    def _revocation_filter_query(cls):
+        return select(RevokedToken.jti).where(RevokedToken.expires_at > datetime.utcnow())
+    
+    @classmethod
+    def _build_revocation_filter(cls, jtis: list[str]) -> BloomFilter:
+        revoked_filter = BloomFilter(
+            max(settings.REVOCATION_FILTER_CAPACITY, len(jtis) * 2),
+            settings.REVOCATION_FILTER_ERROR_RATE
+        )
+        for jti in jtis:
+            revoked_filter.add(jti)
+        
+        AuthService._revoked_filter = revoked_filter
+        AuthService._revoked_filter_built_at = time.monotonic()
+        
+        return revoked_filter
+    
+    @classmethod
+    def _revocation_filter(cls, db: Session) -> BloomFilter:
+        """
+        取得撤銷清單的 Bloom filter，超過重建間隔才讀取資料庫（同步其他 worker 的撤銷）
+        
+        撤銷清單一律讀取 primary：GET 請求的 session 會導向 replica，複寫延遲期間剛撤銷的 token 仍會被接受。
+        """
+        if cls._revocation_filter_stale():
+            return cls._build_revocation_filter(db.scalars(cls._revocation_filter_query(), bind_arguments=primary_bind(db)).all())
+        
+        return cls._revoked_filter
+    
+    @classmethod
+    def is_revoked(cls, db: Session, jti: Optional[str]) -> bool:
+        """Bloom filter 判定不存在即可直接放行，只有疑似命中時才查詢資料庫確認"""
+        if not jti or jti not in cls._revocation_filter(db):
+            return False
+        
+        return db.scalar(select(RevokedToken.jti).where(RevokedToken.jti == jti), bind_arguments=primary_bind(db)) is not None
+    
+    @classmethod
+    def _decode_token(cls, token: str) -> tuple[int, Optional[str], Optional[float]]:
+        """解碼 token 並取得 (user_id, jti, exp)，結果會快取至 token 到期為止"""
+        decoded = cls.token_cache.get(token)
+        if decoded is not None:
+            return decoded
+        
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+        
         user_id = payload.get('sub')
         if not user_id:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
-
-        user = db.query(User).filter(User.id == user_id).first()
-        if not user:
+        
+        exp = payload.get('exp')
+        decoded = (int(user_id), payload.get('jti'), exp)
+        cls.token_cache.set(token, decoded, ttl=exp - time.time() if exp else None)
+        
+        return decoded
+    
+    @classmethod
+    def _principal_version(cls, user_id: int) -> int:
+        # 沒有版本號時不視為 0：查詢期間的失效若已被淘汰，讀到的版本也不會與查詢前相同
+        version = cls._principal_versions.get(user_id)
+        if version is None:
+            version = next(cls._version_counter)
+            cls._principal_versions.set(user_id, version)
+        return version
+    
+    @classmethod
+    def _cached_principal(cls, user_id: int) -> tuple[Optional[Principal], int]:
+        """回傳 (快取中的 principal 或 None, 目前的版本)"""
+        version = cls._principal_version(user_id)
+        principal = cls.principal_cache.get(user_id)
+        if principal is not None and principal.version == version:
+            return principal, version
+        
+        return None, version
+    
+    @classmethod
+    def _store_principal(cls, row, version: int) -> Principal:
+        if not row:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
-
-        return user
         
+        principal = Principal(id=row.id, role_id=row.role_id, version=version)
+        # 查詢期間若已被失效，則不寫入快取，避免存回過期的角色
+        if cls._principal_version(row.id) == version:
+            cls.principal_cache.set(row.id, principal)
+        
+        return principal
+    
     @classmethod
-    def is_superuser(cls, db: Session = Depends(get_db), token: str = Depends(OAuth2)) -> User:
+    def _principal_query(cls, user_id: int):
+        return select(User.id, User.role_id).where(User.id == user_id)
+    
+    @classmethod
+    def _load_principal(cls, db: Session, user_id: int) -> Principal:
+        principal, version = cls._cached_principal(user_id)
+        if principal is not None:
+            return principal
+        
+        return cls._store_principal(db.execute(cls._principal_query(user_id)).first(), version)
+    
+    @classmethod
+    def invalidate_user(cls, user_id: int) -> None:
+        """
+        用戶資料異動或刪除時呼叫，使其 principal 快取失效
+        
+        只作用於目前的行程，其他 worker 最多在 AUTH_CACHE_TTL_SECONDS 內仍使用舊的角色或已刪除的用戶。
+        """
+        cls._principal_versions.set(user_id, next(cls._version_counter))
+        cls.principal_cache.pop(user_id)
+    
+    @classmethod
+    def clear_cache(cls) -> None:
+        cls.token_cache.clear()
+        cls.principal_cache.clear()
+        cls._principal_versions.clear()
+        AuthService._revoked_filter = None
+    
+    @classmethod
+    def cache_stats(cls) -> dict:
+        return {
+            'token': cls.token_cache.stats(),
+            'principal': cls.principal_cache.stats(),
+            'revoked_filter_size': cls._revoked_filter.count if cls._revoked_filter else 0
+        }
+    
+    @classmethod
+    def is_user(cls, db: Session = Depends(get_db), token: str = Depends(OAuth2)) -> Principal:
+        user_id, jti, _ = cls._decode_token(token)
+        if cls.is_revoked(db, jti):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+        
+        return cls._load_principal(db, user_id)
+    
+    @classmethod
+    def is_superuser(cls, db: Session = Depends(get_db), token: str = Depends(OAuth2)) -> Principal:
         user = cls.is_user(db, token)
         if user.role_id in (Role.SUPERUSER, Role.ADMIN):
             return user
         else:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="使用者權限不足，無法進行此操作")
-        
+    
     @classmethod
-    def is_admin(cls, db: Session = Depends(get_db), token: str = Depends(OAuth2)) -> User:
+    def is_admin(cls, db: Session = Depends(get_db), token: str = Depends(OAuth2)) -> Principal:
         user = cls.is_user(db, token)
         if user.role_id == Role.ADMIN:
             return user
         else:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="使用者權限不足，無法進行此操作")
\ No newline at end of file
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="使用者權限不足，無法進行此操作")
+    
+    @classmethod
+    def get_current_user(cls, db: Session = Depends(get_db), token: str = Depends(OAuth2)) -> User:
+        """只有需要完整 ORM 物件（例如修改自己的資料）時才載入"""
+        principal = cls.is_user(db, token)
+        
+        user = db.get(User, principal.id)
+        if not user:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+        
+        return user
@@ -0,0 +1,112 @@
+from collections import Counter
+from typing import Iterable, Optional
+
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.core.models import Task, UserTaskStats
+
+
+# user_task_stats 的分組欄位（不含 user_id）
+STATS_FIELDS = ('is_completed', 'priority', 'difficulty')
+
+
+class TaskStatsService:
+    """維護 user_task_stats：任務寫入時的增量更新，以及由 tasks 重新計算"""
+    
+    @staticmethod
+    def key(task) -> tuple:
+        """任務（ORM 物件或查詢結果列）所屬的分組"""
+        return tuple(getattr(task, field) for field in STATS_FIELDS)
+    
+    @staticmethod
+    def moved(old: tuple, new: tuple) -> Counter:
+        """一個任務由 old 分組改為 new 分組的增減，分組相同時沒有增減"""
+        deltas = Counter({old: -1})
+        deltas[new] += 1
+        return deltas
+    
+    @classmethod
+    def update_deltas(cls, rows: Iterable, values: dict) -> Counter:
+        """批次更新時各分組的增減；rows 為更新前的任務，values 為要套用的欄位"""
+        deltas = Counter()
+        for row in rows:
+            old = cls.key(row)
+            new = tuple(values.get(field, value) for field, value in zip(STATS_FIELDS, old))
+            deltas[old] -= 1
+            deltas[new] += 1
+        return deltas
+    
+    @classmethod
+    def apply(cls, db: Session, user_id: int, deltas: dict[tuple, int]) -> None:
+        """
+        以單一 INSERT ... ON CONFLICT DO UPDATE 將各分組的增減累加到統計表，不提交
+        
+        需在任務寫入的交易中、touch_collections 之後呼叫：同一用戶的寫入已由 users 資料列的鎖序列化，
+        統計表的更新不會互相等待。
+        """
+        rows = [
+            {'user_id': user_id, **dict(zip(STATS_FIELDS, key)), 'count': delta}
+            for key, delta in deltas.items()
+            if delta
+        ]
+        if not rows:
+            return
+        
+        dialect = postgresql if db.get_bind().dialect.name == 'postgresql' else sqlite
+        stmt = dialect.insert(UserTaskStats).values(rows)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=['user_id', *STATS_FIELDS],
+            set_={'count': UserTaskStats.count + stmt.excluded.count}
+        ))
+    
+    @classmethod
+    def rebuild(cls, db: Session, user_ids: Optional[list[int]] = None, fix: bool = True) -> list[dict]:
+        """
+        由 tasks 重新計算統計，回傳與統計表不一致的分組
+        
+        user_ids 為 None 時檢查所有用戶。fix 為 True 且有不一致時，以重新計算的結果取代統計表並提交。
+        PostgreSQL 上先以 EXCLUSIVE 鎖定統計表：期間寫入的任務會在更新統計時等待，
+        重建提交後才套用它們的增減，不會遺失也不會重複計算。
+        """
+        if fix and db.get_bind().dialect.name == 'postgresql':
+            db.execute(text('LOCK TABLE user_task_stats IN EXCLUSIVE MODE'))
+        
+        group = (Task.user_id, *(getattr(Task, field) for field in STATS_FIELDS))
+        expected_stmt = select(*group, func.count()).group_by(*group)
+        actual_stmt = select(
+            UserTaskStats.user_id,
+            *(getattr(UserTaskStats, field) for field in STATS_FIELDS),
+            UserTaskStats.count
+        )
+        if user_ids is not None:
+            expected_stmt = expected_stmt.where(Task.user_id.in_(user_ids))
+            actual_stmt = actual_stmt.where(UserTaskStats.user_id.in_(user_ids))
+        
+        expected = {tuple(row[:-1]): row[-1] for row in db.execute(expected_stmt)}
+        actual = {tuple(row[:-1]): row[-1] for row in db.execute(actual_stmt)}
+        
+        drift = [
+            {
+                'user_id': key[0],
+                **dict(zip(STATS_FIELDS, key[1:])),
+                'expected': expected.get(key, 0),
+                'actual': actual.get(key, 0)
+            }
+            for key in sorted(
+                expected.keys() | actual.keys(),
+                key=lambda key: (key[0], key[1], key[2].value, key[3].value)
+            )
+            if expected.get(key, 0) != actual.get(key, 0)
+        ]
+        
+        if fix and drift:
+            stmt = delete(UserTaskStats)
+            if user_ids is not None:
+                stmt = stmt.where(UserTaskStats.user_id.in_(user_ids))
+            db.execute(stmt)
+            db.execute(insert(UserTaskStats).from_select(['user_id', *STATS_FIELDS, 'count'], expected_stmt))
+        db.commit()
+        
+        return drift
\ No newline at end of file
@@ -1,13 +1,69 @@
+from sqlalchemy import Select, delete, select
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
-from fastapi_pagination import Page
-from fastapi_pagination.ext.sqlalchemy import paginate
+from threading import Lock
+import heapq
 
-from app.core.models import Tag, User, Role
-from app.core.schemas import TagCreate
+from app.core.config import settings
+from app.core.etag import Conditional, entity_etag
+from app.core.models import Tag, Role, touch_collections, touch_tagged_tasks
+from app.core.cache import TTLCache
+from app.core.pagination import CursorPage, CursorParams, Page, count_cache, cursor_page, paginate, paginate_merged, parse_cursor
+from app.core.projection import Projection, ProjectionSpec
+from app.core.schemas import TagCreate, TagResponse, Principal
 from .utils import update_instance, validate_user_access
 
 
+TAG_PROJECTION = ProjectionSpec(Tag, TagResponse, required=('owner_id', 'is_public', 'version'))
+
+
+class PublicTagCatalog:
+    """
+    公開標籤的行程內快取
+    
+    公開標籤只有管理員會建立，幾乎不會變動；用戶的標籤列表由這份快取與用戶自己的標籤合併而成。
+    失效只作用於目前的行程，其他 worker 由 TTL 限制看到舊資料的時間。
+    """
+    
+    def __init__(self, ttl: float):
+        self._cache = TTLCache(1, ttl)
+        self._version = 0
+        self._lock = Lock()
+    
+    def get(self, db: Session) -> tuple[TagResponse, ...]:
+        """依 id 排序的所有公開標籤"""
+        tags = self._cache.get('public')
+        if tags is None:
+            with self._lock:
+                version = self._version
+            
+            tags = tuple(
+                TagResponse.model_validate(tag)
+                for tag in db.scalars(select(Tag).where(Tag.is_public == True).order_by(Tag.id))
+            )
+            # 查詢期間發生失效時，結果可能已經過時，不寫入快取
+            with self._lock:
+                if version == self._version:
+                    self._cache.set('public', tags)
+        
+        return tags
+    
+    def invalidate(self) -> None:
+        with self._lock:
+            self._version += 1
+            self._cache.pop('public')
+    
+    def clear(self) -> None:
+        self.invalidate()
+        self._cache.clear()
+    
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+public_tags = PublicTagCatalog(settings.PUBLIC_TAG_CACHE_TTL_SECONDS)
+
+
 class TagService:
     """處理標籤的業務邏輯"""
     
@@ -19,6 +75,11 @@ class TagService:
                 detail=f'Tag with id {id} does not exist'
             )
         
+        BULK_DELETE_NO_CRITERIA = HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Either ids or a filter is required'
+        )
+        
     @classmethod
     def _get_tag_by_id(cls, db: Session, id: int) -> Tag:
         tag = db.query(Tag).filter(Tag.id == id).first()
@@ -28,18 +89,116 @@ class TagService:
         return tag
     
     @classmethod
-    def list_tags(cls, db: Session, user: User, is_public) -> Page[Tag]:
-        public_tags = db.query(Tag).filter(Tag.is_public == True)
-        user_tags = db.query(Tag).join(User.tags).filter(User.id == user.id)
-        if is_public:
-            tags = public_tags.union(user_tags).order_by(Tag.id)
+    def _invalidate_caches(cls, tag: Tag, was_public: bool = False) -> None:
+        # 公開標籤出現在每位用戶的列表中，私人標籤只影響擁有者
+        if tag.is_public or was_public:
+            count_cache.invalidate('tags')
+            public_tags.invalidate()
         else:
-            tags = user_tags
+            count_cache.invalidate('tags', tag.owner_id)
+    
+    @classmethod
+    def _invalidate_task_counts(cls, user_ids: list[int]) -> None:
+        # 刪除標籤會 CASCADE 刪除 task_tag_link，這些用戶以標籤篩選的任務總數隨之改變
+        for user_id in user_ids:
+            count_cache.invalidate('tasks', user_id)
+    
+    @classmethod
+    def _own_tags_query(cls, user: Principal, *options, private_only: bool = False, after_id: int = None) -> Select:
+        """
+        用戶自己的標籤（使用 owner_id 索引），依 id 排序
+        
+        private_only 時不含公開標籤：與公開標籤的快取合併時，管理員自己的標籤已在快取中。
+        """
+        tags = select(Tag).options(*options).where(Tag.owner_id == user.id)
+        if private_only:
+            tags = tags.where(Tag.is_public == False)
+        if after_id is not None:
+            tags = tags.where(Tag.id > after_id)
+        
+        return tags.order_by(Tag.id)
+    
+    @classmethod
+    def _merge_public_tags(cls, db: Session, own_tags: list[Tag], after_id: int = None) -> list:
+        """合併快取的公開標籤與用戶自己的私人標籤，依 id 排序"""
+        public = [tag for tag in public_tags.get(db) if after_id is None or tag.id > after_id]
         
-        return paginate(tags)
+        return list(heapq.merge(public, own_tags, key=lambda tag: tag.id))
     
     @classmethod
-    def create_tag(cls, db: Session, user: User, data: TagCreate):
+    def list_tags(cls, db: Session, user: Principal, is_public, projection: Projection = None) -> Page[dict]:
+        projection = projection or TAG_PROJECTION.resolve()
+        if is_public:
+            # 公開標籤來自快取；用戶自己的私人標籤以 SQL 分頁，只查詢合併後這一頁需要的範圍
+            return paginate_merged(
+                db,
+                cls._own_tags_query(user, *projection.options(), private_only=True),
+                public_tags.get(db),
+                key=lambda tag: tag.id,
+                transformer=projection.dump_all,
+                count_key=('tags', user.id, True)
+            )
+        
+        tags = cls._own_tags_query(user, *projection.options())
+        return paginate(db, tags, transformer=projection.dump_all, count_key=('tags', user.id, False))
+    
+    @classmethod
+    def list_tags_cursor(
+        cls,
+        db: Session,
+        user: Principal,
+        is_public,
+        params: CursorParams,
+        projection: Projection = None
+        ) -> CursorPage[dict]:
+        """以 id 為鍵的游標分頁"""
+        projection = projection or TAG_PROJECTION.resolve()
+        after = parse_cursor(params.cursor, int)
+        after_id = after[0] if after else None
+        
+        own_tags = cls._own_tags_query(user, *projection.options(), private_only=is_public, after_id=after_id)
+        rows = list(db.scalars(own_tags.limit(params.size + 1)))
+        if is_public:
+            rows = cls._merge_public_tags(db, rows, after_id)[:params.size + 1]
+        
+        return cursor_page(rows, params, key=lambda tag: (tag.id,), transformer=projection.dump_all)
+    
+    @classmethod
+    def get_tag(
+        cls,
+        db: Session,
+        user: Principal,
+        id: int,
+        projection: Projection = None,
+        conditional: Conditional = None
+        ) -> dict:
+        """
+        公開標籤所有用戶皆可讀取，私人標籤只有擁有者與管理員可讀取
+        
+        conditional 不為 None 時設定 ETag，更新與刪除時以 If-Match 傳回；
+        請求帶有 If-None-Match 時，先只查詢權限檢查需要的欄位與 version，內容未變更則回傳 304，不載入標籤。
+        """
+        projection = projection or TAG_PROJECTION.resolve()
+        if conditional is not None and conditional.has_if_none_match:
+            row = db.execute(select(Tag.owner_id, Tag.is_public, Tag.version).where(Tag.id == id)).first()
+            if row is None:
+                raise cls.Exceptions.tag_not_found(id)
+            if not row.is_public:
+                validate_user_access(user, row.owner_id)
+            conditional.not_modified(entity_etag(row.version, *projection.key))
+        
+        tag = db.scalar(select(Tag).options(*projection.options()).where(Tag.id == id))
+        if not tag:
+            raise cls.Exceptions.tag_not_found(id)
+        if not tag.is_public:
+            validate_user_access(user, tag.owner_id)
+        if conditional is not None:
+            conditional.set_etag(entity_etag(tag.version, *projection.key))
+        
+        return projection.dump(tag)
+    
+    @classmethod
+    def create_tag(cls, db: Session, user: Principal, data: TagCreate):
         new_tag = Tag(
             **data.model_dump(),
             owner_id=user.id
@@ -49,29 +208,90 @@ class TagService:
             new_tag.is_public = True
             
         db.add(new_tag)
+        touch_collections(db, [user.id])
         db.commit()
         db.refresh(new_tag)
+        cls._invalidate_caches(new_tag)
         
         return new_tag
     
     @classmethod
-    def update_tag(cls, db: Session, user: User, id: int, data: TagCreate):
+    def update_tag(cls, db: Session, user: Principal, id: int, data: TagCreate, conditional: Conditional = None):
+        """
+        請求帶有 If-Match 時，版本不符回傳 412；讀取後被其他請求修改時回傳 409
+        
+        任務的回應包含標籤，使用此標籤的任務也一併遞增版本。
+        """
         tag = cls._get_tag_by_id(db, id)
         validate_user_access(user, tag.owner_id)
+        if conditional is not None:
+            conditional.require_version(tag.version)
         
+        was_public = tag.is_public
         update_instance(tag, data)
         
+        if db.is_modified(tag):
+            touch_tagged_tasks(db, [tag.id])
+            touch_collections(db, [tag.owner_id])
         db.commit()
         db.refresh(tag)
+        cls._invalidate_caches(tag, was_public)
+        if conditional is not None:
+            # 與 get_tag 未指定 fields 時的 ETag 相同，可直接用於 If-None-Match
+            conditional.set_etag(entity_etag(tag.version, *TAG_PROJECTION.resolve().key))
         
         return tag
     
     @classmethod
-    def delete_tag(cls, db: Session, user: User, id: int):
+    def delete_tag(cls, db: Session, user: Principal, id: int, conditional: Conditional = None):
         tag = cls._get_tag_by_id(db, id)
         validate_user_access(user, tag.owner_id)
+        if conditional is not None:
+            conditional.require_version(tag.version)
         
+        # 在關聯被刪除之前遞增使用此標籤的任務的版本
+        task_owner_ids = touch_tagged_tasks(db, [tag.id])
+        touch_collections(db, [tag.owner_id])
         db.delete(tag)
         db.commit()
+        cls._invalidate_caches(tag)
+        cls._invalidate_task_counts(task_owner_ids)
+        
+        return
+    
+    @classmethod
+    def delete_tags(cls, db: Session, user: Principal, query) -> dict:
+        """
+        以單一 DELETE 批次刪除自己的標籤
+        
+        query 可指定 ids 與 unused（沒有任何任務使用的標籤），至少需指定一項；
+        標籤與任務的關聯由外鍵的 ON DELETE CASCADE 刪除，不經過 ORM。
+        每次最多刪除 BULK_DELETE_MAX_ROWS 筆（依 id 順序）。
+        """
+        criteria = []
+        if query.get('ids'):
+            criteria.append(Tag.id.in_(query.get('ids')))
+        if query.get('unused'):
+            criteria.append(~Tag.tasks.any())
+        if not criteria:
+            raise cls.Exceptions.BULK_DELETE_NO_CRITERIA
+        
+        limit = settings.BULK_DELETE_MAX_ROWS
+        targets = select(Tag.id).where(Tag.owner_id == user.id, *criteria).order_by(Tag.id).limit(limit)
+        task_owner_ids = touch_tagged_tasks(db, targets)
+        # 回傳 is_public 以決定總數快取的失效範圍
+        deleted = db.execute(
+            delete(Tag).where(Tag.id.in_(targets)).returning(Tag.is_public).execution_options(synchronize_session=False)
+        ).scalars().all()
+        if deleted:
+            touch_collections(db, [user.id])
+        db.commit()
+        
+        if any(deleted):
+            count_cache.invalidate('tags')
+            public_tags.invalidate()
+        elif deleted:
+            count_cache.invalidate('tags', user.id)
+        cls._invalidate_task_counts(task_owner_ids)
         
-        return
\ No newline at end of file
+        return {'count': len(deleted), 'has_more': len(deleted) == limit}
\ No newline at end of file
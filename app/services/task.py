@@ -1,16 +1,37 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import Date, Select, delete, exists, func, insert, literal_column, select, update
+from sqlalchemy.orm import Session, joinedload, selectinload
 from fastapi import HTTPException, status
-from fastapi_pagination import Page
-from fastapi_pagination.ext.sqlalchemy import paginate
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from collections import Counter
+from typing import Optional
 
-from app.core.models import Task, User, TaskTagLink
-from app.core.filters import TaskRangeParams
-from app.core.schemas import TaskCreate
+from app.core.config import settings
+from app.core.etag import Conditional, entity_etag, make_etag
+from app.core.models import PRIORITY_RANK_SQL, Task, Tag, User, Role, Difficulty, Priority, TaskTagLink, UserTaskStats, index_tasks, match_tasks, touch_collections
+from app.core.filters import TagMatch, TaskRangeParams
+from app.core.pagination import CursorPage, CursorParams, Page, count_cache, cursor_page, page_window, paginate, paginate_sequence, parse_cursor, seek
+from app.core.projection import Projection, ProjectionSpec, Relation
+from app.core.schemas import TaskCreate, TaskBulkCreate, TaskBulkError, TaskBulkUpdate, TaskCalendar, TaskResponse, TaskStats, Principal
+from .stats import STATS_FIELDS, TaskStatsService
 from .tag import TagService
 from .utils import update_instance, validate_user_access
 
 
+# TaskResponse 需要的關聯，以 IN 查詢批次載入，避免每個任務各查一次標籤
+TASK_RELATIONS = {
+    'tags': Relation(selectinload(Task.tags)),
+}
+TASK_RESPONSE_OPTIONS = tuple(relation.option for relation in TASK_RELATIONS.values())
+# user_id 用於權限檢查、deadline 用於游標分頁、version 用於 ETag，不論是否請求都需要查詢
+TASK_PROJECTION = ProjectionSpec(Task, TaskResponse, TASK_RELATIONS, required=('user_id', 'deadline', 'version'))
+# sort 參數的排序鍵對應的欄位，priority 與 ix_tasks_user_id_is_completed_priority_rank 的運算式相同
+TASK_SORT_COLUMNS = {
+    'priority': literal_column(PRIORITY_RANK_SQL),
+    'deadline': Task.deadline,
+    'create_at': Task.create_at,
+}
+
+
 class TaskService:
     """處理任務相關的業務邏輯"""
     
@@ -22,56 +43,340 @@ class TaskService:
                 detail=f'Task with id {id} does not exist'
             )
         
+        BULK_DELETE_NO_CRITERIA = HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Either ids or a filter is required'
+        )
+        
+        INVALID_CALENDAR_RANGE = HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f'end must not be before start, and the range must not exceed {settings.TASK_CALENDAR_MAX_DAYS} days'
+        )
+        
+        @staticmethod
+        def bulk_create_failed(errors: list[TaskBulkError]) -> HTTPException:
+            return HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=[error.model_dump() for error in errors]
+            )
+        
     @classmethod
-    def _get_task_by_id(cls, db: Session, id: int):
-        task = db.query(Task).filter(Task.id == id).first()
+    def _get_task_by_id(cls, db: Session, id: int, *options):
+        task = db.query(Task).options(*options).filter(Task.id == id).first()
         if not task:
             raise cls.Exceptions.task_not_found(id)
         
         return task
     
     @classmethod
-    def list_tasks(cls, db: Session, user: User, query) -> Page[Task]:
+    def _date_range(cls, query) -> Optional[tuple[date, date]]:
+        """query 中 date 或 range 對應的日期範圍（含頭尾），兩者皆未指定時回傳 None"""
         today = datetime.today().date()
-        tasks = db.query(Task).filter(Task.user_id == user.id)
-        
-        if query.get("date"):
-            date = query.get("date")
-            start_of_day = datetime.combine(date, datetime.min.time())
-            end_of_day = datetime.combine(date, datetime.max.time())
-            tasks = tasks.filter(Task.deadline.between(start_of_day, end_of_day))
-        elif query.get('range'):
-            range = query.get('range')
-            if range == TaskRangeParams.today:
-                start_of_day = datetime.combine(today, datetime.min.time())
-                end_of_day = datetime.combine(today, datetime.max.time())
-
-                tasks = tasks.filter(Task.deadline.between(start_of_day, end_of_day))
-            elif range == TaskRangeParams.week:
-                start_of_week = today - timedelta(days=today.weekday())
-                end_of_week = start_of_week + timedelta(days=6)
-                tasks = tasks.filter(Task.deadline.between(start_of_week, end_of_week))
-            elif range == TaskRangeParams.month:
-                start_of_month = today.replace(day=1)
-                next_month = start_of_month.replace(month=start_of_month.month % 12 + 1, day=1)
-                end_of_month = next_month - timedelta(days=1)
-                tasks = tasks.filter(Task.deadline.between(start_of_month, end_of_month))
+        
+        if query.get('date'):
+            return query.get('date'), query.get('date')
+        
+        range = query.get('range')
+        if range == TaskRangeParams.today:
+            return today, today
+        elif range == TaskRangeParams.week:
+            start_of_week = today - timedelta(days=today.weekday())
+            return start_of_week, start_of_week + timedelta(days=6)
+        elif range == TaskRangeParams.month:
+            start_of_month = today.replace(day=1)
+            next_month = (start_of_month + timedelta(days=32)).replace(day=1)
+            return start_of_month, next_month - timedelta(days=1)
+        
+        return None
+    
+    @classmethod
+    def _tag_criteria(cls, tag_ids: tuple[int, ...], match: TagMatch) -> list:
+        """
+        標籤篩選的 EXISTS 條件，每個任務以 task_tag_link 的主鍵 (task_id, tag_id) 查詢
+        
+        不改變任務的讀取順序，列表仍可依索引排序並在取得一頁後停止。
+        """
+        def has_tags(*ids):
+            return exists().where(TaskTagLink.task_id == Task.id, TaskTagLink.tag_id.in_(ids))
+        
+        if match == TagMatch.all:
+            return [has_tags(tag_id) for tag_id in tag_ids]
+        return [has_tags(*tag_ids)]
+    
+    @classmethod
+    def _list_tasks_query(cls, user: Principal, query) -> Select:
+        """
+        任務列表的查詢，所有篩選條件與排序編譯為單一 SELECT
+        
+        query 為 range、date、is_completed 與 task_filters 的參數（缺少的鍵或 None 視為未指定）。
+        """
+        tasks = select(Task).where(Task.user_id == user.id)
+        
+        date_range = cls._date_range(query)
+        if date_range:
+            start, end = date_range
+            tasks = tasks.where(Task.deadline.between(
+                datetime.combine(start, datetime.min.time()),
+                datetime.combine(end, datetime.max.time())
+            ))
 
-        tasks = tasks.filter(Task.is_completed == query.get('is_completed'))
+        # 以 NOT is_completed 的形式篩選，才能使用未完成任務的部分索引
+        is_completed = query.get('is_completed')
+        if is_completed is not None:
+            tasks = tasks.where(Task.is_completed if is_completed else ~Task.is_completed)
+        
+        if query.get('tag_ids'):
+            tasks = tasks.where(*cls._tag_criteria(query.get('tag_ids'), query.get('tag_match')))
+        if query.get('priority'):
+            tasks = tasks.where(Task.priority.in_(query.get('priority')))
+        if query.get('difficulty'):
+            tasks = tasks.where(Task.difficulty.in_(query.get('difficulty')))
+        if query.get('deadline_from'):
+            tasks = tasks.where(Task.deadline >= query.get('deadline_from'))
+        if query.get('deadline_to'):
+            tasks = tasks.where(Task.deadline <= query.get('deadline_to'))
+        if query.get('created_from'):
+            tasks = tasks.where(Task.create_at >= query.get('created_from'))
+        if query.get('created_to'):
+            tasks = tasks.where(Task.create_at <= query.get('created_to'))
+        if query.get('no_deadline') is not None:
+            tasks = tasks.where(Task.deadline == None if query.get('no_deadline') else Task.deadline != None)
+        
         # order
-        tasks = tasks.order_by(Task.deadline)
+        sort = query.get('sort')
+        if sort is None:
+            return tasks.order_by(Task.deadline)
+        
+        keys = [key for key, _ in sort]
+        last_descending = sort[-1][1]
+        # 同值時依索引其餘的欄位排序：優先度相同時依 deadline，最後依 id，分頁才不會重複或遺漏；
+        # 方向與最後一個鍵相同，反向排序時資料庫可反向讀取索引
+        if keys[-1] == 'priority' and 'deadline' not in keys:
+            sort = (*sort, ('deadline', last_descending))
+        columns = [TASK_SORT_COLUMNS[key].desc() if descending else TASK_SORT_COLUMNS[key] for key, descending in sort]
+        columns.append(Task.id.desc() if last_descending else Task.id)
+        return tasks.order_by(*columns)
+    
+    @classmethod
+    def list_tasks(
+        cls,
+        db: Session,
+        user: Principal,
+        query,
+        projection: Projection = None,
+        conditional: Conditional = None
+        ) -> Page[dict]:
+        """
+        conditional 不為 None 時，先以用戶的 collection_version 產生 ETag，
+        與 If-None-Match 相符則回傳 304，不執行列表與總數的查詢。
+        版本號在列表查詢之前讀取，期間若有寫入，下次請求的 ETag 必定不同，不會快取到舊的內容。
+        """
+        projection = projection or TASK_PROJECTION.resolve()
+        if conditional is not None:
+            version = db.scalar(select(User.collection_version).where(User.id == user.id))
+            conditional.not_modified(make_etag(
+                'tasks',
+                user.id,
+                version,
+                sorted(query.items()),
+                # range 篩選依當天日期計算
+                datetime.today().date(),
+                settings.PAGINATION_COUNT_MODE,
+                page_window(),
+                projection.key
+            ))
+        
+        tasks = cls._list_tasks_query(user, query).options(*projection.options())
+        
+        return paginate(
+            db,
+            tasks,
+            transformer=projection.dump_all,
+            count_key=('tasks', user.id, frozenset(query.items()))
+        )
+    
+    @classmethod
+    def list_tasks_cursor(
+        cls,
+        db: Session,
+        user: Principal,
+        query,
+        params: CursorParams,
+        projection: Projection = None
+        ) -> CursorPage[dict]:
+        """
+        以 (deadline, id) 為鍵的游標分頁，沒有 deadline 的任務排在最後
+        
+        有 deadline 與沒有 deadline 的任務分成兩段查詢，各自都是索引上的範圍讀取；
+        只有在第一段不足一頁時才會查詢第二段。
+        """
+        projection = projection or TASK_PROJECTION.resolve()
+        tasks = cls._list_tasks_query(user, query).options(*projection.options())
+        after = parse_cursor(params.cursor, lambda value: None if value is None else datetime.fromisoformat(value), int)
+        limit = params.size + 1
+        
+        rows = []
+        if after is None or after[0] is not None:
+            rows = seek(db, tasks.where(Task.deadline != None), (Task.deadline, Task.id), after, limit)
+        if len(rows) < limit:
+            after_id = after[1:] if after and after[0] is None else None
+            rows += seek(db, tasks.where(Task.deadline == None), (Task.id,), after_id, limit - len(rows))
+        
+        return cursor_page(rows, params, key=lambda task: (task.deadline, task.id), transformer=projection.dump_all)
+    
+    @classmethod
+    def search_tasks(cls, db: Session, user: Principal, q: str, prefix: bool = True, projection: Projection = None) -> Page[dict]:
+        """
+        以全文索引搜尋自己的任務標題與內容，依相關度排序
+        
+        只比對索引中的詞，不掃描任務；q 沒有可搜尋的字詞（例如只有標點）時回傳空頁。
+        """
+        projection = projection or TASK_PROJECTION.resolve()
+        tasks = match_tasks(db, select(Task).where(Task.user_id == user.id), q, prefix)
+        if tasks is None:
+            return paginate_sequence([])
+        
+        return paginate(db, tasks.options(*projection.options()), transformer=projection.dump_all)
+    
+    @classmethod
+    def _calendar_query(cls, user: Principal, start: date, end: date, now: datetime) -> Select:
+        """
+        以單一 GROUP BY 統計每天、每個優先度的任務數
         
-        return paginate(tasks)
+        篩選與分組都使用 date(deadline)，對應 ix_tasks_user_id_deadline_date 的運算式欄位：
+        以索引範圍讀取，並依索引順序分組與排序，不需要讀取資料表或額外排序。
+        """
+        day = func.date(Task.deadline, type_=Date)
+        
+        return (
+            select(
+                day.label('day'),
+                Task.priority,
+                func.count().label('total'),
+                func.count().filter(Task.is_completed).label('completed'),
+                func.count().filter(~Task.is_completed, Task.deadline < now).label('overdue')
+            )
+            .where(Task.user_id == user.id, day.between(start, end))
+            .group_by(day, Task.priority)
+            .order_by(day, Task.priority)
+        )
     
     @classmethod
-    def get_task(cls, db: Session, user: User, id: int):
-        task = cls._get_task_by_id(db, id)
+    def task_calendar(cls, db: Session, user: Principal, query) -> TaskCalendar:
+        """
+        start 到 end（含）之間每天的任務數、已完成數與逾期數，並依優先度細分
+        
+        start、end 未同時指定時依 range 計算（預設為本月）；
+        回應的大小只與天數有關，與任務數量無關。
+        """
+        start, end = query.get('start'), query.get('end')
+        if start is None or end is None:
+            start, end = cls._date_range({'range': query.get('range') or TaskRangeParams.month})
+        if end < start or (end - start).days >= settings.TASK_CALENDAR_MAX_DAYS:
+            raise cls.Exceptions.INVALID_CALENDAR_RANGE
+        
+        days = {}
+        for row in db.execute(cls._calendar_query(user, start, end, datetime.now())):
+            summary = days.get(row.day)
+            if summary is None:
+                summary = days[row.day] = {
+                    'date': row.day,
+                    'total': 0,
+                    'completed': 0,
+                    'overdue': 0,
+                    'by_priority': dict.fromkeys(Priority, 0)
+                }
+            summary['total'] += row.total
+            summary['completed'] += row.completed
+            summary['overdue'] += row.overdue
+            summary['by_priority'][row.priority] = row.total
+        
+        return TaskCalendar(start=start, end=end, days=list(days.values()))
+    
+    @classmethod
+    def task_stats(cls, db: Session, user: Principal) -> TaskStats:
+        """
+        用戶的任務統計
+        
+        各分組的任務數讀自 user_task_stats（依主鍵最多 18 列），與任務數量無關；
+        本週到期數與當天日期有關，無法預先累計，以未完成任務的部分索引對本週的 deadline 做範圍計數。
+        """
+        by_priority = {priority: {'open': 0, 'completed': 0} for priority in Priority}
+        by_difficulty = {difficulty: {'open': 0, 'completed': 0} for difficulty in Difficulty}
+        for row in db.scalars(select(UserTaskStats).where(UserTaskStats.user_id == user.id)):
+            state = 'completed' if row.is_completed else 'open'
+            by_priority[row.priority][state] += row.count
+            by_difficulty[row.difficulty][state] += row.count
+        
+        open_count = sum(counts['open'] for counts in by_priority.values())
+        completed_count = sum(counts['completed'] for counts in by_priority.values())
+        due_this_week = cls._list_tasks_query(user, {'range': TaskRangeParams.week, 'is_completed': False})
+        
+        return TaskStats(
+            total=open_count + completed_count,
+            open=open_count,
+            completed=completed_count,
+            due_this_week=db.scalar(select(func.count()).where(due_this_week.whereclause)),
+            by_priority=by_priority,
+            by_difficulty=by_difficulty
+        )
+    
+    @classmethod
+    def get_task(
+        cls,
+        db: Session,
+        user: Principal,
+        id: int,
+        projection: Projection = None,
+        conditional: Conditional = None
+        ) -> dict:
+        """
+        conditional 不為 None 時設定 ETag；請求帶有 If-None-Match 時，
+        先只查詢 user_id 與 version，內容未變更則回傳 304，不載入任務與標籤。
+        """
+        projection = projection or TASK_PROJECTION.resolve()
+        if conditional is not None and conditional.has_if_none_match:
+            row = db.execute(select(Task.user_id, Task.version).where(Task.id == id)).first()
+            if row is None:
+                raise cls.Exceptions.task_not_found(id)
+            validate_user_access(user, row.user_id)
+            conditional.not_modified(entity_etag(row.version, *projection.key))
+        
+        task = cls._get_task_by_id(db, id, *projection.options())
         validate_user_access(user, task.user_id)
+        if conditional is not None:
+            conditional.set_etag(entity_etag(task.version, *projection.key))
 
-        return task
+        return projection.dump(task)
+    
+    @classmethod
+    def _check_tags(cls, user: Principal, tag_ids: list[int], tags: dict) -> HTTPException | None:
+        """以預先查詢的標籤檢查任務引用的標籤是否存在、且屬於該用戶或為公開"""
+        for tag_id in tag_ids:
+            tag = tags.get(tag_id)
+            if tag is None:
+                return TagService.Exceptions.tag_not_found(tag_id)
+            if not (tag.is_public or tag.owner_id == user.id):
+                return HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+        
+        return None
+    
+    @classmethod
+    def _get_visible_tags(cls, db: Session, user: Principal, tag_ids: list[int]) -> list[Tag]:
+        """以一次查詢取得任務要使用的標籤（依 tag_ids 的順序），不存在或無權使用時拋出例外"""
+        tag_ids = list(dict.fromkeys(tag_ids))
+        if not tag_ids:
+            return []
+        
+        tags = {tag.id: tag for tag in db.scalars(select(Tag).where(Tag.id.in_(tag_ids)))}
+        error = cls._check_tags(user, tag_ids, tags)
+        if error:
+            raise error
+        
+        return [tags[tag_id] for tag_id in tag_ids]
     
     @classmethod
-    def create_task(cls, db: Session, user: User, data: TaskCreate):
+    def create_task(cls, db: Session, user: Principal, data: TaskCreate) -> TaskResponse:
         data = data.model_dump()
         tag_ids = data.pop('tag_ids')
         
@@ -79,66 +384,256 @@ class TaskService:
             **data,
             user_id=user.id
         )
+        # 標籤驗證失敗時任務尚未寫入；驗證通過後任務與 task_tag_link 在同一次 flush 中寫入
+        new_task.tags = cls._get_visible_tags(db, user, tag_ids)
         
         db.add(new_task)
+        db.flush()
+        # commit 會使物件過期，在提交前建立回應，避免提交後再查詢一次
+        response = TaskResponse.model_validate(new_task)
+        touch_collections(db, [user.id])
+        TaskStatsService.apply(db, user.id, {TaskStatsService.key(new_task): 1})
         db.commit()
-        db.refresh(new_task)
+        count_cache.invalidate('tasks', user.id)
         
-        for tag_id in tag_ids:
-            # 檢查該 tag 是否存在
-            tag = TagService._get_tag_by_id(db, tag_id)
-            # 檢查該 tag 是否屬於該用戶，或者為公開
-            if not (tag.is_public or tag.owner_id == user.id):
-                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+        return response
+    
+    @classmethod
+    def _insert_tasks(cls, db: Session, rows: list[dict]) -> list[int]:
+        """以單一 INSERT ... RETURNING 新增多筆任務，回傳與 rows 順序相同的 id"""
+        stmt = insert(Task)
+        if db.get_bind().dialect.name == 'sqlite':
+            # SQLite 在同一個 INSERT 中依序配置遞增的 rowid（期間持有寫入鎖），排序後即為參數順序；
+            # 要求 sort_by_parameter_order 會讓 SQLAlchemy 退回逐筆 INSERT
+            return sorted(db.scalars(stmt.returning(Task.id), rows))
+        return list(db.scalars(stmt.returning(Task.id, sort_by_parameter_order=True), rows))
+    
+    @classmethod
+    def create_tasks(cls, db: Session, user: Principal, data: TaskBulkCreate) -> dict:
+        """
+        批次建立任務
+        
+        所有項目引用的標籤以一次查詢驗證；任務與 TaskTagLink 每 TASK_BULK_BATCH_SIZE 筆 INSERT 一次，
+        並在同一個交易中提交。atomic 為 True 時任一項目失敗即回傳 422 與所有失敗的項目，不建立任何任務。
+        """
+        tag_ids = {tag_id for item in data.tasks for tag_id in item.tag_ids}
+        tags = {}
+        if tag_ids:
+            rows = db.execute(select(Tag.id, Tag.is_public, Tag.owner_id).where(Tag.id.in_(tag_ids)))
+            tags = {row.id: row for row in rows}
+        
+        items, errors = [], []
+        for index, item in enumerate(data.tasks):
+            error = cls._check_tags(user, item.tag_ids, tags)
+            if error:
+                errors.append(TaskBulkError(index=index, status_code=error.status_code, detail=error.detail))
+            else:
+                items.append(item)
+        
+        if errors and data.atomic:
+            raise cls.Exceptions.bulk_create_failed(errors)
+        
+        ids = []
+        batch_size = settings.TASK_BULK_BATCH_SIZE
+        for start in range(0, len(items), batch_size):
+            batch = items[start:start + batch_size]
+            task_ids = cls._insert_tasks(db, [{**item.model_dump(exclude={'tag_ids'}), 'user_id': user.id} for item in batch])
             
-            task_tag = TaskTagLink(task_id=new_task.id, tag_id=tag_id)
-            db.add(task_tag)
+            links = [
+                {'task_id': task_id, 'tag_id': tag_id}
+                for task_id, item in zip(task_ids, batch)
+                for tag_id in dict.fromkeys(item.tag_ids)
+            ]
+            if links:
+                db.execute(insert(TaskTagLink), links)
+            # 不經過 ORM 的 INSERT 需自行更新搜尋索引
+            index_tasks(db, [(task_id, item.title, item.content) for task_id, item in zip(task_ids, batch)])
+            ids += task_ids
         
-        db.commit()
+        created = []
+        if ids:
+            touch_collections(db, [user.id])
+            TaskStatsService.apply(db, user.id, Counter(TaskStatsService.key(item) for item in items))
+            db.commit()
+            count_cache.invalidate('tasks', user.id)
+            created = db.scalars(
+                select(Task).options(*TASK_RESPONSE_OPTIONS).where(Task.id.in_(ids)).order_by(Task.id)
+            ).all()
         
-        return new_task
+        return {'created': created, 'errors': errors}
     
     @classmethod
-    def update_task(cls, db: Session, user: User, id: int, data: TaskCreate):
-        task = cls._get_task_by_id(db, id)
+    def update_task(
+        cls,
+        db: Session,
+        user: Principal,
+        id: int,
+        data: TaskCreate,
+        conditional: Conditional = None
+        ) -> TaskResponse:
+        """
+        請求帶有 If-Match 時，版本不符回傳 412；
+        UPDATE 帶有 WHERE version = 讀取時的版本，讀取後被其他請求修改時回傳 409，不需要持有資料列鎖。
+        """
+        task = cls._get_task_by_id(db, id, joinedload(Task.tags))
         validate_user_access(user, task.user_id)
+        if conditional is not None:
+            conditional.require_version(task.version)
         
-        tag_ids = set(data.model_dump().pop('tag_ids'))
+        tag_ids = list(dict.fromkeys(data.tag_ids))
+        current_tags = {tag.id: tag for tag in task.tags}
+        # 只有新加入的標籤需要驗證，以一次查詢取得
+        new_tags = {
+            tag.id: tag
+            for tag in cls._get_visible_tags(db, user, [tag_id for tag_id in tag_ids if tag_id not in current_tags])
+        }
+        # 由 ORM 比對集合的差異，在同一次 flush 中刪除與新增 task_tag_link
+        task.tags = [current_tags.get(tag_id) or new_tags[tag_id] for tag_id in tag_ids]
         
-        current_tag_ids = {tag.id for tag in task.tags}
+        old_key = TaskStatsService.key(task)
+        update_instance(task, data)
         
-        tags_to_add = tag_ids - current_tag_ids
-        tags_to_remove = current_tag_ids - tag_ids
+        db.flush()
+        response = TaskResponse.model_validate(task)
+        touch_collections(db, [response.user_id])
+        TaskStatsService.apply(db, response.user_id, TaskStatsService.moved(old_key, TaskStatsService.key(task)))
+        if conditional is not None:
+            conditional.set_etag(entity_etag(task.version, *TASK_PROJECTION.resolve().key))
+        db.commit()
+        count_cache.invalidate('tasks', response.user_id)
         
-        if tags_to_remove:
-            db.query(TaskTagLink).filter(
-                TaskTagLink.task_id == task.id,
-                TaskTagLink.tag_id.in_(tags_to_remove)
-            ).delete(synchronize_session=False)
+        return response
+    
+    @classmethod
+    def update_tasks(cls, db: Session, user: Principal, data: TaskBulkUpdate) -> dict:
+        """
+        以單一 UPDATE 批次更新任務
         
-        for tag_id in tags_to_add:
-            # 檢查該 tag 是否存在
-            tag = TagService._get_tag_by_id(db, tag_id)
-            # 檢查該 tag 是否屬於該用戶，或者為公開
-            if not (tag.is_public or tag.owner_id == user.id):
-                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
-            
-            task_tag = TaskTagLink(task_id=task.id, tag_id=tag_id)
-            db.add(task_tag)
+        更新範圍一律限制在該用戶自己的任務，不屬於該用戶或不存在的 id 直接略過，不計入 count。
+        不經過 ORM，version 在同一個 UPDATE 中遞增。
+        filter 的 is_completed 為 None 時不限完成狀態。
+        每次最多更新 BULK_UPDATE_MAX_ROWS 筆（依 id 順序）。
+        returning 為 True 時以 RETURNING 取得更新的 id，再一次載入更新後的任務與標籤。
         
-        update_instance(task, data)
-            
+        更新完成狀態、優先度或難度時，先以 SELECT ... FOR UPDATE 鎖定並讀取目標任務原本的分組，
+        計算 user_task_stats 的增減，UPDATE 只套用在這些任務上。
+        """
+        criteria = [Task.user_id == user.id]
+        if data.filter is not None:
+            criteria.append(cls._list_tasks_query(user, data.filter.model_dump()).whereclause)
+        if data.ids is not None:
+            criteria.append(Task.id.in_(data.ids))
+        
+        limit = settings.BULK_UPDATE_MAX_ROWS
+        values = data.values.model_dump(exclude_unset=True)
+        deltas = None
+        if values.keys() & set(STATS_FIELDS):
+            # 依 id 順序鎖定，與其他批次寫入的加鎖順序一致
+            targets = db.execute(
+                select(Task.id, *(getattr(Task, field) for field in STATS_FIELDS))
+                .where(*criteria)
+                .order_by(Task.id)
+                .limit(limit)
+                .with_for_update()
+            ).all()
+            deltas = TaskStatsService.update_deltas(targets, values)
+            criteria = [Task.id.in_([target.id for target in targets])]
+        else:
+            criteria = [Task.id.in_(select(Task.id).where(*criteria).order_by(Task.id).limit(limit))]
+        
+        stmt = (
+            update(Task)
+            .where(*criteria)
+            .values(**values, version=Task.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        
+        if data.returning:
+            ids = db.scalars(stmt.returning(Task.id)).all()
+            count = len(ids)
+        else:
+            count = db.execute(stmt).rowcount
+        if count:
+            touch_collections(db, [user.id])
+            if deltas:
+                TaskStatsService.apply(db, user.id, deltas)
         db.commit()
-        db.refresh(task)
-            
-        return task
+        
+        if count:
+            count_cache.invalidate('tasks', user.id)
+        
+        tasks = None
+        if data.returning:
+            tasks = db.scalars(
+                select(Task).options(*TASK_RESPONSE_OPTIONS).where(Task.id.in_(ids)).order_by(Task.id)
+            ).all()
+        
+        return {'count': count, 'has_more': count == limit, 'tasks': tasks}
     
     @classmethod
-    def delete_task(cls, db: Session, user: User, id: int):
-        task = cls._get_task_by_id(db, id)
-        validate_user_access(user, task.user_id)
+    def delete_task(cls, db: Session, user: Principal, id: int, conditional: Conditional = None) -> None:
+        """
+        以單一 DELETE 刪除任務，標籤關聯由外鍵的 ON DELETE CASCADE 刪除
+        
+        權限條件與 If-Match 的版本條件直接加在 DELETE 上；
+        沒有刪除任何資料時才查詢任務，以回傳 404、403 或 412。
+        """
+        stmt = delete(Task).where(Task.id == id)
+        if user.role_id != Role.ADMIN:
+            stmt = stmt.where(Task.user_id == user.id)
+        versions = conditional.expected_versions if conditional is not None else None
+        if versions is not None:
+            stmt = stmt.where(Task.version.in_(versions))
+        
+        deleted = db.execute(stmt.returning(Task.user_id, *(getattr(Task, field) for field in STATS_FIELDS))).first()
+        if deleted is None:
+            task = cls._get_task_by_id(db, id)
+            validate_user_access(user, task.user_id)
+            raise Conditional.Exceptions.PRECONDITION_FAILED
         
-        db.delete(task)
+        user_id = deleted.user_id
+        touch_collections(db, [user_id])
+        TaskStatsService.apply(db, user_id, {TaskStatsService.key(deleted): -1})
         db.commit()
+        count_cache.invalidate('tasks', user_id)
+    
+    @classmethod
+    def delete_tasks(cls, db: Session, user: Principal, query) -> dict:
+        """
+        以單一 DELETE 批次刪除自己的任務
+        
+        query 可指定 ids、is_completed 與 before（deadline 早於該時間），至少需指定一項；
+        任務的標籤關聯由外鍵的 ON DELETE CASCADE 刪除，不經過 ORM。
+        每次最多刪除 BULK_DELETE_MAX_ROWS 筆（依 id 順序）。
+        """
+        criteria = []
+        if query.get('ids'):
+            criteria.append(Task.id.in_(query.get('ids')))
+        if query.get('is_completed') is not None:
+            criteria.append(Task.is_completed if query.get('is_completed') else ~Task.is_completed)
+        if query.get('before'):
+            criteria.append(Task.deadline < query.get('before'))
+        if not criteria:
+            raise cls.Exceptions.BULK_DELETE_NO_CRITERIA
+        
+        limit = settings.BULK_DELETE_MAX_ROWS
+        targets = select(Task.id).where(Task.user_id == user.id, *criteria).order_by(Task.id).limit(limit)
+        # RETURNING 刪除的任務的分組，用於更新 user_task_stats
+        deleted = db.execute(
+            delete(Task)
+            .where(Task.id.in_(targets))
+            .returning(*(getattr(Task, field) for field in STATS_FIELDS))
+            .execution_options(synchronize_session=False)
+        ).all()
+        count = len(deleted)
+        if count:
+            touch_collections(db, [user.id])
+            deltas = Counter()
+            deltas.subtract(map(TaskStatsService.key, deleted))
+            TaskStatsService.apply(db, user.id, deltas)
+        db.commit()
+        
+        if count:
+            count_cache.invalidate('tasks', user.id)
         
-        return task
\ No newline at end of file
+        return {'count': count, 'has_more': count == limit}
\ No newline at end of file
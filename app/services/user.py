@@ -1,19 +1,33 @@
 from typing import Optional
-from sqlalchemy.orm import Session
+from sqlalchemy import Select, select
+from sqlalchemy.orm import Session, selectinload
 from fastapi import HTTPException, status, UploadFile
-from fastapi_pagination import Page
-from fastapi_pagination.ext.sqlalchemy import paginate
 from uuid import uuid4
 import os
 
 from app.core.config import settings
-from app.core.models import User
-from app.core.schemas import UserCreate, AdminUserCreate, UserPasswordUpdate
+from app.core.etag import Conditional, entity_etag
+from app.core.models import Tag, User, Task, touch_tagged_tasks
+from app.core.pagination import CursorPage, CursorParams, Page, count_cache, cursor_page, paginate, parse_cursor, seek
+from app.core.projection import Projection, ProjectionSpec, Relation
+from app.core.schemas import UserCreate, AdminUserCreate, UserPasswordUpdate, UserResponse
+from .auth import AuthService
+from .tag import TagService, public_tags
 from .utils import update_instance, validate_user_access
 
 
 HEADSHOT_PATH = settings.HEADSHOT_PATH
 
+# UserResponse 需要的關聯，以 IN 查詢批次載入（每頁固定 4 次查詢，與用戶數無關）
+USER_RELATIONS = {
+    'role': Relation(selectinload(User.role), columns=('role_id',)),
+    'tasks': Relation(selectinload(User.tasks).selectinload(Task.tags)),
+    'tags': Relation(selectinload(User.tags)),
+}
+USER_RESPONSE_OPTIONS = tuple(relation.option for relation in USER_RELATIONS.values())
+# version 與 collection_version 用於 ETag，不論是否請求都需要查詢
+USER_PROJECTION = ProjectionSpec(User, UserResponse, USER_RELATIONS, required=('version', 'collection_version'))
+
 
 class UserService:
     """處理用戶相關的業務邏輯"""
@@ -68,30 +82,73 @@ class UserService:
                 raise cls.Exceptions.EMAIL_EXISTS
     
     @classmethod
-    def get_user_by_id(cls, db: Session, id: int) -> User:
+    def get_user_by_id(cls, db: Session, id: int, *options) -> User:
         """根據ID獲取用戶，如果不存在則拋出異常"""
-        user = db.query(User).filter(User.id == id).first()
+        user = db.query(User).options(*options).filter(User.id == id).first()
         if not user:
             raise cls.Exceptions.user_not_found(id)
         return user
     
     @classmethod
-    def list_users(cls, db: Session, role_id: Optional[int]) -> Page[User]:
-        """列出除當前用戶外的所有用戶"""
+    def _list_users_query(cls, role_id: Optional[int]) -> Select:
+        query = select(User)
         if role_id:
-            query = db.query(User).filter(User.role_id == role_id)
-        else:
-            query = db.query(User).filter()
-        return paginate(query)
+            query = query.where(User.role_id == role_id)
+        return query
     
     @classmethod
-    def get_user(cls, db: Session, cur_user: User, id: int = None) -> User:
-        """獲取特定用戶，並驗證訪問權限"""
-        if id:
-            user = cls.get_user_by_id(db, id)
-        else:
-            user = cur_user
-        return user
+    def list_users(cls, db: Session, role_id: Optional[int], projection: Projection = None) -> Page[dict]:
+        """列出除當前用戶外的所有用戶"""
+        projection = projection or USER_PROJECTION.resolve()
+        users = cls._list_users_query(role_id).options(*projection.options())
+        
+        return paginate(db, users, transformer=projection.dump_all, count_key=('users', None, role_id))
+    
+    @classmethod
+    def list_users_cursor(
+        cls,
+        db: Session,
+        role_id: Optional[int],
+        params: CursorParams,
+        projection: Projection = None
+        ) -> CursorPage[dict]:
+        """以 id 為鍵的游標分頁"""
+        projection = projection or USER_PROJECTION.resolve()
+        users = cls._list_users_query(role_id).options(*projection.options())
+        after = parse_cursor(params.cursor, int)
+        
+        rows = seek(db, users, (User.id,), after, params.size + 1)
+        
+        return cursor_page(rows, params, key=lambda user: (user.id,), transformer=projection.dump_all)
+    
+    @classmethod
+    def get_user(
+        cls,
+        db: Session,
+        cur_user: User,
+        id: int = None,
+        projection: Projection = None,
+        conditional: Conditional = None
+        ) -> dict:
+        """
+        獲取特定用戶，並驗證訪問權限
+        
+        conditional 不為 None 時設定 ETag（用戶的 version 與任務、標籤的 collection_version）；
+        請求帶有 If-None-Match 時先只查詢這兩個欄位，內容未變更則回傳 304，不載入任務與標籤。
+        """
+        projection = projection or USER_PROJECTION.resolve()
+        id = id or cur_user.id
+        if conditional is not None and conditional.has_if_none_match:
+            row = db.execute(select(User.version, User.collection_version).where(User.id == id)).first()
+            if row is None:
+                raise cls.Exceptions.user_not_found(id)
+            conditional.not_modified(entity_etag(row.version, row.collection_version, projection.key))
+        
+        user = cls.get_user_by_id(db, id, *projection.options())
+        if conditional is not None:
+            conditional.set_etag(entity_etag(user.version, user.collection_version, projection.key))
+        
+        return projection.dump(user)
     
     @classmethod
     def create_user(cls, db: Session, data: UserCreate | AdminUserCreate) -> User:
@@ -104,6 +161,7 @@ class UserService:
         
         db.add(new_user)
         db.commit()
+        count_cache.invalidate('users')
         db.refresh(new_user)
         return new_user
     
@@ -119,6 +177,7 @@ class UserService:
         
         update_instance(user, data)
         db.commit()
+        AuthService.invalidate_user(user.id)
         db.refresh(user)
         return user
     
@@ -129,8 +188,11 @@ class UserService:
         # 更新密碼
         user.password = data.password
         user.encode_password()
+        # 密碼變更後，既有的 refresh token 全部失效
+        AuthService.revoke_refresh_tokens(db, user_id=user.id)
         
         db.commit()
+        AuthService.invalidate_user(user.id)
         db.refresh(user)
         return user
     
@@ -142,8 +204,18 @@ class UserService:
         else:
             user = cur_user
         
+        user_id = user.id
+        # 用戶的公開標籤可能被其他用戶的任務使用，在標籤被刪除之前遞增這些任務的版本
+        task_owner_ids = touch_tagged_tasks(db, select(Tag.id).where(Tag.owner_id == user_id))
         db.delete(user)
         db.commit()
+        AuthService.invalidate_user(user_id)
+        # 用戶的任務與標籤一併刪除（可能包含公開標籤）
+        count_cache.invalidate('users')
+        count_cache.invalidate('tasks', user_id)
+        TagService._invalidate_task_counts(task_owner_ids)
+        count_cache.invalidate('tags')
+        public_tags.invalidate()
     
     @classmethod
     def upload_headshot(cls, db: Session, cur_user: User, file: UploadFile):
@@ -182,5 +254,6 @@ class UserService:
         
         db.add(new_user)
         db.commit()
+        count_cache.invalidate('users')
         db.refresh(new_user)
         return new_user
\ No newline at end of file
@@ -1,7 +1,8 @@
 from sqlmodel import SQLModel
 from fastapi import HTTPException, status
 
-from app.core.models import User, Role
+from app.core.models import Role
+from app.core.schemas import Principal
 
 
 def update_instance(obj, data: SQLModel):
@@ -12,7 +13,7 @@ def update_instance(obj, data: SQLModel):
         if hasattr(obj, field):
             setattr(obj, field, value)
             
-def validate_user_access(user: User, user_id):
+def validate_user_access(user: Principal, user_id):
     """
     檢查該用戶是否為該實例擁有者，或者是否有管理員權限
     """
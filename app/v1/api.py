@@ -7,4 +7,5 @@ router = APIRouter()
 router.include_router(user_router, prefix='/users', tags=['Users'])
 router.include_router(task_router, prefix='/tasks', tags=['Tasks'])
 router.include_router(tag_router, prefix='/tags', tags=['Tags'])
-router.include_router(auth_router, prefix='/auth', tags=['Auth'])
\ No newline at end of file
+router.include_router(auth_router, prefix='/auth', tags=['Auth'])
+router.include_router(metrics_router, prefix='/metrics', tags=['Metrics'])
\ No newline at end of file
@@ -1,4 +1,5 @@
 from .user import router as user_router
 from .task import router as task_router
 from .tag import router as tag_router
-from .auth import router as auth_router
\ No newline at end of file
+from .auth import router as auth_router
+from .metrics import router as metrics_router
\ No newline at end of file
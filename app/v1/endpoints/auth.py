@@ -1,23 +1,39 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 
-from typing import Annotated
+from typing import Annotated, Optional
 
-from app.deps import SessionDEP, UserDEP
-from app.services import AuthService
-from app.core.schemas import AuthLogin, AuthLoginResponse
+from app.deps import SessionDEP, UserDEP, TokenDEP, AsyncSessionDEP, AsyncUserDEP
+from app.services import AuthService, AsyncAuthService
+from app.core.schemas import AuthLogin, AuthLoginResponse, AuthRefresh, AuthLogout, AuthTokenResponse
+from .utils import client_ip
 
 router = APIRouter()
 
 @router.post(
     '/token/',
     summary='（Swagger UI 的 Authorize 功能專用）')
-def token(auth: Annotated[OAuth2PasswordRequestForm, Depends()], db: SessionDEP):
-    return AuthService.login(db, auth)
+def token(auth: Annotated[OAuth2PasswordRequestForm, Depends()], db: SessionDEP, request: Request):
+    return AuthService.login(db, auth, client_ip(request))
 
 @router.post(
     '/login/',
     summary='使用者登入',
     response_model=AuthLoginResponse)
-def login(data: AuthLogin, db: SessionDEP):
-    return AuthService.login(db, data)
\ No newline at end of file
+async def login(data: AuthLogin, db: AsyncSessionDEP, request: Request):
+    return await AsyncAuthService.login(db, data, client_ip(request))
+
+@router.post(
+    '/refresh/',
+    summary='以 refresh token 換發新的 access token',
+    description='每個 refresh token 只能使用一次，換發後會一併取得新的 refresh token',
+    response_model=AuthTokenResponse)
+async def refresh(data: AuthRefresh, db: AsyncSessionDEP):
+    return await AsyncAuthService.refresh(db, data.refresh_token)
+
+@router.post(
+    '/logout/',
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary='登出，撤銷目前的 access token 與 refresh token')
+async def logout(db: AsyncSessionDEP, user: AsyncUserDEP, token: TokenDEP, data: Optional[AuthLogout] = None):
+    return await AsyncAuthService.logout(db, token, data.refresh_token if data else None)
\ No newline at end of file
@@ -0,0 +1,27 @@
+from fastapi import APIRouter
+
+from app.core.hashing import password_hasher
+from app.core.models.pool_metrics import pool_stats
+from app.core.pagination import count_cache
+from app.core.throttle import login_throttle
+from app.services import AuthService
+from app.services.tag import public_tags
+from app.deps import AdminDEP
+
+
+router = APIRouter()
+
+
+@router.get(
+    '/',
+    summary='（需要管理者權限）獲取服務內部的快取與效能指標'
+    )
+def get_metrics(user: AdminDEP):
+    return {
+        'auth_cache': AuthService.cache_stats(),
+        'password_hashing': password_hasher.stats(),
+        'login_throttle': login_throttle.stats(),
+        'db_pool': pool_stats(),
+        'pagination_count_cache': count_cache.stats(),
+        'public_tag_cache': public_tags.stats()
+    }
\ No newline at end of file
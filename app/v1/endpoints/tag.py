@@ -1,25 +1,62 @@
 from fastapi import APIRouter, status, Query
-from fastapi_pagination import Page
+from typing import Optional
 
-from app.core.schemas import TagCreate, TagResponse
+from app.core.schemas import BulkDeleteResponse, TagCreate, TagResponse
+from app.core.pagination import CursorPage, Page
+from app.core.projection import partial
+from app.core.serialization import FastJSONRoute
 from app.services import TagService
-from app.deps import SessionDEP, UserDEP
+from app.deps import SessionDEP, UserDEP, TagProjectionDEP, CursorDEP, ConditionalDEP
 
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
 @router.get(
     '/',
-    response_model=Page[TagResponse],
+    response_model=Page[partial(TagResponse)],
+    response_model_exclude_unset=True,
     summary='獲取該位使用者的所有自訂標籤，以及公共標籤'
     )
 def list_tags(
     db: SessionDEP,
     user: UserDEP,
+    projection: TagProjectionDEP,
     is_public: bool = Query(description='是否獲取公共標籤')
     ):
-    return TagService.list_tags(db, user, is_public)
+    return TagService.list_tags(db, user, is_public, projection)
+
+@router.get(
+    '/cursor/',
+    response_model=CursorPage[partial(TagResponse)],
+    response_model_exclude_unset=True,
+    summary='以游標分頁獲取自訂標籤與公共標籤',
+    description='依 id 排序，以上一頁的 next_cursor 取得下一頁'
+    )
+def list_tags_cursor(
+    db: SessionDEP,
+    user: UserDEP,
+    projection: TagProjectionDEP,
+    params: CursorDEP,
+    is_public: bool = Query(description='是否獲取公共標籤')
+    ):
+    return TagService.list_tags_cursor(db, user, is_public, params, projection)
+
+@router.get(
+    '/{id:int}/',
+    response_model=partial(TagResponse),
+    response_model_exclude_unset=True,
+    summary='獲取單一標籤',
+    description='回應帶有 ETag，可在更新或刪除時以 If-Match 傳回；以 If-None-Match 傳回時若標籤沒有變更則回傳 304'
+    )
+def get_tag(
+    db: SessionDEP,
+    user: UserDEP,
+    projection: TagProjectionDEP,
+    conditional: ConditionalDEP,
+    id: int,
+    ):
+    return TagService.get_tag(db, user, id, projection, conditional)
 
 @router.post(
     '/',
@@ -31,18 +68,38 @@ def list_tags(
 def create_tag(db: SessionDEP, user: UserDEP, data: TagCreate):
     return TagService.create_tag(db, user, data)
 
+@router.delete(
+    '/bulk/',
+    response_model=BulkDeleteResponse,
+    summary='批次刪除標籤',
+    description='刪除 ids 中或沒有任務使用的自己的標籤（至少需指定一項），每次最多刪除 BULK_DELETE_MAX_ROWS 筆'
+)
+def delete_tags(
+    db: SessionDEP,
+    user: UserDEP,
+    ids: Optional[list[int]] = Query(default=None, description='要刪除的標籤 id'),
+    unused: bool = Query(default=False, description='只刪除沒有任何任務使用的標籤'),
+    ):
+    query = {
+        'ids': ids,
+        'unused': unused
+    }
+    return TagService.delete_tags(db, user, query)
+
 @router.put(
     '/{id}/',
     response_model=TagResponse,
-    summary='更新單一標籤'
+    summary='更新單一標籤',
+    description='帶有 If-Match 時，標籤已被修改（ETag 的版本不符）則回傳 412'
 )
-def update_tag(db: SessionDEP, user: UserDEP, id: int, data: TagCreate):
-    return TagService.update_tag(db, user, id, data)
+def update_tag(db: SessionDEP, user: UserDEP, conditional: ConditionalDEP, id: int, data: TagCreate):
+    return TagService.update_tag(db, user, id, data, conditional)
 
 @router.delete(
     '/{id}/',
     status_code=status.HTTP_204_NO_CONTENT,
-    summary='刪除單一標籤'
+    summary='刪除單一標籤',
+    description='帶有 If-Match 時，標籤已被修改（ETag 的版本不符）則回傳 412'
 )
-def delete_tag(db: SessionDEP, user: UserDEP, id: int):
-    return TagService.delete_tag(db, user, id)
+def delete_tag(db: SessionDEP, user: UserDEP, conditional: ConditionalDEP, id: int):
+    return TagService.delete_tag(db, user, id, conditional)
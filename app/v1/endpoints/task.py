@@ -1,26 +1,34 @@
 from fastapi import APIRouter, status, Query
-from fastapi_pagination import Page
 from typing import Optional
 from enum import Enum
-from datetime import date
+from datetime import date, datetime
 
-from app.core.schemas import TaskCreate, TaskResponse
+from app.core.schemas import BulkDeleteResponse, TaskCreate, TaskBulkCreate, TaskBulkResponse, TaskBulkUpdate, TaskBulkUpdateResponse, TaskCalendar, TaskResponse
 from app.core.filters import TaskRangeParams
+from app.core.pagination import CursorPage, Page
+from app.core.projection import partial
+from app.core.serialization import FastJSONRoute
 from app.services import TaskService
-from app.deps import SessionDEP, UserDEP
+from app.deps import SessionDEP, UserDEP, TaskProjectionDEP, CursorDEP, ConditionalDEP, TaskFilterDEP, TaskSortDEP
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
     
 @router.get(
     '/',
-    response_model=Page[TaskResponse],
-    summary='獲取所有任務'
+    response_model=Page[partial(TaskResponse)],
+    response_model_exclude_unset=True,
+    summary='獲取所有任務',
+    description='可依標籤、優先度、難度與時間範圍篩選，並以 sort 指定排序；回應帶有 ETag，以 If-None-Match 傳回時若任務沒有任何變更則回傳 304'
     )
 def list_tasks(
     db: SessionDEP,
     user: UserDEP,
+    projection: TaskProjectionDEP,
+    conditional: ConditionalDEP,
+    filters: TaskFilterDEP,
+    sort: TaskSortDEP,
     range: Optional[TaskRangeParams] = Query(default=None, description='快速選擇日期範圍'),
     date: Optional[date] = Query(default=None, description='指定日期（若 range 有值，則略過）'),
     is_completed: Optional[bool] = Query(default=False, description='是否獲取已完成任務'),
@@ -28,21 +36,88 @@ def list_tasks(
     query = {
         'range': range,
         'date': date,
-        'is_completed': is_completed
+        'is_completed': is_completed,
+        **filters,
+        **sort
     }
-    return TaskService.list_tasks(db, user, query)
+    return TaskService.list_tasks(db, user, query, projection, conditional)
+
+@router.get(
+    '/cursor/',
+    response_model=CursorPage[partial(TaskResponse)],
+    response_model_exclude_unset=True,
+    summary='以游標分頁獲取所有任務',
+    description='依 deadline、id 排序（沒有 deadline 的任務排在最後），以上一頁的 next_cursor 取得下一頁'
+    )
+def list_tasks_cursor(
+    db: SessionDEP,
+    user: UserDEP,
+    projection: TaskProjectionDEP,
+    params: CursorDEP,
+    filters: TaskFilterDEP,
+    range: Optional[TaskRangeParams] = Query(default=None, description='快速選擇日期範圍'),
+    date: Optional[date] = Query(default=None, description='指定日期（若 range 有值，則略過）'),
+    is_completed: Optional[bool] = Query(default=False, description='是否獲取已完成任務'),
+    ):
+    query = {
+        'range': range,
+        'date': date,
+        'is_completed': is_completed,
+        **filters
+    }
+    return TaskService.list_tasks_cursor(db, user, query, params, projection)
+
+@router.get(
+    '/search/',
+    response_model=Page[partial(TaskResponse)],
+    response_model_exclude_unset=True,
+    summary='搜尋任務',
+    description='以全文索引搜尋自己任務的標題與內容，依相關度排序；以空白分隔的每個字詞都必須出現'
+    )
+def search_tasks(
+    db: SessionDEP,
+    user: UserDEP,
+    projection: TaskProjectionDEP,
+    q: str = Query(min_length=1, max_length=200, description='搜尋字詞'),
+    prefix: bool = Query(default=True, description='最後一個字詞是否以前綴比對（輸入時即時搜尋）'),
+    ):
+    return TaskService.search_tasks(db, user, q, prefix, projection)
+
+@router.get(
+    '/calendar/',
+    response_model=TaskCalendar,
+    summary='獲取每天的任務統計',
+    description='start 到 end（含）之間每天的任務數、已完成數與逾期數，並依優先度細分；未同時指定 start、end 時依 range 計算（預設為本月）'
+    )
+def task_calendar(
+    db: SessionDEP,
+    user: UserDEP,
+    start: Optional[date] = Query(default=None, description='開始日期（含）'),
+    end: Optional[date] = Query(default=None, description='結束日期（含）'),
+    range: Optional[TaskRangeParams] = Query(default=None, description='快速選擇日期範圍（start、end 未指定時使用）'),
+    ):
+    query = {
+        'start': start,
+        'end': end,
+        'range': range
+    }
+    return TaskService.task_calendar(db, user, query)
 
 @router.get(
     '/{id:int}/',
-    response_model=TaskResponse,
-    summary='獲取單一任務'
+    response_model=partial(TaskResponse),
+    response_model_exclude_unset=True,
+    summary='獲取單一任務',
+    description='回應帶有 ETag，以 If-None-Match 傳回時若任務沒有變更則回傳 304'
 )
 def get_task(
     db: SessionDEP,
     user: UserDEP,
+    projection: TaskProjectionDEP,
+    conditional: ConditionalDEP,
     id: int,
     ):
-    return TaskService.get_task(db, user, id)
+    return TaskService.get_task(db, user, id, projection, conditional)
 
 @router.post(
     '/',
@@ -53,18 +128,59 @@ def get_task(
 def create_task(db: SessionDEP, user: UserDEP, data: TaskCreate):
     return TaskService.create_task(db, user, data)
 
+@router.post(
+    '/bulk/',
+    response_model=TaskBulkResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary='批次創建任務',
+    description='atomic 為 true 時任一項目失敗則不建立任何任務並回傳 422；為 false 時建立其餘項目，失敗的項目列於 errors'
+    )
+def create_tasks(db: SessionDEP, user: UserDEP, data: TaskBulkCreate):
+    return TaskService.create_tasks(db, user, data)
+
 @router.put(
     '/{id:int}/',
     response_model=TaskResponse,
-    summary='更新現有任務'
+    summary='更新現有任務',
+    description='帶有 If-Match 時，任務已被修改（ETag 的版本不符）則回傳 412'
     )
-def update_task(db: SessionDEP, user: UserDEP, id: int, data: TaskCreate):
-    return TaskService.update_task(db, user, id, data)
+def update_task(db: SessionDEP, user: UserDEP, conditional: ConditionalDEP, id: int, data: TaskCreate):
+    return TaskService.update_task(db, user, id, data, conditional)
+
+@router.patch(
+    '/bulk/',
+    response_model=TaskBulkUpdateResponse,
+    summary='批次更新任務',
+    description='以 ids 或 filter 選擇自己的任務，套用 values 中指定的欄位，每次最多更新 BULK_UPDATE_MAX_ROWS 筆；returning 為 true 時一併回傳更新後的任務'
+    )
+def update_tasks(db: SessionDEP, user: UserDEP, data: TaskBulkUpdate):
+    return TaskService.update_tasks(db, user, data)
+
+@router.delete(
+    '/bulk/',
+    response_model=BulkDeleteResponse,
+    summary='批次刪除任務',
+    description='刪除 ids 中或符合篩選條件的自己的任務（至少需指定一項），每次最多刪除 BULK_DELETE_MAX_ROWS 筆'
+    )
+def delete_tasks(
+    db: SessionDEP,
+    user: UserDEP,
+    ids: Optional[list[int]] = Query(default=None, description='要刪除的任務 id'),
+    is_completed: Optional[bool] = Query(default=None, description='只刪除已完成（或未完成）的任務'),
+    before: Optional[datetime] = Query(default=None, description='只刪除 deadline 早於此時間的任務'),
+    ):
+    query = {
+        'ids': ids,
+        'is_completed': is_completed,
+        'before': before
+    }
+    return TaskService.delete_tasks(db, user, query)
 
 @router.delete(
     '/{id:int}/',
     status_code=status.HTTP_204_NO_CONTENT,
-    summary='刪除現有任務'
+    summary='刪除現有任務',
+    description='帶有 If-Match 時，任務已被修改（ETag 的版本不符）則回傳 412'
     )
-def delete_task(db: SessionDEP, user: UserDEP, id: int):
-    return TaskService.delete_task(db, user, id)
\ No newline at end of file
+def delete_task(db: SessionDEP, user: UserDEP, conditional: ConditionalDEP, id: int):
+    return TaskService.delete_task(db, user, id, conditional)
\ No newline at end of file
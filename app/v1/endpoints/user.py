@@ -1,41 +1,66 @@
 from fastapi import APIRouter, status, Query, UploadFile, File
-from fastapi_pagination import Page
 from typing import Optional
 
-from app.core.schemas import UserCreate, UserUpdate, UserResponse, UserPasswordUpdate, AdminUserCreate
+from app.core.schemas import UserCreate, UserUpdate, UserResponse, UserPasswordUpdate, AdminUserCreate, TaskStats
 from app.core.models import Role
-from app.services import UserService
-from app.deps import SessionDEP, UserDEP, AdminDEP
+from app.core.pagination import CursorPage, Page
+from app.core.projection import partial
+from app.core.serialization import FastJSONRoute
+from app.services import UserService, AsyncUserService, TaskService
+from app.deps import SessionDEP, UserDEP, AdminDEP, CurrentUserDEP, AsyncSessionDEP, UserProjectionDEP, CursorDEP, ConditionalDEP
 
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
 @router.get(
     '/{id:int}/',
-    response_model=UserResponse,
+    response_model=partial(UserResponse),
+    response_model_exclude_unset=True,
     summary='（需要管理者權限）獲取一般使用者、超級使用者或管理員的資料'
     )
 def get_user(
     db: SessionDEP,
     user: AdminDEP,
+    projection: UserProjectionDEP,
     id: int):
-    return UserService.get_user(db, user, id)
+    return UserService.get_user(db, user, id, projection)
 
 @router.get(
     '/',
-    response_model=Page[UserResponse],
+    response_model=Page[partial(UserResponse)],
+    response_model_exclude_unset=True,
     summary='（需要管理者權限）獲取所有使用者的資料'
     )
 def list_users(
     db: SessionDEP,
     user: AdminDEP,
+    projection: UserProjectionDEP,
+    role_id: Optional[Role] = Query(
+        default=None,
+        description='管理員=1, 超級使用者=2, 一般使用者=3'
+        )
+    ):
+    return UserService.list_users(db, role_id, projection)
+
+@router.get(
+    '/cursor/',
+    response_model=CursorPage[partial(UserResponse)],
+    response_model_exclude_unset=True,
+    summary='（需要管理者權限）以游標分頁獲取所有使用者的資料',
+    description='依 id 排序，以上一頁的 next_cursor 取得下一頁'
+    )
+def list_users_cursor(
+    db: SessionDEP,
+    user: AdminDEP,
+    projection: UserProjectionDEP,
+    params: CursorDEP,
     role_id: Optional[Role] = Query(
         default=None,
         description='管理員=1, 超級使用者=2, 一般使用者=3'
         )
     ):
-    return UserService.list_users(db, role_id)
+    return UserService.list_users_cursor(db, role_id, params, projection)
 
 @router.post(
     '/',
@@ -77,24 +102,34 @@ def delete_user(db: SessionDEP, user: UserDEP, id: int):
     response_model=UserResponse,
     status_code=status.HTTP_201_CREATED,
     summary='註冊一般使用者')
-def create_user(
-    db: SessionDEP,
+async def register_user(
+    db: AsyncSessionDEP,
     data: UserCreate):
-    return UserService.create_user(db, data)
+    return await AsyncUserService.create_user(db, data)
 
 @router.get(
     '/me/',
-    response_model=UserResponse,
-    summary='獲取使用者自己的資料')
-def get_user_me(db: SessionDEP, user: UserDEP):
-    return UserService.get_user(db, user)
+    response_model=partial(UserResponse),
+    response_model_exclude_unset=True,
+    summary='獲取使用者自己的資料',
+    description='回應帶有 ETag，以 If-None-Match 傳回時若資料、任務與標籤都沒有變更則回傳 304')
+def get_user_me(db: SessionDEP, user: UserDEP, projection: UserProjectionDEP, conditional: ConditionalDEP):
+    return UserService.get_user(db, user, projection=projection, conditional=conditional)
+
+@router.get(
+    '/me/stats/',
+    response_model=TaskStats,
+    summary='獲取使用者自己的任務統計',
+    description='未完成與已完成的任務數（依優先度、難度細分）與本週到期的未完成任務數，不需要掃描所有任務')
+def get_user_me_stats(db: SessionDEP, user: UserDEP):
+    return TaskService.task_stats(db, user)
 
 @router.put(
     '/me/',
     response_model=UserResponse,
     summary='更新使用者自己的資料'
 )
-def update_user_me(db: SessionDEP, user: UserDEP, data: UserCreate):
+def update_user_me(db: SessionDEP, user: CurrentUserDEP, data: UserCreate):
     return UserService.update_user(db, user, data)
 
 @router.put(
@@ -102,19 +137,19 @@ def update_user_me(db: SessionDEP, user: UserDEP, data: UserCreate):
     response_model=UserResponse,
     summary='重置使用者自己的密碼'
 )
-def update_user_password(db: SessionDEP, user: UserDEP, data: UserPasswordUpdate):
+def update_user_password(db: SessionDEP, user: CurrentUserDEP, data: UserPasswordUpdate):
     return UserService.update_user_password(db, user, data)
 
 @router.delete(
     '/me/',
     summary='刪除使用者自己的資料'
 )
-def delete_user_me(db: SessionDEP, user: UserDEP):
+def delete_user_me(db: SessionDEP, user: CurrentUserDEP):
     return UserService.delete_user(db, user)
     
 @router.post(
     '/headshot/me/',
     response_model=None,
     summary='上傳頭像')
-def upload_headshot(db: SessionDEP, user: UserDEP, file: UploadFile = File(...)):
+def upload_headshot(db: SessionDEP, user: CurrentUserDEP, file: UploadFile = File(...)):
     return UserService.upload_headshot(db, user, file)
\ No newline at end of file
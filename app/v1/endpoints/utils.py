@@ -0,0 +1,39 @@
+from functools import lru_cache
+from typing import Optional
+import ipaddress
+
+from fastapi import Request
+
+from app.core.config import settings
+
+
+@lru_cache
+def _trusted_networks(proxies: tuple[str, ...]) -> tuple:
+    return tuple(ipaddress.ip_network(proxy, strict=False) for proxy in proxies)
+
+
+def _is_trusted(host: str) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in _trusted_networks(tuple(settings.TRUSTED_PROXIES)))
+
+
+def client_ip(request: Request) -> Optional[str]:
+    """
+    取得請求的來源 IP
+    
+    直接連線的對象在 TRUSTED_PROXIES 中時，由 X-Forwarded-For 從右往左略過受信任的代理，
+    取第一個不受信任的位址；用戶端可自行偽造最左邊的項目，因此不直接採用。
+    """
+    host = request.client.host if request.client else None
+    if host is None or not _is_trusted(host):
+        return host
+    
+    forwarded = [item.strip() for item in request.headers.get('x-forwarded-for', '').split(',') if item.strip()]
+    for address in reversed(forwarded):
+        if not _is_trusted(address):
+            return address
+    
+    return forwarded[0] if forwarded else host
@@ -0,0 +1,101 @@
+"""
+回應壓縮基準測試
+
+產生與 Page[TaskResponse] 相同形式、不同大小的 JSON，經過 CompressionMiddleware，
+比較各壓縮等級節省的傳輸量與每次回應的 CPU 時間。
+    
+    python -m benchmarks.compression --sizes 10,100,1000,5000 --levels 1,6,9 --repeat 50
+"""
+from datetime import datetime, timedelta
+import argparse
+import asyncio
+import json
+import time
+
+from app.core.compression import CompressionMiddleware
+
+
+def page_body(items: int) -> bytes:
+    now = datetime.now()
+    page = {
+        'items': [
+            {
+                'id': i,
+                'title': f'task {i}',
+                'content': 'benchmark content for the compression benchmark',
+                'difficulty': 'MEDIUM',
+                'priority': 'MEDIUM',
+                'deadline': (now + timedelta(minutes=i)).isoformat(),
+                'user_id': 1,
+                'create_at': now.isoformat(),
+                'is_completed': False,
+                'tags': [{'id': tag, 'name': f'tag {tag}', 'owner_id': 1, 'is_public': True} for tag in range(3)]
+            }
+            for i in range(items)
+        ],
+        'total': items,
+        'page': 1,
+        'size': items,
+        'pages': 1,
+        'has_next': False
+    }
+    return json.dumps(page, separators=(',', ':')).encode()
+
+
+def json_app(body: bytes):
+    async def app(scope, receive, send):
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())]
+        })
+        await send({'type': 'http.response.body', 'body': body})
+    
+    return app
+
+
+async def respond(middleware: CompressionMiddleware) -> int:
+    """經過 middleware 送出一次回應，回傳實際傳輸的 body 位元組數"""
+    sent = 0
+    
+    async def receive():
+        return {'type': 'http.request', 'body': b''}
+    
+    async def send(message):
+        nonlocal sent
+        sent += len(message.get('body', b''))
+    
+    scope = {'type': 'http', 'method': 'GET', 'path': '/', 'headers': [(b'accept-encoding', b'gzip')]}
+    await middleware(scope, receive, send)
+    return sent
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', default='10,100,1000,5000', help='每頁的任務數')
+    parser.add_argument('--levels', default='1,6,9')
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+    
+    print(f'{"items":>8}{"level":>7}{"raw_bytes":>12}{"sent_bytes":>12}{"saved":>8}{"cpu_ms":>10}{"MB/s":>9}')
+    for items in map(int, args.sizes.split(',')):
+        body = page_body(items)
+        for level in map(int, args.levels.split(',')):
+            middleware = CompressionMiddleware(json_app(body), level=level)
+            
+            async def run():
+                sent = 0
+                for _ in range(args.repeat):
+                    sent = await respond(middleware)
+                return sent
+            
+            started_at = time.process_time()
+            sent = asyncio.run(run())
+            cpu = (time.process_time() - started_at) / args.repeat
+            
+            saved = 1 - sent / len(body)
+            print(f'{items:>8}{level:>7}{len(body):>12}{sent:>12}{saved:>8.1%}{cpu * 1000:>10.3f}{len(body) / cpu / 1e6:>9.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""
+登入限流基準測試
+
+模擬針對單一帳號的暴力登入（同一來源 IP、錯誤密碼），
+比較開啟與關閉限流時整個行程消耗的 CPU 時間。
+
+    python -m benchmarks.login_throttle --attempts 200
+"""
+from collections import Counter
+import argparse
+
+from app.core.hashing import password_hasher
+from app.core.throttle import login_throttle
+from .utils import benchmark_client, measure
+
+
+def attack(client, attempts: int) -> Counter:
+    codes = Counter()
+    for _ in range(attempts):
+        response = client.post('/auth/login/', json={'username': 'admin', 'password': 'wrong'})
+        codes[response.status_code] += 1
+    return codes
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--attempts', type=int, default=200)
+    args = parser.parse_args()
+    
+    with benchmark_client() as (client, _):
+        print(f'{"throttle":<10}{"cpu_s":>10}{"wall_s":>10}{"bcrypt":>10}  status codes')
+        for enabled in (False, True):
+            login_throttle.enabled = enabled
+            login_throttle.storage.clear()
+            hashed_before = password_hasher.stats()['completed']
+            
+            codes = Counter()
+            result = measure(lambda: codes.update(attack(client, args.attempts)))
+            
+            bcrypt_calls = password_hasher.stats()['completed'] - hashed_before
+            label = 'on' if enabled else 'off'
+            print(f'{label:<10}{result["cpu_s"]:>10.2f}{result["wall_s"]:>10.2f}{bcrypt_calls:>10}  {dict(codes)}')
+
+
+if __name__ == '__main__':
+    main()
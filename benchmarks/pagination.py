@@ -0,0 +1,101 @@
+"""
+分頁基準測試
+
+在暫存資料庫中建立大量任務與用戶，比較 OFFSET 分頁與游標分頁
+取得第 1 頁與深層頁面（預設第 10,000 頁）的回應時間。
+    
+    python -m benchmarks.pagination --rows 200000 --size 20 --page 10000
+"""
+from datetime import datetime, timedelta
+from statistics import median
+import argparse
+import time
+
+from sqlalchemy import insert, select
+
+from app.core.models import Task, User
+from app.core.pagination import encode_cursor
+from .utils import benchmark_client
+
+
+def seed(Session, rows: int):
+    now = datetime.now()
+    with Session() as db:
+        admin_id = db.scalar(select(User.id).where(User.username == 'admin'))
+        db.execute(insert(Task), [
+            {
+                'title': f'task {i}',
+                'content': 'benchmark',
+                'difficulty': 'MEDIUM',
+                'priority': 'MEDIUM',
+                'deadline': now + timedelta(minutes=i % 50000),
+                'user_id': admin_id,
+                'create_at': now,
+                'is_completed': False
+            }
+            for i in range(rows)
+        ])
+        db.execute(insert(User), [
+            {'username': f'user{i}', 'email': f'user{i}@example.com', 'password': 'x', 'role_id': 3, 'coin': 0}
+            for i in range(rows)
+        ])
+        db.commit()
+
+
+def deep_cursor(Session, stmt, offset: int) -> str:
+    """直接查出第 offset 筆的排序鍵，作為深層頁面的游標（逐頁走到第 10,000 頁太慢）"""
+    with Session() as db:
+        return encode_cursor(db.execute(stmt.offset(offset - 1).limit(1)).one())
+
+
+def timed(client, url: str, header: dict, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        response = client.get(url, headers=header)
+        samples.append(time.perf_counter() - started_at)
+        assert response.status_code == 200, response.text
+    return median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--size', type=int, default=20)
+    parser.add_argument('--page', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    
+    offset = (args.page - 1) * args.size
+    assert offset < args.rows, '--rows 不足以產生指定的頁數'
+    
+    with benchmark_client() as (client, Session):
+        seed(Session, args.rows)
+        token = client.post('/auth/token/', data={'username': 'admin', 'password': '12345'}).json()['access_token']
+        header = {'Authorization': f'Bearer {token}'}
+        
+        task_cursor = deep_cursor(
+            Session,
+            select(Task.deadline, Task.id).where(Task.deadline != None, ~Task.is_completed).order_by(Task.deadline, Task.id),
+            offset
+        )
+        user_cursor = deep_cursor(Session, select(User.id).order_by(User.id), offset)
+        
+        cases = [
+            ('tasks', 'offset', 1, f'/tasks/?page=1&size={args.size}'),
+            ('tasks', 'offset', args.page, f'/tasks/?page={args.page}&size={args.size}'),
+            ('tasks', 'cursor', 1, f'/tasks/cursor/?size={args.size}'),
+            ('tasks', 'cursor', args.page, f'/tasks/cursor/?size={args.size}&cursor={task_cursor}'),
+            ('users', 'offset', 1, f'/users/?page=1&size={args.size}&include='),
+            ('users', 'offset', args.page, f'/users/?page={args.page}&size={args.size}&include='),
+            ('users', 'cursor', 1, f'/users/cursor/?size={args.size}&include='),
+            ('users', 'cursor', args.page, f'/users/cursor/?size={args.size}&include=&cursor={user_cursor}'),
+        ]
+        
+        print(f'{"resource":<10}{"mode":<8}{"page":>8}{"median_ms":>12}')
+        for resource, mode, page, url in cases:
+            print(f'{resource:<10}{mode:<8}{page:>8}{timed(client, url, header, args.repeat):>12.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+回應序列化基準測試
+
+以記憶體中的 Task ORM 物件（含標籤）組成 Page[TaskResponse]，比較 FastAPI 預設的序列化
+（驗證、model_dump、json.dumps）與 FastJSONRoute（驗證後以 pydantic-core 直接輸出 JSON bytes）
+每次請求的時間與 CPU。
+    
+    python -m benchmarks.serialization --sizes 10,100,1000 --repeat 200
+"""
+from datetime import datetime, timedelta
+from statistics import median
+import argparse
+import time
+
+from fastapi import APIRouter, FastAPI
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.models import Tag, Task
+from app.core.pagination import Page
+from app.core.schemas import TaskResponse
+from app.core.serialization import FastJSONRoute
+
+
+def build_tasks(items: int) -> list[Task]:
+    now = datetime.now()
+    tags = [Tag(id=i, name=f'tag {i}', owner_id=1, is_public=True) for i in range(3)]
+    return [
+        Task(
+            id=i,
+            title=f'task {i}',
+            content='benchmark',
+            deadline=now + timedelta(minutes=i),
+            user_id=1,
+            create_at=now,
+            is_completed=False,
+            tags=tags
+        )
+        for i in range(items)
+    ]
+
+
+def create_client(route_class, tasks: list[Task]) -> TestClient:
+    router = APIRouter(route_class=route_class)
+    
+    @router.get('/tasks/', response_model=Page[TaskResponse])
+    def list_tasks():
+        return {'items': tasks, 'total': len(tasks), 'page': 1, 'size': len(tasks), 'pages': 1, 'has_next': False}
+    
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', default='10,100,1000', help='每頁的任務數')
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+    # FastJSONRoute 只在 FAST_JSON_RESPONSES 開啟時生效
+    settings.FAST_JSON_RESPONSES = True
+    
+    print(f'{"items":>8}{"route":>14}{"median_ms":>12}{"cpu_ms":>10}{"bytes":>10}')
+    for items in map(int, args.sizes.split(',')):
+        tasks = build_tasks(items)
+        for name, route_class in (('fastapi', APIRoute), ('fast_json', FastJSONRoute)):
+            client = create_client(route_class, tasks)
+            size = len(client.get('/tasks/').content)
+            
+            elapsed = []
+            cpu = time.process_time()
+            for _ in range(args.repeat):
+                started_at = time.perf_counter()
+                client.get('/tasks/')
+                elapsed.append(time.perf_counter() - started_at)
+            cpu = (time.process_time() - cpu) / args.repeat
+            
+            print(f'{items:>8}{name:>14}{median(elapsed) * 1000:>12.3f}{cpu * 1000:>10.3f}{size:>10}')
+
+
+if __name__ == '__main__':
+    main()
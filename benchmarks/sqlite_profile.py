@@ -0,0 +1,107 @@
+"""
+SQLite 效能設定基準測試
+
+在同一個暫存資料庫上同時執行讀取與寫入執行緒，比較原本的設定
+（rollback journal、讀寫共用連線池）與 SQLITE_PERFORMANCE_PROFILE
+（WAL、單一寫入連線、query_only 讀取連線池）的吞吐量。
+    
+    python -m benchmarks.sqlite_profile --readers 8 --writers 2 --seconds 5
+"""
+from collections import Counter
+from threading import Event, Thread
+import argparse
+import os
+import tempfile
+import time
+
+from sqlalchemy import exc, select
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import SQLModel
+
+from app.core.models import Task
+from app.core.models.database import create_sqlite_engines
+from init_db import init_admin, init_roles
+
+
+def seed(Session, tasks: int):
+    db = Session()
+    init_roles(db)
+    init_admin(db)
+    db.add_all(Task(title=f'task {i}', content='benchmark', user_id=1) for i in range(tasks))
+    db.commit()
+    db.close()
+
+
+def reader(Session, stop: Event, counts: Counter):
+    stmt = select(Task).where(Task.user_id == 1).order_by(Task.id.desc()).limit(20)
+    while not stop.is_set():
+        db = Session()
+        try:
+            db.execute(stmt).scalars().all()
+            counts['reads'] += 1
+        except exc.OperationalError:
+            counts['read_errors'] += 1
+        finally:
+            db.close()
+
+
+def writer(Session, stop: Event, counts: Counter):
+    while not stop.is_set():
+        db = Session()
+        try:
+            db.add(Task(title='new task', content='benchmark', user_id=1))
+            db.commit()
+            counts['writes'] += 1
+        except exc.OperationalError:
+            db.rollback()
+            counts['write_errors'] += 1
+        finally:
+            db.close()
+
+
+def run(profile: bool, args) -> Counter:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        url = f"sqlite:///{os.path.join(tmpdir, 'benchmark.db')}"
+        writer_engine, reader_engine = create_sqlite_engines(url, profile)
+        SQLModel.metadata.create_all(bind=writer_engine)
+        WriterSession = sessionmaker(autocommit=False, autoflush=False, bind=writer_engine)
+        ReaderSession = sessionmaker(autocommit=False, autoflush=False, bind=reader_engine)
+        seed(WriterSession, args.tasks)
+        
+        # 每個執行緒各自計數，結束後再加總
+        stop = Event()
+        workers = [(reader, ReaderSession)] * args.readers + [(writer, WriterSession)] * args.writers
+        counters = [Counter() for _ in workers]
+        threads = [Thread(target=fn, args=(Session, stop, counts)) for (fn, Session), counts in zip(workers, counters)]
+        for thread in threads:
+            thread.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        
+        writer_engine.dispose()
+        reader_engine.dispose()
+        return sum(counters, Counter())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--tasks', type=int, default=1000)
+    args = parser.parse_args()
+    
+    print(f'{"profile":<10}{"reads/s":>10}{"writes/s":>10}{"read_err":>10}{"write_err":>10}')
+    for profile in (False, True):
+        counts = run(profile, args)
+        label = 'on' if profile else 'off'
+        print(
+            f'{label:<10}{counts["reads"] / args.seconds:>10.0f}{counts["writes"] / args.seconds:>10.0f}'
+            f'{counts["read_errors"]:>10}{counts["write_errors"]:>10}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+任務寫入路徑基準測試
+
+計算 POST / PUT / DELETE /tasks/ 每次呼叫對資料庫執行的 SQL 數量與回應時間。
+    
+    python -m benchmarks.task_writes --calls 200 --tags 3
+"""
+from statistics import median
+import argparse
+import time
+
+from sqlalchemy import event, insert, select
+
+from app.core.models import Tag, User
+from .utils import benchmark_client
+
+
+def seed_tags(Session, count: int) -> list[int]:
+    with Session() as db:
+        admin_id = db.scalar(select(User.id).where(User.username == 'admin'))
+        ids = db.scalars(
+            insert(Tag).returning(Tag.id),
+            [{'name': f'tag {i}', 'owner_id': admin_id, 'is_public': False} for i in range(count)]
+        ).all()
+        db.commit()
+        return list(ids)
+
+
+def task_data(tag_ids: list[int]) -> dict:
+    return {
+        'title': 'benchmark',
+        'content': 'benchmark',
+        'difficulty': 'MEDIUM',
+        'priority': 'MEDIUM',
+        'deadline': None,
+        'tag_ids': tag_ids
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--calls', type=int, default=200)
+    parser.add_argument('--tags', type=int, default=3)
+    args = parser.parse_args()
+    
+    with benchmark_client() as (client, Session):
+        tag_ids = seed_tags(Session, args.tags * 2)
+        token = client.post('/auth/token/', data={'username': 'admin', 'password': '12345'}).json()['access_token']
+        header = {'Authorization': f'Bearer {token}'}
+        client.get('/users/me/', headers=header)
+        
+        statements = []
+        event.listen(
+            Session.kw['bind'],
+            'before_cursor_execute',
+            lambda conn, cursor, statement, *args: statements.append(statement)
+        )
+        
+        results = {}
+        
+        def call(name: str, method: str, url: str, expected: int, **kwargs):
+            del statements[:]
+            started_at = time.perf_counter()
+            response = client.request(method, url, headers=header, **kwargs)
+            elapsed = time.perf_counter() - started_at
+            assert response.status_code == expected, response.text
+            
+            samples = results.setdefault(name, ([], []))
+            samples[0].append(len(statements))
+            samples[1].append(elapsed)
+            return response
+        
+        ids = []
+        for _ in range(args.calls):
+            response = call('create', 'POST', '/tasks/', 201, json=task_data(tag_ids[:args.tags]))
+            ids.append(response.json()['id'])
+        for id in ids:
+            # 保留一個標籤、替換其餘的標籤
+            call('update', 'PUT', f'/tasks/{id}/', 200, json=task_data(tag_ids[args.tags - 1:]))
+        for id in ids:
+            call('delete', 'DELETE', f'/tasks/{id}/', 204)
+        
+        print(f'{"operation":<12}{"statements":>12}{"median_ms":>12}')
+        for name, (counts, elapsed) in results.items():
+            print(f'{name:<12}{median(counts):>12.0f}{median(elapsed) * 1000:>12.2f}')
+
+
+if __name__ == '__main__':
+    main()
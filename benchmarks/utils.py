@@ -0,0 +1,74 @@
+"""
+基準測試共用工具
+
+基準測試使用獨立的 SQLite 檔案，不會動到 .env 指定的資料庫；
+執行前仍需要 .env（或環境變數）提供 Settings 的必填欄位。
+"""
+from contextlib import contextmanager
+from typing import Callable
+import os
+import tempfile
+import time
+
+from fastapi.testclient import TestClient
+from sqlmodel import SQLModel, create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.core.models import get_db, get_async_db
+from app.core.models.database import enable_sqlite_foreign_keys, to_async_url
+from app.main import app
+from init_db import init_admin, init_roles, init_tags
+
+
+@contextmanager
+def benchmark_client(database_url: str = None):
+    """建立一個連到暫存資料庫、並已初始化基礎數據的 TestClient"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        url = database_url or f"sqlite:///{os.path.join(tmpdir, 'benchmark.db')}"
+        engine = create_engine(url, connect_args={"check_same_thread": False})
+        enable_sqlite_foreign_keys(engine)
+        SQLModel.metadata.create_all(bind=engine)
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        
+        db = Session()
+        init_roles(db)
+        init_admin(db)
+        init_tags(db)
+        db.close()
+        
+        # 非同步路由（登入等）也要連到同一個暫存資料庫
+        async_engine = create_async_engine(to_async_url(url), poolclass=NullPool)
+        enable_sqlite_foreign_keys(async_engine.sync_engine)
+        AsyncSession = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+        
+        def override_get_db():
+            session = Session()
+            try:
+                yield session
+            finally:
+                session.close()
+        
+        async def override_get_async_db():
+            async with AsyncSession() as session:
+                yield session
+        
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_async_db] = override_get_async_db
+        try:
+            yield TestClient(app), Session
+        finally:
+            app.dependency_overrides.clear()
+            engine.dispose()
+
+
+def measure(fn: Callable, repeat: int = 1) -> dict:
+    """回傳執行 fn 的牆鐘時間與整個行程（含背景執行緒）的 CPU 時間"""
+    cpu, wall = time.process_time(), time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return {
+        'wall_s': time.perf_counter() - wall,
+        'cpu_s': time.process_time() - cpu
+    }
@@ -0,0 +1,17 @@
+from app.core.models import reindex_tasks
+from app.core.models.database import SessionLocal
+
+
+def rebuild_task_search():
+    """以所有任務重建全文搜尋索引；變更 TASK_SEARCH_TOKENIZER 後執行"""
+    db = SessionLocal()
+    try:
+        count = reindex_tasks(db)
+        db.commit()
+    finally:
+        db.close()
+    
+    print(f'{count} task(s) indexed')
+
+if __name__ == "__main__":
+    rebuild_task_search()
\ No newline at end of file
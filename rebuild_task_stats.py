@@ -0,0 +1,36 @@
+import argparse
+import sys
+
+from app.core.models.database import SessionLocal
+from app.services import TaskStatsService
+
+
+def rebuild_task_stats(user_ids: list[int] = None, verify: bool = False) -> list[dict]:
+    """由 tasks 重新計算 user_task_stats 並回報不一致的分組；verify 為 True 時只檢查、不修正"""
+    db = SessionLocal()
+    try:
+        drift = TaskStatsService.rebuild(db, user_ids, fix=not verify)
+    finally:
+        db.close()
+    
+    for row in drift:
+        print(
+            f"user {row['user_id']} "
+            f"is_completed={row['is_completed']} priority={row['priority'].value} difficulty={row['difficulty'].value}: "
+            f"expected {row['expected']}, found {row['actual']}"
+        )
+    print(f"{len(drift)} drifted group(s){'' if verify or not drift else ', rebuilt'}")
+    
+    return drift
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description='重新計算每個用戶的任務統計（user_task_stats）')
+    parser.add_argument('--verify', action='store_true', help='只檢查並回報不一致，不修正；有不一致時結束代碼為 1')
+    parser.add_argument('--user-id', type=int, action='append', dest='user_ids', help='只處理指定的用戶，可重複指定')
+    args = parser.parse_args(argv)
+    
+    drift = rebuild_task_stats(args.user_ids, verify=args.verify)
+    return 1 if args.verify and drift else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
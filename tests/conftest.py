@@ -1,11 +1,18 @@
 from pytest import fixture
 from sqlmodel import create_engine, SQLModel, Session
 from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
-from app.core.models import get_db
+from sqlalchemy.pool import NullPool
+from app.core.models import get_db, get_async_db
+from app.core.models.database import enable_sqlite_foreign_keys
 from fastapi.testclient import TestClient
 
 from app.main import app
+from app.core.pagination import count_cache
+from app.core.throttle import login_throttle
+from app.services import AuthService
+from app.services.tag import public_tags
 from init_db import init_admin, init_roles, init_tags
 
 
@@ -15,8 +22,18 @@ engine = create_engine(
     TEST_DATABASE_URL,
     connect_args={"check_same_thread": False}
 )
+enable_sqlite_foreign_keys(engine)
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 非同步路由使用同一個測試資料庫；TestClient 每個請求可能使用不同的事件迴圈，因此不共用連線
+async_engine = create_async_engine('sqlite+aiosqlite:///./test.db', poolclass=NullPool)
+enable_sqlite_foreign_keys(async_engine.sync_engine)
+TestingAsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+async def get_test_async_db():
+    async with TestingAsyncSessionLocal() as session:
+        yield session
+
 @fixture(scope='session')
 def db():
     """提供整個測試 session 使用的資料庫連接"""
@@ -36,6 +53,7 @@ def db():
 def client(db: Session):
     """提供測試用的 API 客戶端"""
     app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_async_db] = get_test_async_db
     test_client = TestClient(app)
     yield test_client
     app.dependency_overrides.clear()
@@ -47,6 +65,12 @@ def setup_and_cleanup(db: Session):
     SQLModel.metadata.drop_all(bind=engine)
     SQLModel.metadata.create_all(bind=engine)
     
+    # 清理行程內快取（資料表重建後 id 會重複使用）
+    AuthService.clear_cache()
+    login_throttle.storage.clear()
+    count_cache.clear()
+    public_tags.clear()
+    
     # 初始化基礎數據
     init_roles(db)
     init_admin(db)
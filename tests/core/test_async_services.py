@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from fastapi_pagination import Params, set_page, set_params
+
+from tests.conftest import TestingAsyncSessionLocal
+from tests.fixtures.generals import *
+from app.core.config import settings
+from app.core.pagination import Page
+from app.core.schemas import TaskCreate, Principal
+from app.services import AsyncTagService, AsyncTaskService, AsyncUserService, TaskStatsService
+
+
+def run(coro_fn):
+    async def _run():
+        async with TestingAsyncSessionLocal() as session:
+            return await coro_fn(session)
+    return asyncio.run(_run())
+
+
+class TestAsyncTaskService:
+    def test_task_crud_success(self, db: Session, create_user):
+        user: User = create_user()
+        principal = Principal(user.id, user.role_id, 0)
+        
+        task = run(lambda db: AsyncTaskService.create_task(db, principal, TaskCreate(**create_task_data([1, 2]))))
+        assert [tag.id for tag in task.tags] == [1, 2]
+        
+        data = TaskCreate(**{**create_task_data([2, 3]), 'priority': 'HIGH'})
+        task = run(lambda db: AsyncTaskService.update_task(db, principal, task.id, data))
+        assert task.title == data.title
+        assert sorted(tag.id for tag in task.tags) == [2, 3]
+        assert TaskStatsService.rebuild(db, [user.id], fix=False) == []
+        
+        async def list_tasks(db):
+            with set_page(Page), set_params(Params(page=1, size=50)):
+                return await AsyncTaskService.list_tasks(db, principal, {'is_completed': False})
+        page = run(list_tasks)
+        assert page.total == 1
+        assert page.has_next is False
+        assert len(page.items[0].get('tags')) == 2
+        
+        run(lambda db: AsyncTaskService.delete_task(db, principal, task.id))
+        assert TaskStatsService.rebuild(db, [user.id], fix=False) == []
+        with pytest.raises(HTTPException) as exc:
+            run(lambda db: AsyncTaskService.get_task(db, principal, task.id))
+        assert exc.value.status_code == 404
+    
+    def test_update_tags_only_bumps_version(self, create_user):
+        user: User = create_user()
+        principal = Principal(user.id, user.role_id, 0)
+        data = TaskCreate(**create_task_data([1, 2]))
+        
+        task = run(lambda db: AsyncTaskService.create_task(db, principal, data))
+        updated = run(lambda db: AsyncTaskService.update_task(db, principal, task.id, data.model_copy(update={'tag_ids': [2, 3]})))
+        
+        assert sorted(tag.id for tag in updated.tags) == [2, 3]
+        assert updated.version == task.version + 1
+    
+    def test_create_task_fail_tag_not_found(self, db: Session, create_user):
+        user: User = create_user()
+        principal = Principal(user.id, user.role_id, 0)
+        
+        with pytest.raises(HTTPException) as exc:
+            run(lambda db: AsyncTaskService.create_task(db, principal, TaskCreate(**create_task_data([1, 9999]))))
+        
+        assert exc.value.status_code == 404
+        # 標籤驗證失敗時不會留下建立到一半的任務
+        assert db.query(Task).filter(Task.user_id == user.id).count() == 0
+
+
+class TestAsyncUserService:
+    def test_get_user_loads_response_relations(self, create_user, create_task):
+        user: User = create_user()
+        create_task(user.id)
+        principal = Principal(user.id, user.role_id, 0)
+        
+        loaded = run(lambda db: AsyncUserService.get_user(db, principal))
+        
+        assert loaded.role.id == user.role_id
+        assert len(loaded.tasks) == 1
+        assert loaded.tags == []
+    
+    def test_list_users_count_mode_none(self, create_user, monkeypatch):
+        monkeypatch.setattr(settings, 'PAGINATION_COUNT_MODE', 'none')
+        for _ in range(2):
+            create_user()
+        
+        async def list_users(db):
+            with set_page(Page), set_params(Params(page=1, size=2)):
+                return await AsyncUserService.list_users(db, None)
+        page = run(list_users)
+        
+        assert page.total is None
+        assert page.has_next is True
+        assert [user.get('id') for user in page.items] == [1, 2]
+
+
+class TestAsyncTagService:
+    def test_list_tags_merges_public_catalog(self, create_user, create_tag):
+        user: User = create_user()
+        own_tag: Tag = create_tag(user.id, False)
+        create_tag(create_user().id, False)
+        principal = Principal(user.id, user.role_id, 0)
+        
+        async def list_tags(db):
+            with set_params(Params(page=1, size=50)):
+                return await AsyncTagService.list_tags(db, principal, True)
+        page = run(list_tags)
+        
+        assert [tag.get('id') for tag in page.items] == [1, 2, 3, own_tag.id]
+        assert page.total == 4
@@ -0,0 +1,120 @@
+import gzip
+import threading
+
+from fastapi import Depends, FastAPI
+from fastapi.responses import Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core import compression
+from app.core.compression import CompressionMiddleware, accepts_gzip, skip_compression
+
+
+PAYLOAD = [{'id': i, 'title': f'task {i}'} for i in range(500)]
+
+
+def create_client(**options) -> TestClient:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, **{'minimum_size': 1024, **options})
+    
+    @app.get('/large/')
+    def large():
+        return PAYLOAD
+    
+    @app.get('/small/')
+    def small():
+        return {'id': 1}
+    
+    @app.get('/opt-out/', dependencies=[Depends(skip_compression)])
+    def opt_out():
+        return PAYLOAD
+    
+    @app.get('/image/')
+    def image():
+        return Response(b'\x89PNG' * 1000, media_type='image/png')
+    
+    @app.get('/stream/')
+    def stream():
+        return StreamingResponse((f'line {i}\n' for i in range(5000)), media_type='text/plain')
+    
+    return TestClient(app)
+
+
+class TestCompression:
+    def test_accepts_gzip(self):
+        assert accepts_gzip('gzip, deflate, br')
+        assert accepts_gzip('*')
+        assert not accepts_gzip('gzip;q=0, deflate')
+        assert not accepts_gzip('br')
+        assert not accepts_gzip(None)
+    
+    def test_compress_large_json(self):
+        client = create_client()
+        
+        response = client.get('/large/', headers={'Accept-Encoding': 'gzip'})
+        
+        assert response.headers.get('content-encoding') == 'gzip'
+        assert response.headers.get('vary') == 'Accept-Encoding'
+        assert int(response.headers.get('content-length')) < len(response.content)
+        assert response.json() == PAYLOAD
+    
+    def test_not_negotiated(self):
+        client = create_client()
+        
+        response = client.get('/large/', headers={'Accept-Encoding': 'identity'})
+        
+        assert 'content-encoding' not in response.headers
+        assert response.json() == PAYLOAD
+    
+    def test_skip_small_opt_out_and_binary(self):
+        client = create_client()
+        headers = {'Accept-Encoding': 'gzip'}
+        
+        for url in ('/small/', '/opt-out/', '/image/'):
+            response = client.get(url, headers=headers)
+            assert response.status_code == 200
+            assert 'content-encoding' not in response.headers
+    
+    def test_stream_large_body(self):
+        client = create_client(stream_threshold=4096)
+        
+        with client.stream('GET', '/large/', headers={'Accept-Encoding': 'gzip'}) as response:
+            raw = b''.join(response.iter_raw())
+        
+        assert response.headers.get('content-encoding') == 'gzip'
+        assert 'content-length' not in response.headers
+        assert gzip.decompress(raw).decode().startswith('[{"id":0')
+    
+    def test_stream_response(self):
+        client = create_client()
+        
+        response = client.get('/stream/', headers={'Accept-Encoding': 'gzip'})
+        
+        assert response.headers.get('content-encoding') == 'gzip'
+        assert response.text.count('\n') == 5000
+    
+    def test_large_body_compressed_off_event_loop(self, monkeypatch):
+        threads = []
+        compress = compression._GzipResponder._compress_sync
+        
+        def record(self, data, flush):
+            threads.append(threading.current_thread())
+            return compress(self, data, flush)
+        
+        monkeypatch.setattr(compression._GzipResponder, '_compress_sync', record)
+        client = create_client(thread_threshold=4096)
+        headers = {'Accept-Encoding': 'gzip'}
+        
+        loop_thread = []
+        
+        @client.app.get('/loop/')
+        async def loop():
+            loop_thread.append(threading.current_thread())
+            return {'text': 'x' * 2048}
+        
+        assert client.get('/large/', headers=headers).json() == PAYLOAD
+        assert client.get('/loop/', headers=headers).json() == {'text': 'x' * 2048}
+        
+        # /large/ 超過 thread_threshold，在專用的執行緒池中壓縮；/loop/ 的回應直接在事件迴圈上壓縮
+        assert threads[0] is not loop_thread[0]
+        assert threads[0].name.startswith('gzip')
+        assert threads[1] is loop_thread[0]
@@ -0,0 +1,40 @@
+import pytest
+from fastapi import HTTPException, Response
+from starlette.requests import Request
+
+from app.core.etag import Conditional, entity_etag, make_etag
+
+
+def conditional(**headers) -> Conditional:
+    scope = {
+        'type': 'http',
+        'headers': [(name.replace('_', '-').lower().encode(), value.encode()) for name, value in headers.items()]
+    }
+    return Conditional(Request(scope), Response())
+
+
+class TestConditional:
+    def test_etag_is_stable(self):
+        assert make_etag('tasks', 1, 3) == make_etag('tasks', 1, 3)
+        assert make_etag('tasks', 1, 3) != make_etag('tasks', 1, 4)
+        assert entity_etag(3, 'title').startswith('"3-')
+    
+    def test_not_modified(self):
+        etag = entity_etag(2)
+        
+        with pytest.raises(HTTPException) as exc:
+            conditional(If_None_Match=f'"other", W/{etag}').not_modified(etag)
+        assert exc.value.status_code == 304
+        
+        request = conditional(If_None_Match='"other"')
+        request.not_modified(etag)
+        assert request.response.headers['ETag'] == etag
+    
+    def test_require_version(self):
+        conditional().require_version(3)
+        conditional(If_Match='*').require_version(3)
+        conditional(If_Match=entity_etag(3, 'title')).require_version(3)
+        
+        with pytest.raises(HTTPException) as exc:
+            conditional(If_Match=f'{entity_etag(2)}, "garbage"').require_version(3)
+        assert exc.value.status_code == 412
@@ -0,0 +1,32 @@
+from threading import Event
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.hashing import PasswordHasher
+
+
+class TestPasswordHasher:
+    def test_hash_and_verify_success(self):
+        hasher = PasswordHasher(max_workers=1, max_queue=1)
+        
+        hashed = hasher.hash('12345')
+        
+        assert hasher.verify('12345', hashed)
+        assert not hasher.verify('54321', hashed)
+        assert hasher.stats()['completed'] == 3
+        
+    def test_queue_full_fail_busy(self):
+        hasher = PasswordHasher(max_workers=1, max_queue=0)
+        release = Event()
+        future = hasher._submit(release.wait)
+        
+        with pytest.raises(HTTPException) as exc:
+            hasher.hash('12345')
+        
+        release.set()
+        future.result()
+        
+        assert exc.value.status_code == 503
+        assert hasher.stats()['rejected'] == 1
+        assert hasher.stats()['in_flight'] == 0
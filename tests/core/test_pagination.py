@@ -0,0 +1,81 @@
+from app.core.pagination import CountCache
+
+
+def counter(value: int):
+    calls = []
+    
+    def count():
+        calls.append(value)
+        return value
+    
+    return count, calls
+
+
+class TestCountCache:
+    def test_cached_until_invalidated(self):
+        cache = CountCache(100, 60)
+        count, calls = counter(3)
+        
+        assert cache.get_or_count('tasks', 1, 'all', count) == 3
+        assert cache.get_or_count('tasks', 1, 'all', count) == 3
+        assert len(calls) == 1
+        
+        cache.invalidate('tasks', 1)
+        assert cache.get_or_count('tasks', 1, 'all', count) == 3
+        assert len(calls) == 2
+    
+    def test_invalidate_scope(self):
+        cache = CountCache(100, 60)
+        count, calls = counter(3)
+        
+        cache.get_or_count('tasks', 1, 'all', count)
+        cache.get_or_count('tasks', 2, 'all', count)
+        
+        cache.invalidate('tasks', 2)
+        cache.get_or_count('tasks', 1, 'all', count)
+        assert len(calls) == 2
+        
+        cache.get_or_count('tasks', 2, 'all', count)
+        assert len(calls) == 3
+    
+    def test_invalidate_resource(self):
+        cache = CountCache(100, 60)
+        count, calls = counter(3)
+        
+        cache.get_or_count('tags', 1, True, count)
+        cache.get_or_count('tags', 2, True, count)
+        cache.get_or_count('users', None, None, count)
+        
+        cache.invalidate('tags')
+        cache.get_or_count('tags', 1, True, count)
+        cache.get_or_count('tags', 2, True, count)
+        cache.get_or_count('users', None, None, count)
+        assert len(calls) == 5
+    
+    def test_invalidate_during_count(self):
+        cache = CountCache(100, 60)
+        
+        def stale_count():
+            # 計數期間發生寫入，這次的結果不應被之後的請求讀到
+            cache.invalidate('tasks', 1)
+            return 3
+        
+        assert cache.get_or_count('tasks', 1, 'all', stale_count) == 3
+        
+        count, calls = counter(4)
+        assert cache.get_or_count('tasks', 1, 'all', count) == 4
+        assert len(calls) == 1
+    
+    def test_versions_bounded(self):
+        cache = CountCache(2, 60)
+        count, calls = counter(3)
+        
+        cache.get_or_count('tasks', 1, 'all', count)
+        for user_id in range(1, 10):
+            cache.invalidate('tasks', user_id)
+        assert cache._versions.stats()['size'] == 2
+        
+        # 版本號被淘汰後，舊版本下的總數不會再被讀到
+        count, calls = counter(4)
+        assert cache.get_or_count('tasks', 1, 'all', count) == 4
+        assert len(calls) == 1
@@ -0,0 +1,46 @@
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+from app.core.models.pool_metrics import InstrumentedQueuePool, instrument_engine, pool_stats
+
+
+@pytest.fixture
+def pool_engine(tmp_path):
+    engine = create_engine(
+        f'sqlite:///{tmp_path}/pool.db',
+        poolclass=InstrumentedQueuePool,
+        pool_logging_name='test_pool',
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.1
+    )
+    metrics = instrument_engine(engine, 'test_pool')
+    metrics.reset()
+    yield engine
+    engine.dispose()
+
+
+class TestPoolMetrics:
+    def test_checkout_checkin_success(self, pool_engine):
+        with pool_engine.connect() as conn:
+            conn.execute(text('SELECT 1'))
+            
+            stats = pool_stats()['test_pool']
+            assert stats['in_use'] == 1
+            assert stats['idle'] == 0
+        
+        stats = pool_stats()['test_pool']
+        assert stats['checkouts'] == 1
+        assert stats['in_use'] == 0
+        assert stats['peak_in_use'] == 1
+        assert stats['size'] == 1
+    
+    def test_pool_exhausted_fail_timeout(self, pool_engine):
+        with pool_engine.connect():
+            with pytest.raises(exc.TimeoutError):
+                pool_engine.connect()
+        
+        stats = pool_stats()['test_pool']
+        assert stats['timeouts'] == 1
+        assert stats['max_wait_ms'] >= 100
+        assert stats['in_use'] == 0
@@ -0,0 +1,136 @@
+from datetime import date, datetime
+from enum import Enum
+import re
+
+import pytest
+from sqlalchemy import func, select
+from sqlmodel import SQLModel, create_engine
+
+from app.core.filters import TagMatch, TaskRangeParams, parse_sort
+from app.core.models import Difficulty, Priority, Task, TaskTagLink, User, UserTaskStats
+from app.core.pagination import seek_query
+from app.core.schemas import Principal
+from app.services import AuthService, TagService, TaskService, UserService
+
+
+# 「SCAN <table>」且沒有使用索引即為全表掃描；SCAN 子查詢或部分索引則不算
+FULL_SCAN = re.compile(r'^SCAN (TABLE )?(?P<table>\w+)(?!.*USING (COVERING )?INDEX)')
+
+user = Principal(id=1, role_id=3, version=0)
+
+STATEMENTS = {
+    'list_open_tasks': TaskService._list_tasks_query(user, {'is_completed': False}),
+    'list_completed_tasks': TaskService._list_tasks_query(user, {'is_completed': True}),
+    'list_tasks_by_date': TaskService._list_tasks_query(user, {'date': date.today(), 'is_completed': False}),
+    'list_tasks_today': TaskService._list_tasks_query(user, {'range': TaskRangeParams.today, 'is_completed': False}),
+    'list_tasks_week': TaskService._list_tasks_query(user, {'range': TaskRangeParams.week, 'is_completed': True}),
+    'list_tasks_month': TaskService._list_tasks_query(user, {'range': TaskRangeParams.month, 'is_completed': False}),
+    'list_tasks_by_priority': TaskService._list_tasks_query(user, {'is_completed': False, 'sort': parse_sort('priority')}),
+    'list_tasks_by_priority_desc': TaskService._list_tasks_query(user, {'is_completed': True, 'sort': parse_sort('-priority')}),
+    'list_tasks_by_create_at': TaskService._list_tasks_query(user, {'is_completed': False, 'sort': parse_sort('-create_at')}),
+    'list_tasks_created_between': TaskService._list_tasks_query(user, {
+        'is_completed': False,
+        'created_from': datetime(2025, 1, 1),
+        'created_to': datetime(2025, 2, 1),
+        'sort': parse_sort('create_at')
+    }),
+    'list_tasks_deadline_between': TaskService._list_tasks_query(user, {
+        'is_completed': False,
+        'deadline_from': datetime(2025, 1, 1),
+        'deadline_to': datetime(2025, 2, 1)
+    }),
+    'list_tasks_without_deadline': TaskService._list_tasks_query(user, {'is_completed': False, 'no_deadline': True}),
+    'list_tasks_with_any_tag': TaskService._list_tasks_query(user, {
+        'is_completed': False,
+        'tag_ids': (1, 2),
+        'tag_match': TagMatch.any,
+        'priority': (Priority.HIGH, Priority.MEDIUM),
+        'sort': parse_sort('priority')
+    }),
+    'list_tasks_with_all_tags': TaskService._list_tasks_query(user, {
+        'is_completed': False,
+        'tag_ids': (1, 2),
+        'tag_match': TagMatch.all,
+        'difficulty': (Difficulty.HARD,)
+    }),
+    'task_calendar': TaskService._calendar_query(user, date(2025, 1, 1), date(2025, 1, 31), datetime.now()),
+    'count_tasks_due_this_week': select(func.count()).where(
+        TaskService._list_tasks_query(user, {'range': TaskRangeParams.week, 'is_completed': False}).whereclause
+    ),
+    'user_task_stats': select(UserTaskStats).where(UserTaskStats.user_id == 1),
+    'list_user_tags': TagService._own_tags_query(user),
+    'list_private_tags': TagService._own_tags_query(user, private_only=True),
+    'list_users_by_role': UserService._list_users_query(role_id=3),
+    'seek_open_tasks': seek_query(
+        TaskService._list_tasks_query(user, {'is_completed': False}).where(Task.deadline != None),
+        (Task.deadline, Task.id), (datetime.now(), 10), 51
+    ),
+    'seek_open_tasks_without_deadline': seek_query(
+        TaskService._list_tasks_query(user, {'is_completed': False}).where(Task.deadline == None),
+        (Task.id,), (10,), 51
+    ),
+    'seek_private_tags': TagService._own_tags_query(user, private_only=True, after_id=10).limit(51),
+    'seek_users': seek_query(UserService._list_users_query(role_id=None), (User.id,), (10,), 51),
+    'links_by_tag': select(TaskTagLink).where(TaskTagLink.tag_id == 1),
+    'principal': AuthService._principal_query(1),
+    'revocation_filter': AuthService._revocation_filter_query(),
+}
+
+
+@pytest.fixture(scope='module')
+def plan_engine(tmp_path_factory):
+    engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp('plans') / 'plans.db'}")
+    SQLModel.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+def query_plan(engine, statement) -> list[str]:
+    # 展開 IN 的參數；Enum 以資料庫中的值綁定
+    compiled = statement.compile(dialect=engine.dialect, compile_kwargs={'render_postcompile': True})
+    with engine.connect() as conn:
+        params = tuple(
+            value.name if isinstance(value, Enum) else value
+            for value in (compiled.params[name] for name in compiled.positiontup)
+        )
+        rows = conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {compiled}', params).all()
+    return [row[3] for row in rows]
+
+
+class TestQueryPlans:
+    @pytest.mark.parametrize('name', STATEMENTS)
+    def test_no_full_table_scan(self, plan_engine, name):
+        plan = query_plan(plan_engine, STATEMENTS[name])
+        
+        scans = [line for line in plan if FULL_SCAN.match(line)]
+        assert not scans, f'{name} falls back to a full table scan: {plan}'
+    
+    @pytest.mark.parametrize('name', [name for name in STATEMENTS if 'tasks' in name])
+    def test_task_list_ordered_by_index(self, plan_engine, name):
+        plan = query_plan(plan_engine, STATEMENTS[name])
+        
+        assert not any('TEMP B-TREE FOR ORDER BY' in line for line in plan), plan
+    
+    @pytest.mark.parametrize('name, index', [
+        ('list_tasks_by_priority', 'ix_tasks_user_id_is_completed_priority_rank'),
+        ('list_tasks_by_priority_desc', 'ix_tasks_user_id_is_completed_priority_rank'),
+        ('list_tasks_with_any_tag', 'ix_tasks_user_id_is_completed_priority_rank'),
+        ('list_tasks_by_create_at', 'ix_tasks_user_id_is_completed_create_at'),
+        ('list_tasks_created_between', 'ix_tasks_user_id_is_completed_create_at'),
+    ])
+    def test_task_list_sort_index(self, plan_engine, name, index):
+        plan = query_plan(plan_engine, STATEMENTS[name])
+        
+        assert plan[0].startswith(f'SEARCH tasks USING INDEX {index} (user_id=? AND is_completed=?'), plan
+    
+    @pytest.mark.parametrize('name', ['list_tasks_with_any_tag', 'list_tasks_with_all_tags'])
+    def test_task_list_tag_filter_uses_link_primary_key(self, plan_engine, name):
+        plan = query_plan(plan_engine, STATEMENTS[name])
+        
+        links = [line for line in plan if 'task_tag_link' in line]
+        assert links and all('(task_id=? AND tag_id=?)' in line for line in links), plan
+    
+    def test_task_calendar_covering_index(self, plan_engine):
+        plan = query_plan(plan_engine, STATEMENTS['task_calendar'])
+        
+        assert plan == ['SEARCH tasks USING COVERING INDEX ix_tasks_user_id_deadline_date (user_id=? AND <expr>>? AND <expr><?)']
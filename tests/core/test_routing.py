@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import SQLModel, create_engine
+
+from app.core.models import RevokedToken, Task, User
+from app.core.models.routing import RoutingSession
+from app.core.schemas import Principal
+from app.services import AuthService, TaskService
+
+
+def create_database(path, title: str):
+    engine = create_engine(f'sqlite:///{path}', connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(bind=engine)
+    
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        db.add(User(id=1, username='user', email='user@example.com', password='x', role_id=3))
+        db.add(Task(title=title, content='content', user_id=1))
+        db.commit()
+    return engine
+
+
+@pytest.fixture
+def RoutingSessionLocal(tmp_path):
+    """primary 與 replica 為兩個內容不同的 SQLite 檔案，藉此分辨查詢實際走哪個資料庫"""
+    primary = create_database(tmp_path / 'primary.db', 'primary')
+    replica = create_database(tmp_path / 'replica.db', 'replica')
+    yield sessionmaker(class_=RoutingSession, autoflush=False, primary=primary, replicas=[replica])
+    primary.dispose()
+    replica.dispose()
+
+
+class TestRoutingSession:
+    def test_list_tasks_read_from_replica(self, RoutingSessionLocal):
+        user = Principal(id=1, role_id=3, version=0)
+        
+        with RoutingSessionLocal() as db:
+            tasks = db.execute(TaskService._list_tasks_query(user, {'is_completed': False})).scalars().all()
+        
+        assert [task.title for task in tasks] == ['replica']
+    
+    def test_read_after_write_stay_on_primary(self, RoutingSessionLocal):
+        with RoutingSessionLocal() as db:
+            db.add(Task(title='new', content='content', user_id=1))
+            db.flush()
+            
+            titles = db.execute(select(Task.title).order_by(Task.id)).scalars().all()
+            db.rollback()
+        
+        assert titles == ['primary', 'new']
+    
+    def test_write_statement_stay_on_primary(self, RoutingSessionLocal):
+        with RoutingSessionLocal() as db:
+            db.execute(Task.__table__.delete())
+            
+            count = db.execute(select(func.count(Task.id))).scalar()
+            db.rollback()
+        
+        assert count == 0
+    
+    def test_revocation_check_reads_primary(self, RoutingSessionLocal, monkeypatch):
+        # 只寫入 primary，模擬 replica 尚未複寫到的撤銷
+        with RoutingSessionLocal() as db:
+            db.add(RevokedToken(jti='revoked', expires_at=datetime.utcnow() + timedelta(minutes=5)))
+            db.commit()
+        monkeypatch.setattr(AuthService, '_revoked_filter', None)
+        
+        with RoutingSessionLocal() as db:
+            assert AuthService.is_revoked(db, 'revoked')
+            assert not AuthService.is_revoked(db, 'other')
+            assert db.replica is not None and not db.use_primary
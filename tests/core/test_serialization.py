@@ -0,0 +1,92 @@
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, FastAPI, Response, status
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+from pytest import fixture
+
+from app.core.config import settings
+from app.core.models import Difficulty, Priority
+from app.core.projection import partial
+from app.core.schemas import TagResponse, TaskResponse
+from app.core.serialization import FastJSONRoute
+
+
+TASK = {
+    'id': 1,
+    'title': '任務',
+    'content': '內容',
+    'difficulty': Difficulty.MEDIUM,
+    'priority': Priority.HIGH,
+    'deadline': datetime(2025, 1, 2, 3, 4, 5, 678000),
+    'user_id': 1,
+    'create_at': datetime(2025, 1, 1),
+    'is_completed': False,
+    'tags': [TagResponse(id=1, name='tag', is_public=True)]
+}
+
+
+def set_etag(response: Response) -> None:
+    response.headers['ETag'] = '"1-abc"'
+
+
+def create_client(route_class) -> TestClient:
+    router = APIRouter(route_class=route_class)
+    
+    @router.get('/task/', response_model=TaskResponse, dependencies=[Depends(set_etag)])
+    def get_task():
+        return TASK
+    
+    @router.get('/tasks/', response_model=list[partial(TaskResponse)], response_model_exclude_unset=True)
+    async def list_tasks():
+        return [{'id': 1, 'title': 'a'}, {'id': 2, 'deadline': None}]
+    
+    @router.post('/task/', response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
+    def create_task():
+        return TaskResponse(**TASK)
+    
+    @router.delete('/task/', status_code=status.HTTP_204_NO_CONTENT)
+    def delete_task() -> None:
+        return None
+    
+    app = FastAPI()
+    app.include_router(router, prefix='/v1')
+    return TestClient(app)
+
+
+class TestFastJSONRoute:
+    @fixture(autouse=True)
+    def enable_fast_json(self, monkeypatch):
+        monkeypatch.setattr(settings, 'FAST_JSON_RESPONSES', True)
+    
+    def test_same_output_as_fastapi(self):
+        fast, default = create_client(FastJSONRoute), create_client(APIRoute)
+        
+        for method, url in (('GET', '/v1/task/'), ('GET', '/v1/tasks/'), ('POST', '/v1/task/'), ('DELETE', '/v1/task/')):
+            expected = default.request(method, url)
+            response = fast.request(method, url)
+            
+            assert response.status_code == expected.status_code
+            assert response.content == expected.content
+            assert response.headers.get('content-type') == expected.headers.get('content-type')
+    
+    def test_keeps_dependency_headers(self):
+        response = create_client(FastJSONRoute).get('/v1/task/')
+        
+        assert response.headers.get('ETag') == '"1-abc"'
+        assert response.json().get('difficulty') == Difficulty.MEDIUM.value
+    
+    def test_exclude_unset(self):
+        response = create_client(FastJSONRoute).get('/v1/tasks/')
+        
+        assert response.json() == [{'id': 1, 'title': 'a'}, {'id': 2, 'deadline': None}]
+    
+    def test_disabled(self, monkeypatch):
+        def serialized(client: TestClient) -> bool:
+            route = next(route for route in client.app.routes if route.path == '/v1/task/' and 'GET' in route.methods)
+            return hasattr(route.endpoint, '__serializer__')
+        
+        assert serialized(create_client(FastJSONRoute))
+        
+        monkeypatch.setattr(settings, 'FAST_JSON_RESPONSES', False)
+        assert not serialized(create_client(FastJSONRoute))
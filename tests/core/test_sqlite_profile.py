@@ -0,0 +1,57 @@
+import pytest
+from sqlalchemy import exc, text
+
+from app.core.config import settings
+from app.core.models.database import async_pool_options, create_sqlite_engines
+
+
+@pytest.fixture
+def sqlite_url(tmp_path):
+    return f'sqlite:///{tmp_path}/profile.db'
+
+
+class TestSqliteProfile:
+    def test_profile_disabled_same_engine(self, sqlite_url):
+        writer, reader = create_sqlite_engines(sqlite_url, profile=False)
+        
+        with writer.connect() as conn:
+            assert conn.execute(text('PRAGMA journal_mode')).scalar() == 'delete'
+        
+        assert reader is writer
+        writer.dispose()
+    
+    def test_profile_enabled_pragmas_success(self, sqlite_url):
+        writer, reader = create_sqlite_engines(sqlite_url, profile=True)
+        
+        with writer.connect() as conn:
+            assert conn.execute(text('PRAGMA journal_mode')).scalar() == 'wal'
+            assert conn.execute(text('PRAGMA synchronous')).scalar() == 1
+            assert conn.execute(text('PRAGMA temp_store')).scalar() == 2
+            assert conn.execute(text('PRAGMA busy_timeout')).scalar() == 5000
+        
+        assert writer.pool.size() == 1
+        assert writer.pool._max_overflow == 0
+        writer.dispose()
+        reader.dispose()
+    
+    def test_reader_write_fail_query_only(self, sqlite_url):
+        writer, reader = create_sqlite_engines(sqlite_url, profile=True)
+        
+        with writer.begin() as conn:
+            conn.execute(text('CREATE TABLE items (id INTEGER PRIMARY KEY)'))
+            conn.execute(text('INSERT INTO items (id) VALUES (1)'))
+        
+        with reader.connect() as conn:
+            assert conn.execute(text('SELECT count(*) FROM items')).scalar() == 1
+            with pytest.raises(exc.OperationalError):
+                conn.execute(text('INSERT INTO items (id) VALUES (2)'))
+        
+        writer.dispose()
+        reader.dispose()
+    
+    def test_profile_async_single_writer(self, tmp_path):
+        url = f'sqlite+aiosqlite:///{tmp_path}/profile.db'
+        
+        assert async_pool_options(url, profile=True)['pool_size'] == 1
+        assert async_pool_options(url, profile=True)['max_overflow'] == 0
+        assert async_pool_options(url, profile=False)['pool_size'] == settings.DB_POOL_SIZE
@@ -0,0 +1,92 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException
+
+from starlette.requests import Request
+
+from app.core import throttle
+from app.core.config import settings
+from app.core.throttle import LoginThrottle, LocalThrottleStorage
+from app.v1.endpoints.utils import client_ip
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(throttle.time, 'time', lambda: now[0])
+    return now
+
+
+def retry_after(limiter: LoginThrottle, username: str, ip: str = None) -> int:
+    with pytest.raises(HTTPException) as exc:
+        limiter.check(username, ip)
+    assert exc.value.status_code == 429
+    return int(exc.value.headers['Retry-After'])
+
+
+class TestLoginThrottle:
+    def test_progressive_backoff(self, clock):
+        limiter = LoginThrottle(LocalThrottleStorage(), 1, 100, window=60, backoff_base=10, backoff_max=25)
+        
+        limiter.check('user', None)
+        assert retry_after(limiter, 'user') == 10
+        
+        clock[0] += 10
+        limiter.check('user', None)
+        assert retry_after(limiter, 'user') == 20
+        
+        clock[0] += 20
+        limiter.check('user', None)
+        assert retry_after(limiter, 'user') == 25
+        
+    def test_ip_limit_across_usernames(self, clock):
+        limiter = LoginThrottle(LocalThrottleStorage(), 100, 2, window=60, backoff_base=10, backoff_max=60)
+        
+        limiter.check('a', '1.1.1.1')
+        limiter.check('b', '1.1.1.1')
+        
+        assert retry_after(limiter, 'c', '1.1.1.1') == 10
+        limiter.check('c', '2.2.2.2')
+        
+    def test_window_slides(self, clock):
+        limiter = LoginThrottle(LocalThrottleStorage(), 2, 100, window=60, backoff_base=10, backoff_max=60)
+        
+        limiter.check('user', None)
+        limiter.check('user', None)
+        
+        clock[0] += 61
+        limiter.check('user', None)
+    
+    def test_rejected_counted_across_threads(self):
+        limiter = LoginThrottle(LocalThrottleStorage(), 1, 100, window=60, backoff_base=60, backoff_max=60)
+        limiter.check('user', None)
+        
+        def attempt(_):
+            with pytest.raises(HTTPException):
+                limiter.check('user', None)
+        
+        with ThreadPoolExecutor(8) as executor:
+            list(executor.map(attempt, range(2000)))
+        
+        assert limiter.stats()['rejected'] == 2000
+
+
+def request(host: str, forwarded_for: str = None) -> Request:
+    headers = [(b'x-forwarded-for', forwarded_for.encode())] if forwarded_for else []
+    return Request({'type': 'http', 'client': (host, 50000), 'headers': headers})
+
+
+class TestClientIp:
+    def test_untrusted_peer_ignores_forwarded_for(self, monkeypatch):
+        monkeypatch.setattr(settings, 'TRUSTED_PROXIES', [])
+        
+        assert client_ip(request('198.51.100.1', '203.0.113.1')) == '198.51.100.1'
+    
+    def test_trusted_proxy_uses_forwarded_for(self, monkeypatch):
+        monkeypatch.setattr(settings, 'TRUSTED_PROXIES', ['10.0.0.0/8'])
+        
+        # 由右往左略過受信任的代理，用戶端偽造的最左邊項目不採用
+        assert client_ip(request('10.0.0.1', '1.1.1.1, 203.0.113.1, 10.0.0.2')) == '203.0.113.1'
+        assert client_ip(request('10.0.0.1', '10.0.0.3')) == '10.0.0.3'
+        assert client_ip(request('10.0.0.1')) == '10.0.0.1'
@@ -1,12 +1,14 @@
 from pytest import fixture
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 from typing import Callable, Generator
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 import random
 
 from faker import Faker
 
-from app.core.models import User, Role, Task, Tag
+from app.core.models import User, Role, Task, Tag, TaskTagLink
 
 faker = Faker()
 
@@ -25,7 +27,7 @@ def create_user(db: Session):
     return _create_user
     
 def create_user_data(role_id: int = Role.USER):
-    username = faker.first_name()
+    username = faker.unique.first_name()
     
     return {
         'username': username,
@@ -47,6 +49,14 @@ def create_task(db: Session):
     
     return _create_task
 
+@fixture(scope='function')
+def link_tags(db: Session):
+    def _link_tags(task_id: int, tag_ids: list):
+        db.add_all(TaskTagLink(task_id=task_id, tag_id=tag_id) for tag_id in tag_ids)
+        db.commit()
+    
+    return _link_tags
+
 def create_task_data(tag_ids: list = [], json_format=False):
     future_date = datetime.now() + timedelta(days=random.randint(1, 30))
     if json_format:
@@ -82,3 +92,22 @@ def create_tag_data():
     return {
         'name': name
     }
+    
+@fixture(scope='function')
+def count_queries(db: Session):
+    """記錄區塊內對資料庫執行的 SQL"""
+    @contextmanager
+    def _count_queries():
+        statements = []
+        
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        
+        engine = db.get_bind()
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+    
+    return _count_queries
@@ -0,0 +1,199 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from tests.fixtures.auth import *
+from tests.fixtures.generals import *
+from app.core.config import settings
+from app.core.hashing import password_hasher
+from app.core.models import Role
+from app.services import AuthService
+
+
+class TestAuthLogin:
+    def test_login_success(self, client: TestClient, create_user):
+        user: User = create_user()
+        
+        response = client.post('/auth/login/', json={'username': user.username, 'password': '12345'})
+        
+        assert response.status_code == 200
+        assert response.json().get('user').get('id') == user.id
+        
+    def test_login_fail_wrong_password(self, client: TestClient, create_user):
+        user: User = create_user()
+        
+        response = client.post('/auth/login/', json={'username': user.username, 'password': 'wrong'})
+        
+        assert response.status_code == 401
+        
+    def test_invalid_token(self, client: TestClient):
+        response = client.get('/tasks/', headers={'Authorization': 'Bearer invalid'})
+        
+        assert response.status_code == 401
+
+
+class TestAuthCache:
+    def test_principal_cached(self, client: TestClient, token_header, create_user):
+        user: User = create_user()
+        header = token_header(user.username)
+        
+        client.get('/tasks/', headers=header)
+        client.get('/tasks/', headers=header)
+        
+        stats = AuthService.cache_stats()
+        assert stats['token']['hits'] >= 1
+        assert stats['principal']['hits'] >= 1
+        
+    def test_delete_user_invalidates_cache(self, client: TestClient, token_header, create_user):
+        user: User = create_user()
+        header = token_header(user.username)
+        
+        assert client.get('/tasks/', headers=header).status_code == 200
+        
+        response = client.delete('/users/me/', headers=header)
+        assert response.status_code == 200
+        
+        response = client.get('/tasks/', headers=header)
+        assert response.status_code == 401
+        
+    def test_update_user_invalidates_cache(self, client: TestClient, db: Session, token_header, create_user):
+        user: User = create_user()
+        header = token_header(user.username)
+        
+        assert client.get('/users/', headers=header).status_code == 403
+        
+        # 直接修改資料庫時，快取中仍為舊角色
+        user.role_id = Role.ADMIN
+        db.commit()
+        assert client.get('/users/', headers=header).status_code == 403
+        
+        response = client.put(f'/users/{user.id}/', json=create_user_data(), headers=token_header())
+        assert response.status_code == 200
+        
+        assert client.get('/users/', headers=header).status_code == 200
+        
+    def test_principal_versions_bounded(self):
+        versions = AuthService._principal_versions
+        
+        for user_id in range(versions.maxsize + 10):
+            AuthService.invalidate_user(user_id)
+        
+        assert versions.stats()['size'] == versions.maxsize
+    
+    def test_principal_not_cached_after_evicted_invalidation(self, create_user):
+        user: User = create_user()
+        _, version = AuthService._cached_principal(user.id)
+        
+        # 查詢期間發生失效，且版本號在寫入快取前已被淘汰
+        AuthService.invalidate_user(user.id)
+        AuthService._principal_versions.pop(user.id)
+        AuthService._store_principal(user, version)
+        
+        assert AuthService.principal_cache.get(user.id) is None
+        
+    def test_metrics_success(self, client: TestClient, token_header):
+        header = token_header()
+        
+        response = client.get('/metrics/', headers=header)
+        
+        assert response.status_code == 200
+        assert 'auth_cache' in response.json()
+
+
+class TestAuthThrottle:
+    def test_login_fail_too_many_attempts(self, client: TestClient, create_user):
+        user: User = create_user()
+        data = {'username': user.username, 'password': 'wrong'}
+        
+        for _ in range(settings.LOGIN_THROTTLE_USERNAME_LIMIT):
+            assert client.post('/auth/login/', json=data).status_code == 401
+        
+        response = client.post('/auth/login/', json=data)
+        
+        assert response.status_code == 429
+        assert int(response.headers['Retry-After']) > 0
+        
+    def test_blocked_login_skips_password_check(self, client: TestClient, create_user):
+        user: User = create_user()
+        data = {'username': user.username, 'password': 'wrong'}
+        
+        for _ in range(settings.LOGIN_THROTTLE_USERNAME_LIMIT + 1):
+            client.post('/auth/login/', json=data)
+        completed = password_hasher.stats()['completed']
+        
+        # 封鎖期間即使密碼正確也會被拒絕，且不會執行 bcrypt
+        response = client.post('/auth/login/', json={'username': user.username, 'password': '12345'})
+        
+        assert response.status_code == 429
+        assert password_hasher.stats()['completed'] == completed
+        
+    def test_login_success_resets_attempts(self, client: TestClient, create_user):
+        user: User = create_user()
+        
+        for _ in range(settings.LOGIN_THROTTLE_USERNAME_LIMIT - 1):
+            client.post('/auth/login/', json={'username': user.username, 'password': 'wrong'})
+        
+        response = client.post('/auth/login/', json={'username': user.username, 'password': '12345'})
+        assert response.status_code == 200
+        
+        response = client.post('/auth/login/', json={'username': user.username, 'password': 'wrong'})
+        assert response.status_code == 401
+
+
+class TestAuthRefresh:
+    def test_refresh_success(self, client: TestClient, create_user):
+        user: User = create_user()
+        tokens = client.post('/auth/login/', json={'username': user.username, 'password': '12345'}).json()
+        
+        response = client.post('/auth/refresh/', json={'refresh_token': tokens['refresh_token']})
+        
+        assert response.status_code == 200
+        assert response.json().get('refresh_token') != tokens['refresh_token']
+        header = {'Authorization': f"Bearer {response.json().get('access_token')}"}
+        assert client.get('/tasks/', headers=header).status_code == 200
+        
+    def test_refresh_fail_reused_token_revokes_family(self, client: TestClient, create_user):
+        user: User = create_user()
+        tokens = client.post('/auth/login/', json={'username': user.username, 'password': '12345'}).json()
+        rotated = client.post('/auth/refresh/', json={'refresh_token': tokens['refresh_token']}).json()
+        
+        response = client.post('/auth/refresh/', json={'refresh_token': tokens['refresh_token']})
+        assert response.status_code == 401
+        
+        # 重複使用後，同一個 family 新換發的 token 也一併失效
+        response = client.post('/auth/refresh/', json={'refresh_token': rotated['refresh_token']})
+        assert response.status_code == 401
+        
+    def test_refresh_fail_invalid_token(self, client: TestClient):
+        response = client.post('/auth/refresh/', json={'refresh_token': 'invalid'})
+        
+        assert response.status_code == 401
+
+
+class TestAuthLogout:
+    def test_logout_revokes_tokens(self, client: TestClient, create_user):
+        user: User = create_user()
+        tokens = client.post('/auth/login/', json={'username': user.username, 'password': '12345'}).json()
+        header = {'Authorization': f"Bearer {tokens['access_token']}"}
+        assert client.get('/tasks/', headers=header).status_code == 200
+        
+        response = client.post('/auth/logout/', json={'refresh_token': tokens['refresh_token']}, headers=header)
+        assert response.status_code == 204
+        
+        assert client.get('/tasks/', headers=header).status_code == 401
+        assert client.post('/auth/refresh/', json={'refresh_token': tokens['refresh_token']}).status_code == 401
+        
+    def test_revocation_check_skips_db_for_unrevoked_token(self, client: TestClient, db: Session, create_user):
+        user: User = create_user()
+        tokens = client.post('/auth/login/', json={'username': user.username, 'password': '12345'}).json()
+        header = {'Authorization': f"Bearer {tokens['access_token']}"}
+        client.get('/tasks/', headers=header)
+        
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db.get_bind(), 'before_cursor_execute', listener)
+        try:
+            client.get('/tasks/', headers=header)
+        finally:
+            event.remove(db.get_bind(), 'before_cursor_execute', listener)
+        
+        assert not any('revoked_tokens' in statement for statement in statements)
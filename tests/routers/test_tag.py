@@ -1,5 +1,6 @@
 from fastapi.testclient import TestClient
 
+from app.core.config import settings
 from tests.fixtures.auth import *
 from tests.fixtures.generals import *
 
@@ -26,6 +27,85 @@ class TestTagGet:
         assert response.status_code == 200
         assert len(response.json().get('items')) == 1
     
+    def test_list_tags_sparse_fields(self, client: TestClient, token_header, create_user, create_tag):
+        user: User = create_user()
+        create_tag(user.id, False)
+        
+        header = token_header(user.username)
+        
+        response = client.get('/tags/?is_public=true&fields=name', headers=header)
+        
+        assert response.status_code == 200
+        assert len(response.json().get('items')) == 4
+        assert all(set(item) == {'id', 'name'} for item in response.json().get('items'))
+    
+    def test_list_tags_cursor_success(self, client: TestClient, token_header, create_user, create_tag):
+        user: User = create_user()
+        create_tag(user.id, False)
+        create_tag(user.id, False)
+        
+        header = token_header(user.username)
+        
+        first = client.get('/tags/cursor/?is_public=true&size=3', headers=header)
+        cursor = first.json().get('next_cursor')
+        second = client.get(f'/tags/cursor/?is_public=true&size=3&cursor={cursor}', headers=header)
+        
+        assert first.status_code == 200
+        assert second.status_code == 200
+        assert [item.get('id') for item in first.json().get('items')] == [1, 2, 3]
+        assert [item.get('id') for item in second.json().get('items')] == [4, 5]
+        assert second.json().get('next_cursor') is None
+    
+    def test_list_tags_public_catalog(self, client: TestClient, token_header, create_user, create_tag, count_queries):
+        user: User = create_user()
+        own_tag: Tag = create_tag(user.id, False)
+        create_tag(create_user().id, False)
+        
+        header = token_header(user.username)
+        client.get('/users/me/', headers=header)
+        
+        def list_tags():
+            with count_queries() as statements:
+                response = client.get('/tags/?is_public=true', headers=header)
+            
+            assert response.status_code == 200
+            return [item.get('id') for item in response.json().get('items')], len(statements)
+        
+        # 第二次起公開標籤來自快取，只查詢用戶自己的標籤
+        assert list_tags() == ([1, 2, 3, own_tag.id], 2)
+        assert list_tags() == ([1, 2, 3, own_tag.id], 1)
+        
+        admin_header = token_header()
+        response = client.post('/tags/', json=create_tag_data(), headers=admin_header)
+        assert response.status_code == 201
+        
+        assert list_tags() == ([1, 2, 3, own_tag.id, response.json().get('id')], 2)
+        
+        response = client.get('/metrics/', headers=admin_header)
+        assert response.json().get('public_tag_cache').get('hits') == 1
+        
+    def test_list_tags_public_pages(self, client: TestClient, token_header, create_user, create_tag, count_queries):
+        user: User = create_user()
+        own_ids = [create_tag(user.id, False).id for _ in range(4)]
+        public_id = create_tag(1, True).id
+        own_ids += [create_tag(user.id, False).id for _ in range(3)]
+        create_tag(create_user().id, False)
+        header = token_header(user.username)
+        client.get('/users/me/', headers=header)
+        
+        expected = sorted([1, 2, 3, public_id, *own_ids])
+        pages = []
+        for page in range(1, 6):
+            with count_queries() as statements:
+                response = client.get(f'/tags/?is_public=true&size=3&page={page}', headers=header)
+            assert response.status_code == 200
+            assert response.json().get('total') == len(expected)
+            pages.append([item.get('id') for item in response.json().get('items')])
+        
+        assert sum(pages, []) == expected
+        # 用戶的標籤以 SQL 分頁：最後幾頁從 OFFSET 開始查詢，不載入前面的標籤
+        assert 'OFFSET' in next(statement for statement in statements if 'FROM tags' in statement)
+        
     def test_list_tags_fail_no_auth(self, client: TestClient):
         response = client.get('/tags/')
         
@@ -98,6 +178,68 @@ class TestTagPut:
         
         assert response.status_code == 403
     
+    def test_put_tag_fail_precondition(self, client: TestClient, token_header, create_user, create_tag):
+        user: User = create_user()
+        tag: Tag = create_tag(user.id, False)
+        header = token_header(user.username)
+        
+        response = client.put(f'/tags/{tag.id}/', json={'name': 'first'}, headers={**header, 'If-Match': '"1-x"'})
+        etag = response.headers.get('ETag')
+        
+        assert response.status_code == 200
+        assert etag.startswith('"2-')
+        
+        response = client.put(f'/tags/{tag.id}/', json={'name': 'second'}, headers={**header, 'If-Match': '"1-x"'})
+        assert response.status_code == 412
+        
+        response = client.delete(f'/tags/{tag.id}/', headers={**header, 'If-Match': '"1-x"'})
+        assert response.status_code == 412
+        
+        response = client.delete(f'/tags/{tag.id}/', headers={**header, 'If-Match': etag})
+        assert response.status_code == 204
+    
+    def test_put_tag_with_etag_from_get(self, client: TestClient, token_header, create_user, create_tag):
+        user: User = create_user()
+        tag: Tag = create_tag(user.id, False)
+        header = token_header(user.username)
+        
+        response = client.get(f'/tags/{tag.id}/', headers=header)
+        etag = response.headers.get('ETag')
+        
+        assert response.status_code == 200
+        assert response.json() == {'id': tag.id, 'name': tag.name, 'is_public': False}
+        assert client.get(f'/tags/{tag.id}/', headers={**header, 'If-None-Match': etag}).status_code == 304
+        
+        # 另一個請求先修改了標籤，以修改前取得的 ETag 更新時回傳 412
+        response = client.put(f'/tags/{tag.id}/', json={'name': 'first'}, headers={**header, 'If-Match': etag})
+        assert response.status_code == 200
+        assert client.put(f'/tags/{tag.id}/', json={'name': 'second'}, headers={**header, 'If-Match': etag}).status_code == 412
+        
+        # 更新回傳的 ETag 與之後 GET 同一版本的 ETag 相同
+        assert client.get(f'/tags/{tag.id}/', headers={**header, 'If-None-Match': response.headers.get('ETag')}).status_code == 304
+    
+    def test_get_tag_not_modified_skips_load(self, client: TestClient, token_header, create_user, create_tag, count_queries):
+        user: User = create_user()
+        tag: Tag = create_tag(user.id, False)
+        header = token_header(user.username)
+        etag = client.get(f'/tags/{tag.id}/', headers=header).headers.get('ETag')
+        
+        with count_queries() as statements:
+            response = client.get(f'/tags/{tag.id}/', headers={**header, 'If-None-Match': etag})
+        
+        assert response.status_code == 304
+        assert len(statements) == 1
+        assert 'tags.name' not in statements[0]
+    
+    def test_get_tag_access(self, client: TestClient, token_header, create_user, create_tag):
+        owner: User = create_user()
+        tag: Tag = create_tag(owner.id, False)
+        header = token_header(create_user().username)
+        
+        assert client.get(f'/tags/{tag.id}/', headers=header).status_code == 403
+        assert client.get('/tags/1/', headers=header).status_code == 200
+        assert client.get('/tags/9999/', headers=header).status_code == 404
+    
     def test_put_tag_fail_no_auth(self, client: TestClient):
         response = client.put('/tags/1/')
         
@@ -124,7 +266,73 @@ class TestTagDelete:
         
         assert response.status_code == 204
         
+    def test_delete_tag_invalidates_cached_task_count(self, client: TestClient, monkeypatch, token_header, create_user, create_task, link_tags):
+        monkeypatch.setattr(settings, 'PAGINATION_COUNT_MODE', 'cached')
+        user: User = create_user()
+        link_tags(create_task(user.id).id, [1])
+        header = token_header(user.username)
+        
+        assert client.get('/tasks/?tag_ids=1', headers=header).json().get('total') == 1
+        
+        # 管理員刪除公開標籤，其他用戶的任務關聯一併刪除
+        assert client.delete('/tags/1/', headers=token_header()).status_code == 204
+        
+        response = client.get('/tasks/?tag_ids=1', headers=header)
+        assert response.json().get('items') == []
+        assert response.json().get('total') == 0
+        
+    def test_delete_tags_bulk_invalidates_cached_task_count(self, client: TestClient, monkeypatch, token_header, create_user, create_tag, create_task, link_tags):
+        monkeypatch.setattr(settings, 'PAGINATION_COUNT_MODE', 'cached')
+        user: User = create_user()
+        tag_id = create_tag(user.id, False).id
+        link_tags(create_task(user.id).id, [tag_id])
+        header = token_header(user.username)
+        
+        assert client.get(f'/tasks/?tag_ids={tag_id}', headers=header).json().get('total') == 1
+        assert client.delete(f'/tags/bulk/?ids={tag_id}', headers=header).json().get('count') == 1
+        
+        assert client.get(f'/tasks/?tag_ids={tag_id}', headers=header).json().get('total') == 0
+        
     def test_delete_tag_fail_no_auth(self, client: TestClient):
         response = client.delete('/tags/1/')
         
-        assert response.status_code == 401
\ No newline at end of file
+        assert response.status_code == 401
+        
+
+class TestTagBulkDelete:
+    def test_delete_tags_bulk_ids(self, client: TestClient, db: Session, token_header, create_user, create_tag, create_task, link_tags):
+        user: User = create_user()
+        tag: Tag = create_tag(user.id, False)
+        other_tag: Tag = create_tag(create_user().id, False)
+        task: Task = create_task(user.id)
+        link_tags(task.id, [tag.id, 1])
+        header = token_header(user.username)
+        
+        response = client.delete(f'/tags/bulk/?ids={tag.id}&ids={other_tag.id}', headers=header)
+        
+        assert response.status_code == 200
+        assert response.json() == {'count': 1, 'has_more': False}
+        # 關聯由外鍵的 ON DELETE CASCADE 刪除
+        assert db.query(TaskTagLink).filter(TaskTagLink.task_id == task.id).count() == 1
+        assert db.query(Tag).filter(Tag.id == other_tag.id).count() == 1
+        
+    def test_delete_tags_bulk_unused(self, client: TestClient, db: Session, token_header, create_user, create_tag, create_task, link_tags):
+        user: User = create_user()
+        used_tag: Tag = create_tag(user.id, False)
+        unused_tag: Tag = create_tag(user.id, False)
+        link_tags(create_task(user.id).id, [used_tag.id])
+        header = token_header(user.username)
+        
+        response = client.delete('/tags/bulk/?unused=true', headers=header)
+        
+        assert response.status_code == 200
+        assert response.json().get('count') == 1
+        assert [tag.id for tag in db.query(Tag).filter(Tag.owner_id == user.id)] == [used_tag.id]
+        
+    def test_delete_tags_bulk_fail_no_criteria(self, client: TestClient, token_header, create_user):
+        user: User = create_user()
+        header = token_header(user.username)
+        
+        response = client.delete('/tags/bulk/', headers=header)
+        
+        assert response.status_code == 400
\ No newline at end of file
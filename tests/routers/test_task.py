@@ -1,5 +1,10 @@
 from fastapi.testclient import TestClient
 
+from app.core.config import settings
+from app.core.models import Difficulty, Priority
+from pytest import fixture, mark
+from sqlalchemy import text
+
 from tests.fixtures.auth import *
 from tests.fixtures.generals import *
 
@@ -16,6 +21,18 @@ class TestTaskGet:
         assert response.status_code == 200
         assert response.json().get('id') == task.id
     
+    def test_get_task_sparse_fields(self, client: TestClient, token_header, create_user, create_task, link_tags):
+        user: User = create_user()
+        task: Task = create_task(user.id)
+        link_tags(task.id, [1])
+        
+        header = token_header(user.username)
+        
+        response = client.get(f'/tasks/{task.id}/?fields=title,deadline&include=', headers=header)
+        
+        assert response.status_code == 200
+        assert set(response.json()) == {'id', 'title', 'deadline'}
+    
     def test_get_task_fail_forbidden(self, client: TestClient, token_header, create_user, create_task):
         user_1: User = create_user()
         task: Task = create_task(user_1.id)
@@ -44,6 +61,104 @@ class TestTaskGet:
         assert response.status_code == 200
         assert len(response.json().get('items')) == 2
         
+    def test_list_tasks_constant_queries(self, client: TestClient, token_header, create_user, create_task, link_tags, count_queries):
+        user: User = create_user()
+        header = token_header(user.username)
+        client.get('/tasks/', headers=header)
+        
+        def list_tasks(count: int):
+            for _ in range(count):
+                link_tags(create_task(user.id).id, [1, 2])
+            
+            with count_queries() as statements:
+                response = client.get('/tasks/', headers=header)
+            
+            assert response.status_code == 200
+            assert all(len(task.get('tags')) == 2 for task in response.json().get('items'))
+            return len(statements)
+        
+        assert list_tasks(2) == list_tasks(8)
+        
+    def test_list_tasks_count_mode_none(self, client: TestClient, monkeypatch, token_header, create_user, create_task, count_queries):
+        monkeypatch.setattr(settings, 'PAGINATION_COUNT_MODE', 'none')
+        user: User = create_user()
+        for _ in range(3):
+            create_task(user.id)
+        header = token_header(user.username)
+        client.get('/tasks/', headers=header)
+        
+        with count_queries() as statements:
+            response = client.get('/tasks/?size=2', headers=header)
+        
+        assert response.status_code == 200
+        assert response.json().get('total') is None
+        assert response.json().get('has_next') is True
+        assert not any('count(' in statement.lower() for statement in statements)
+        
+        response = client.get('/tasks/?size=2&page=2', headers=header)
+        
+        assert len(response.json().get('items')) == 1
+        assert response.json().get('has_next') is False
+        
+    def test_list_tasks_count_mode_cached(self, client: TestClient, monkeypatch, token_header, create_user, create_task, count_queries):
+        monkeypatch.setattr(settings, 'PAGINATION_COUNT_MODE', 'cached')
+        user: User = create_user()
+        create_task(user.id)
+        header = token_header(user.username)
+        client.get('/users/me/', headers=header)
+        
+        def list_tasks() -> tuple[int, int]:
+            with count_queries() as statements:
+                response = client.get('/tasks/', headers=header)
+            
+            assert response.status_code == 200
+            return response.json().get('total'), sum('count(' in statement.lower() for statement in statements)
+        
+        assert list_tasks() == (1, 1)
+        assert list_tasks() == (1, 0)
+        
+        response = client.post('/tasks/', json=create_task_data([1], True), headers=header)
+        assert response.status_code == 201
+        
+        assert list_tasks() == (2, 1)
+        
+
+class TestTaskCursor:
+    def walk(self, client: TestClient, url: str, header: dict) -> list[dict]:
+        items, cursor = [], None
+        while True:
+            response = client.get(url + (f'&cursor={cursor}' if cursor else ''), headers=header)
+            assert response.status_code == 200
+            
+            items += response.json().get('items')
+            cursor = response.json().get('next_cursor')
+            if cursor is None:
+                return items
+    
+    def test_list_tasks_cursor_success(self, client: TestClient, db: Session, token_header, create_user, create_task):
+        user: User = create_user()
+        tasks = [create_task(user.id) for _ in range(7)]
+        # 相同的 deadline 與沒有 deadline 的任務
+        tasks[1].deadline = tasks[0].deadline
+        tasks[2].deadline = None
+        tasks[3].deadline = None
+        db.commit()
+        
+        header = token_header(user.username)
+        
+        items = self.walk(client, '/tasks/cursor/?size=2', header)
+        
+        expected = sorted(tasks, key=lambda task: (task.deadline is None, task.deadline or datetime.min, task.id))
+        assert [item.get('id') for item in items] == [task.id for task in expected]
+    
+    def test_list_tasks_cursor_fail_invalid_cursor(self, client: TestClient, token_header, create_user):
+        user: User = create_user()
+        header = token_header(user.username)
+        
+        response = client.get('/tasks/cursor/?cursor=not-a-cursor', headers=header)
+        
+        assert response.status_code == 400
+        
 
 class TestTaskPost:
     def test_post_task_success_user(self, client: TestClient, token_header, create_user):
@@ -58,6 +173,33 @@ class TestTaskPost:
         assert response.json().get('title') == data.get('title')
         assert response.json().get('tags')[0].get('id') == 1
         
+    def test_post_task_fail_tag_not_found(self, client: TestClient, db: Session, token_header, create_user):
+        user: User = create_user()
+        data = create_task_data([1, 2, 9999], True)
+        
+        header = token_header(user.username)
+        
+        response = client.post('/tasks/', json=data, headers=header)
+        
+        assert response.status_code == 404
+        # 標籤驗證失敗時不會留下建立到一半的任務
+        assert db.query(Task).filter(Task.user_id == user.id).count() == 0
+        
+    def test_post_task_constant_queries(self, client: TestClient, token_header, create_user, count_queries):
+        user: User = create_user()
+        header = token_header(user.username)
+        client.get('/users/me/', headers=header)
+        
+        def post_task(tag_ids: list):
+            with count_queries() as statements:
+                response = client.post('/tasks/', json=create_task_data(tag_ids, True), headers=header)
+            
+            assert response.status_code == 201
+            assert [tag.get('id') for tag in response.json().get('tags')] == tag_ids
+            return [statement.split()[0] for statement in statements]
+        
+        assert post_task([1]) == post_task([1, 2, 3]) == ['SELECT', 'INSERT', 'INSERT', 'INSERT', 'UPDATE', 'INSERT']
+        
     def test_post_task_fail_no_auth(self, client: TestClient):
         data = create_task_data([1, 2], True)
         
@@ -67,6 +209,67 @@ class TestTaskPost:
         assert response.json().get('detail') == 'Not authenticated'
         
 
+class TestTaskBulkPost:
+    def test_post_tasks_bulk_success(self, client: TestClient, token_header, create_user):
+        user: User = create_user()
+        data = {'tasks': [create_task_data(tag_ids, True) for tag_ids in ([1], [2, 3], [], [1, 3])]}
+        
+        header = token_header(user.username)
+        
+        response = client.post('/tasks/bulk/', json=data, headers=header)
+        
+        created = response.json().get('created')
+        assert response.status_code == 201
+        assert [task.get('title') for task in created] == [task.get('title') for task in data['tasks']]
+        assert [sorted(tag.get('id') for tag in task.get('tags')) for task in created] == [task.get('tag_ids') for task in data['tasks']]
+        assert response.json().get('errors') == []
+        
+    def test_post_tasks_bulk_fail_atomic(self, client: TestClient, token_header, create_user):
+        user: User = create_user()
+        data = {'tasks': [create_task_data([1], True), create_task_data([1, 9999], True)]}
+        
+        header = token_header(user.username)
+        
+        response = client.post('/tasks/bulk/', json=data, headers=header)
+        
+        assert response.status_code == 422
+        assert response.json().get('detail') == [{'index': 1, 'status_code': 404, 'detail': 'Tag with id 9999 does not exist'}]
+        assert client.get('/tasks/', headers=header).json().get('total') == 0
+        
+    def test_post_tasks_bulk_partial(self, client: TestClient, token_header, create_user, create_tag):
+        user: User = create_user()
+        other_tag = create_tag(create_user().id)
+        data = {
+            'tasks': [create_task_data([1], True), create_task_data([other_tag.id], True), create_task_data([], True)],
+            'atomic': False
+        }
+        
+        header = token_header(user.username)
+        
+        response = client.post('/tasks/bulk/', json=data, headers=header)
+        
+        assert response.status_code == 201
+        assert len(response.json().get('created')) == 2
+        assert response.json().get('errors') == [{'index': 1, 'status_code': 403, 'detail': 'Forbidden'}]
+        
+    def test_post_tasks_bulk_constant_queries(self, client: TestClient, token_header, create_user, count_queries):
+        user: User = create_user()
+        header = token_header(user.username)
+        client.get('/users/me/', headers=header)
+        
+        def post_tasks(count: int):
+            data = {'tasks': [create_task_data([1, 2], True) for _ in range(count)]}
+            
+            with count_queries() as statements:
+                response = client.post('/tasks/bulk/', json=data, headers=header)
+            
+            assert response.status_code == 201
+            assert len(response.json().get('created')) == count
+            return len(statements)
+        
+        assert post_tasks(5) == post_tasks(50)
+        
+
 class TestTaskPut:
     def test_put_task_success_user(self, client: TestClient, token_header, create_user, create_task):
         user: User = create_user()
@@ -81,6 +284,24 @@ class TestTaskPut:
         assert response.json().get('title') == data.get('title')
         assert response.json().get('tags')[0].get('id') == 2
         
+    def test_put_task_replace_tags(self, client: TestClient, db: Session, token_header, create_user, create_task, link_tags, count_queries):
+        user: User = create_user()
+        task: Task = create_task(user.id)
+        link_tags(task.id, [1, 2])
+        data = create_task_data([2, 3], json_format=True)
+        header = token_header(user.username)
+        client.get('/users/me/', headers=header)
+        
+        with count_queries() as statements:
+            response = client.put(f'/tasks/{task.id}/', json=data, headers=header)
+        
+        assert response.status_code == 200
+        assert [tag.get('id') for tag in response.json().get('tags')] == [2, 3]
+        assert [statement.split()[0] for statement in statements] == ['SELECT', 'SELECT', 'UPDATE', 'INSERT', 'DELETE', 'INSERT', 'UPDATE']
+        
+        db.expire_all()
+        assert sorted(link.tag_id for link in db.query(TaskTagLink).filter(TaskTagLink.task_id == task.id)) == [2, 3]
+        
     def test_put_task_fail_no_auth(self, client: TestClient, create_task):
         task: Task = create_task(1)
         data = create_task_data([2, 3], json_format=True)
@@ -91,6 +312,130 @@ class TestTaskPut:
         assert response.json().get('detail') == 'Not authenticated'
         
 
+class TestTaskBulkPatch:
+    def test_patch_tasks_bulk_ids(self, client: TestClient, db: Session, token_header, create_user, create_task, count_queries):
+        user: User = create_user()
+        tasks = [create_task(user.id) for _ in range(3)]
+        other_task = create_task(create_user().id)
+        header = token_header(user.username)
+        client.get('/users/me/', headers=header)
+        
+        data = {'ids': [tasks[0].id, tasks[1].id, other_task.id], 'values': {'is_completed': True}}
+        with count_queries() as statements:
+            response = client.patch('/tasks/bulk/', json=data, headers=header)
+        
+        assert response.status_code == 200
+        assert response.json() == {'count': 2, 'has_more': False, 'tasks': None}
+        assert [statement.split()[0] for statement in statements] == ['SELECT', 'UPDATE', 'UPDATE', 'INSERT']
+        
+        db.expire_all()
+        assert [task.is_completed for task in tasks] == [True, True, False]
+        assert other_task.is_completed is False
+        
+    def test_patch_tasks_bulk_filter_returning(self, client: TestClient, db: Session, token_header, create_user, create_task):
+        user: User = create_user()
+        tasks = [create_task(user.id) for _ in range(3)]
+        today = datetime.combine(datetime.today().date(), datetime.min.time())
+        tasks[0].deadline = today + timedelta(hours=9)
+        tasks[1].deadline = today + timedelta(hours=10)
+        tasks[1].is_completed = True
+        db.commit()
+        
+        header = token_header(user.username)
+        tomorrow = today + timedelta(days=1, hours=9)
+        data = {
+            'filter': {'range': 'today', 'is_completed': False},
+            'values': {'deadline': tomorrow.isoformat()},
+            'returning': True
+        }
+        
+        response = client.patch('/tasks/bulk/', json=data, headers=header)
+        
+        assert response.status_code == 200
+        assert response.json().get('count') == 1
+        assert [task.get('id') for task in response.json().get('tasks')] == [tasks[0].id]
+        assert response.json().get('tasks')[0].get('deadline') == tomorrow.isoformat()
+        
+    def test_patch_tasks_bulk_filter_any_completion(self, client: TestClient, db: Session, monkeypatch, token_header, create_user, create_task):
+        monkeypatch.setattr(settings, 'BULK_UPDATE_MAX_ROWS', 2)
+        user: User = create_user()
+        tasks = [create_task(user.id) for _ in range(3)]
+        tasks[1].is_completed = True
+        db.commit()
+        header = token_header(user.username)
+        data = {'filter': {'is_completed': None}, 'values': {'priority': 'HIGH'}}
+        
+        response = client.patch('/tasks/bulk/', json=data, headers=header)
+        
+        assert response.status_code == 200
+        assert response.json() == {'count': 2, 'has_more': True, 'tasks': None}
+        db.expire_all()
+        assert [task.priority for task in tasks] == [Priority.HIGH, Priority.HIGH, Priority.MEDIUM]
+        
+        response = client.patch('/tasks/bulk/', json={**data, 'values': {'deadline': None}}, headers=header)
+        
+        assert response.json() == {'count': 2, 'has_more': True, 'tasks': None}
+        db.expire_all()
+        assert [task.deadline is None for task in tasks] == [True, True, False]
+    
+    def test_patch_tasks_bulk_fail_no_values(self, client: TestClient, token_header, create_user):
+        user: User = create_user()
+        header = token_header(user.username)
+        
+        response = client.patch('/tasks/bulk/', json={'ids': [1], 'values': {}}, headers=header)
+        
+        assert response.status_code == 422
+        
+
+class TestTaskBulkDelete:
+    def test_delete_tasks_bulk_filter(self, client: TestClient, db: Session, token_header, create_user, create_task, link_tags, count_queries):
+        user: User = create_user()
+        tasks = [create_task(user.id) for _ in range(3)]
+        other_task = create_task(create_user().id)
+        for task in (*tasks[:2], other_task):
+            task.is_completed = True
+        tasks[0].deadline = tasks[1].deadline = other_task.deadline = datetime.now() - timedelta(days=1)
+        db.commit()
+        link_tags(tasks[0].id, [1, 2])
+        ids = [task.id for task in tasks]
+        header = token_header(user.username)
+        client.get('/users/me/', headers=header)
+        
+        with count_queries() as statements:
+            response = client.delete(f'/tasks/bulk/?is_completed=true&before={datetime.now().isoformat()}', headers=header)
+        
+        assert response.status_code == 200
+        assert response.json() == {'count': 2, 'has_more': False}
+        assert [statement.split()[0] for statement in statements] == ['DELETE', 'UPDATE', 'INSERT']
+        
+        assert [task.id for task in db.query(Task).filter(Task.user_id == user.id)] == [ids[2]]
+        assert db.query(Task).filter(Task.id == other_task.id).count() == 1
+        # 標籤關聯由外鍵的 ON DELETE CASCADE 刪除
+        assert db.query(TaskTagLink).filter(TaskTagLink.task_id == ids[0]).count() == 0
+        
+    def test_delete_tasks_bulk_row_cap(self, client: TestClient, monkeypatch, token_header, create_user, create_task):
+        monkeypatch.setattr(settings, 'BULK_DELETE_MAX_ROWS', 2)
+        user: User = create_user()
+        ids = '&'.join(f'ids={create_task(user.id).id}' for _ in range(3))
+        header = token_header(user.username)
+        
+        response = client.delete(f'/tasks/bulk/?{ids}', headers=header)
+        
+        assert response.json() == {'count': 2, 'has_more': True}
+        
+        response = client.delete(f'/tasks/bulk/?{ids}', headers=header)
+        
+        assert response.json() == {'count': 1, 'has_more': False}
+        
+    def test_delete_tasks_bulk_fail_no_criteria(self, client: TestClient, token_header, create_user):
+        user: User = create_user()
+        header = token_header(user.username)
+        
+        response = client.delete('/tasks/bulk/', headers=header)
+        
+        assert response.status_code == 400
+        
+
 class TestTaskDelete:
     def test_delete_success(self, client: TestClient, token_header, create_task):
         task: Task = create_task(1)
@@ -99,4 +444,391 @@ class TestTaskDelete:
         
         response = client.delete(f'/tasks/{task.id}/', headers=header)
         
+        assert response.status_code == 204
+        
+    def test_delete_single_statement(self, client: TestClient, db: Session, token_header, create_user, create_task, link_tags, count_queries):
+        user: User = create_user()
+        task: Task = create_task(user.id)
+        task_id = task.id
+        link_tags(task_id, [1, 2])
+        header = token_header(user.username)
+        client.get('/users/me/', headers=header)
+        
+        with count_queries() as statements:
+            response = client.delete(f'/tasks/{task_id}/', headers=header)
+        
+        assert response.status_code == 204
+        assert [statement.split()[0] for statement in statements] == ['DELETE', 'UPDATE', 'INSERT']
+        assert db.query(TaskTagLink).filter(TaskTagLink.task_id == task_id).count() == 0
+        
+    def test_delete_fail_forbidden(self, client: TestClient, db: Session, token_header, create_user, create_task):
+        user: User = create_user()
+        task: Task = create_task(create_user().id)
+        header = token_header(user.username)
+        
+        response = client.delete(f'/tasks/{task.id}/', headers=header)
+        
+        assert response.status_code == 403
+        assert db.query(Task).filter(Task.id == task.id).count() == 1
+        
+    def test_delete_fail_not_found(self, client: TestClient, token_header):
+        response = client.delete('/tasks/9999/', headers=token_header())
+        
+        assert response.status_code == 404
+
+class TestTaskFilter:
+    @fixture
+    def tasks(self, db: Session, create_user, link_tags) -> tuple[User, dict[str, Task]]:
+        user: User = create_user()
+        tasks = {
+            'a': Task(title='a', content='a', priority=Priority.HIGH, difficulty=Difficulty.EASY,
+                      deadline=datetime(2025, 3, 10), create_at=datetime(2025, 1, 1), user_id=user.id),
+            'b': Task(title='b', content='b', priority=Priority.LOW, difficulty=Difficulty.HARD,
+                      deadline=datetime(2025, 3, 5), create_at=datetime(2025, 1, 2), user_id=user.id),
+            'c': Task(title='c', content='c', priority=Priority.HIGH, difficulty=Difficulty.HARD,
+                      deadline=datetime(2025, 3, 20), create_at=datetime(2025, 1, 3), user_id=user.id),
+            'd': Task(title='d', content='d', priority=Priority.MEDIUM, difficulty=Difficulty.MEDIUM,
+                      deadline=None, create_at=datetime(2025, 1, 4), user_id=user.id),
+        }
+        db.add_all(tasks.values())
+        db.commit()
+        link_tags(tasks['a'].id, [1, 2])
+        link_tags(tasks['b'].id, [1])
+        link_tags(tasks['d'].id, [2])
+        return user, tasks
+    
+    def titles(self, client: TestClient, header: dict, params: str) -> list[str]:
+        response = client.get(f'/tasks/?fields=title&include=&{params}', headers=header)
+        assert response.status_code == 200
+        return [item.get('title') for item in response.json().get('items')]
+    
+    def test_list_tasks_filter_tags(self, client: TestClient, token_header, tasks):
+        user, _ = tasks
+        header = token_header(user.username)
+        
+        assert self.titles(client, header, 'tag_ids=1&tag_ids=2') == ['d', 'b', 'a']
+        assert self.titles(client, header, 'tag_ids=1&tag_ids=2&tag_match=all') == ['a']
+    
+    def test_list_tasks_filter_priority_difficulty(self, client: TestClient, token_header, tasks):
+        user, _ = tasks
+        header = token_header(user.username)
+        
+        assert self.titles(client, header, 'priority=HIGH&priority=MEDIUM') == ['d', 'a', 'c']
+        assert self.titles(client, header, 'priority=HIGH&difficulty=HARD') == ['c']
+    
+    def test_list_tasks_filter_date_ranges(self, client: TestClient, token_header, tasks):
+        user, _ = tasks
+        header = token_header(user.username)
+        
+        assert self.titles(client, header, 'deadline_from=2025-03-05T00:00:00&deadline_to=2025-03-10T00:00:00') == ['b', 'a']
+        assert self.titles(client, header, 'created_from=2025-01-02T00:00:00&created_to=2025-01-03T00:00:00') == ['b', 'c']
+        assert self.titles(client, header, 'no_deadline=true') == ['d']
+        assert self.titles(client, header, 'no_deadline=false') == ['b', 'a', 'c']
+    
+    def test_list_tasks_sort(self, client: TestClient, token_header, tasks):
+        user, _ = tasks
+        header = token_header(user.username)
+        
+        assert self.titles(client, header, 'sort=priority') == ['a', 'c', 'd', 'b']
+        assert self.titles(client, header, 'sort=priority,-deadline') == ['c', 'a', 'd', 'b']
+        assert self.titles(client, header, 'sort=-create_at') == ['d', 'c', 'b', 'a']
+    
+    def test_list_tasks_filter_single_statement(self, client: TestClient, token_header, tasks, count_queries):
+        user, _ = tasks
+        header = token_header(user.username)
+        client.get('/users/me/', headers=header)
+        
+        with count_queries() as statements:
+            titles = self.titles(client, header, 'tag_ids=1&priority=HIGH&priority=LOW&sort=-priority')
+        
+        assert titles == ['b', 'a']
+        # ETag 的版本號、總數與列表各一個 SELECT，篩選不另外查詢標籤
+        assert [statement.split()[0] for statement in statements] == ['SELECT', 'SELECT', 'SELECT']
+    
+    def test_list_tasks_cursor_filter(self, client: TestClient, token_header, tasks):
+        user, _ = tasks
+        header = token_header(user.username)
+        
+        response = client.get('/tasks/cursor/?tag_ids=2&size=1', headers=header)
+        
+        assert response.status_code == 200
+        assert [item.get('title') for item in response.json().get('items')] == ['a']
+        
+        response = client.get(f'/tasks/cursor/?tag_ids=2&size=1&cursor={response.json().get("next_cursor")}', headers=header)
+        
+        assert [item.get('title') for item in response.json().get('items')] == ['d']
+    
+    @mark.parametrize('sort', ['title', '-', 'deadline,deadline', ','])
+    def test_list_tasks_fail_invalid_sort(self, client: TestClient, token_header, create_user, sort):
+        header = token_header(create_user().username)
+        
+        response = client.get(f'/tasks/?sort={sort}', headers=header)
+        
+        assert response.status_code == 400
+    
+    def test_list_tasks_fail_too_many_tags(self, client: TestClient, token_header, create_user):
+        header = token_header(create_user().username)
+        
+        response = client.get('/tasks/?' + '&'.join(f'tag_ids={i}' for i in range(21)), headers=header)
+        
+        assert response.status_code == 422
+
+
+class TestTaskCalendar:
+    def test_task_calendar_success(self, client: TestClient, db: Session, token_header, create_user, count_queries):
+        user: User = create_user()
+        db.add_all([
+            Task(title='a', content='a', deadline=datetime(2025, 3, 10, 9), priority=Priority.HIGH, user_id=user.id),
+            Task(title='b', content='b', deadline=datetime(2025, 3, 10, 18), is_completed=True, user_id=user.id),
+            Task(title='c', content='c', deadline=datetime(2025, 3, 12, 12), user_id=user.id),
+            Task(title='d', content='d', deadline=datetime(2025, 4, 1), user_id=user.id),
+        ])
+        db.commit()
+        header = token_header(user.username)
+        client.get('/users/me/', headers=header)
+        
+        with count_queries() as statements:
+            response = client.get('/tasks/calendar/?start=2025-03-01&end=2025-03-31', headers=header)
+        
+        assert response.status_code == 200
+        assert [statement.split()[0] for statement in statements] == ['SELECT']
+        assert response.json().get('days') == [
+            {'date': '2025-03-10', 'total': 2, 'completed': 1, 'overdue': 1, 'by_priority': {'LOW': 0, 'MEDIUM': 1, 'HIGH': 1}},
+            {'date': '2025-03-12', 'total': 1, 'completed': 0, 'overdue': 1, 'by_priority': {'LOW': 0, 'MEDIUM': 1, 'HIGH': 0}},
+        ]
+    
+    def test_task_calendar_default_month(self, client: TestClient, token_header, create_user):
+        user: User = create_user()
+        today = datetime.today().date()
+        
+        response = client.get('/tasks/calendar/', headers=token_header(user.username))
+        
+        assert response.status_code == 200
+        assert response.json().get('start') == today.replace(day=1).isoformat()
+        assert response.json().get('days') == []
+    
+    def test_task_calendar_fail_invalid_range(self, client: TestClient, token_header, create_user):
+        header = token_header(create_user().username)
+        
+        assert client.get('/tasks/calendar/?start=2025-03-31&end=2025-03-01', headers=header).status_code == 400
+        assert client.get('/tasks/calendar/?start=2024-01-01&end=2025-12-31', headers=header).status_code == 400
+
+
+class TestTaskSearch:
+    @fixture
+    def post_task(self, client: TestClient):
+        def _post_task(header: dict, title: str, content: str = '內容') -> int:
+            data = create_task_data([], True)
+            data.update(title=title, content=content)
+            return client.post('/tasks/', json=data, headers=header).json().get('id')
+        
+        return _post_task
+    
+    def search(self, client: TestClient, header: dict, q: str, **params) -> list[int]:
+        response = client.get('/tasks/search/', params={'q': q, **params}, headers=header)
+        assert response.status_code == 200
+        return [item.get('id') for item in response.json().get('items')]
+    
+    def test_search_ranks_title_matches_first(self, client: TestClient, token_header, create_user, post_task):
+        user: User = create_user()
+        header = token_header(user.username)
+        in_content = post_task(header, 'quarterly plan', 'review the budget numbers')
+        in_title = post_task(header, 'budget review')
+        post_task(header, 'unrelated')
+        post_task(token_header(create_user().username), 'budget')
+        
+        assert self.search(client, header, 'budget') == [in_title, in_content]
+        assert self.search(client, header, 'budget review') == [in_title, in_content]
+        assert self.search(client, header, 'budget plan') == [in_content]
+    
+    def test_search_prefix(self, client: TestClient, token_header, create_user, post_task):
+        user: User = create_user()
+        header = token_header(user.username)
+        task_id = post_task(header, 'Weekly meeting')
+        
+        assert self.search(client, header, 'weekly mee') == [task_id]
+        # 只有最後一個字詞以前綴比對
+        assert self.search(client, header, 'wee meeting') == []
+        assert self.search(client, header, 'meet', prefix=False) == []
+        assert self.search(client, header, 'meeting', prefix=False) == [task_id]
+    
+    def test_search_chinese(self, client: TestClient, token_header, create_user, post_task):
+        user: User = create_user()
+        header = token_header(user.username)
+        meeting = post_task(header, '明天的會議', '準備簡報')
+        election = post_task(header, '議會選舉')
+        
+        assert self.search(client, header, '會議') == [meeting]
+        assert self.search(client, header, '議') == [election, meeting]
+        assert self.search(client, header, '會議 簡報') == [meeting]
+        assert self.search(client, header, '議會') == [election]
+    
+    def test_search_word_tokenizer(self, client: TestClient, token_header, create_user, post_task, monkeypatch):
+        monkeypatch.setattr(settings, 'TASK_SEARCH_TOKENIZER', 'word')
+        user: User = create_user()
+        header = token_header(user.username)
+        task_id = post_task(header, '明天的會議')
+        
+        # 連續的中文為一個詞，只能以整段或其前綴搜尋
+        assert self.search(client, header, '會議') == []
+        assert self.search(client, header, '明天') == [task_id]
+    
+    def test_search_follows_task_writes(self, client: TestClient, db: Session, token_header, create_user, post_task):
+        user: User = create_user()
+        header = token_header(user.username)
+        data = create_task_data([], True)
+        data.update(title='alpha')
+        task_id = client.post('/tasks/bulk/', json={'tasks': [data]}, headers=header).json().get('created')[0].get('id')
+        assert self.search(client, header, 'alpha') == [task_id]
+        
+        client.put(f'/tasks/{task_id}/', json={**data, 'title': 'beta'}, headers=header)
+        assert self.search(client, header, 'alpha') == []
+        assert self.search(client, header, 'beta') == [task_id]
+        
+        client.delete(f'/tasks/{task_id}/', headers=header)
+        assert self.search(client, header, 'beta') == []
+        
+        # 刪除用戶時由外鍵 CASCADE 刪除的任務
+        post_task(header, 'gamma')
+        db.execute(text('DELETE FROM users WHERE id = :id'), {'id': user.id})
+        db.commit()
+        assert db.scalar(text('SELECT count(*) FROM tasks_fts')) == 0
+    
+    def test_search_without_terms(self, client: TestClient, token_header, create_user, post_task):
+        user: User = create_user()
+        header = token_header(user.username)
+        post_task(header, 'alpha')
+        
+        response = client.get('/tasks/search/', params={'q': '!!'}, headers=header)
+        
+        assert response.status_code == 200
+        assert response.json().get('items') == []
+        assert response.json().get('total') == 0
+
+
+class TestTaskConditional:
+    def test_get_task_not_modified(self, client: TestClient, token_header, create_user, create_task, count_queries):
+        user: User = create_user()
+        task: Task = create_task(user.id)
+        header = token_header(user.username)
+        
+        etag = client.get(f'/tasks/{task.id}/', headers=header).headers.get('ETag')
+        with count_queries() as statements:
+            response = client.get(f'/tasks/{task.id}/', headers={**header, 'If-None-Match': etag})
+        
+        assert response.status_code == 304
+        assert response.headers.get('ETag') == etag
+        assert [statement.split()[0] for statement in statements] == ['SELECT']
+        
+        # 不同的欄位組合有不同的 ETag
+        response = client.get(f'/tasks/{task.id}/?fields=title', headers={**header, 'If-None-Match': etag})
+        assert response.status_code == 200
+        
+        client.put(f'/tasks/{task.id}/', json=create_task_data([1], True), headers=header)
+        response = client.get(f'/tasks/{task.id}/', headers={**header, 'If-None-Match': etag})
+        
+        assert response.status_code == 200
+        assert response.headers.get('ETag') != etag
+    
+    def test_get_task_etag_exposed_cross_origin(self, client: TestClient, token_header, create_user, create_task):
+        user: User = create_user()
+        task: Task = create_task(user.id)
+        
+        response = client.get(f'/tasks/{task.id}/', headers={**token_header(user.username), 'Origin': 'http://example.com'})
+        
+        assert response.headers.get('ETag')
+        assert {'etag', 'retry-after'} <= {name.strip().lower() for name in response.headers.get('Access-Control-Expose-Headers').split(',')}
+    
+    def test_get_task_not_modified_fail_forbidden(self, client: TestClient, token_header, create_user, create_task):
+        task: Task = create_task(create_user().id)
+        user: User = create_user()
+        
+        response = client.get(f'/tasks/{task.id}/', headers={**token_header(user.username), 'If-None-Match': '*'})
+        
+        assert response.status_code == 403
+    
+    def test_list_tasks_not_modified(self, client: TestClient, token_header, create_user, create_task, count_queries):
+        user: User = create_user()
+        create_task(user.id)
+        header = token_header(user.username)
+        
+        etag = client.get('/tasks/', headers=header).headers.get('ETag')
+        with count_queries() as statements:
+            response = client.get('/tasks/', headers={**header, 'If-None-Match': etag})
+        
+        assert response.status_code == 304
+        # 只查詢 collection_version，不執行列表與總數的查詢
+        assert [statement.split()[0] for statement in statements] == ['SELECT']
+        
+        response = client.get('/tasks/?is_completed=true', headers={**header, 'If-None-Match': etag})
+        assert response.status_code == 200
+        
+        client.post('/tasks/', json=create_task_data([], True), headers=header)
+        response = client.get('/tasks/', headers={**header, 'If-None-Match': etag})
+        
+        assert response.status_code == 200
+        assert len(response.json().get('items')) == 2
+    
+    def test_list_tasks_not_modified_compressed(self, client: TestClient, token_header, create_user, create_task):
+        user: User = create_user()
+        for _ in range(20):
+            create_task(user.id)
+        header = {**token_header(user.username), 'Accept-Encoding': 'gzip'}
+        
+        response = client.get('/tasks/', headers=header)
+        etag = response.headers.get('ETag')
+        
+        # 壓縮後的表示形式使用弱 ETag，仍可用於條件式請求
+        assert response.headers.get('Content-Encoding') == 'gzip'
+        assert etag.startswith('W/"')
+        assert client.get('/tasks/', headers={**header, 'If-None-Match': etag}).status_code == 304
+    
+    def test_list_tasks_changed_by_tag_update(self, client: TestClient, token_header, create_user, create_tag):
+        user: User = create_user()
+        tag: Tag = create_tag(user.id)
+        header = token_header(user.username)
+        task_id = client.post('/tasks/', json=create_task_data([tag.id], True), headers=header).json().get('id')
+        
+        list_etag = client.get('/tasks/', headers=header).headers.get('ETag')
+        task_etag = client.get(f'/tasks/{task_id}/', headers=header).headers.get('ETag')
+        client.put(f'/tags/{tag.id}/', json={'name': 'renamed'}, headers=header)
+        
+        response = client.get('/tasks/', headers={**header, 'If-None-Match': list_etag})
+        assert response.status_code == 200
+        
+        response = client.get(f'/tasks/{task_id}/', headers={**header, 'If-None-Match': task_etag})
+        assert response.status_code == 200
+        assert response.json().get('tags')[0].get('name') == 'renamed'
+    
+    def test_put_task_if_match(self, client: TestClient, token_header, create_user, create_task):
+        user: User = create_user()
+        task: Task = create_task(user.id)
+        header = token_header(user.username)
+        
+        etag = client.get(f'/tasks/{task.id}/', headers=header).headers.get('ETag')
+        response = client.put(f'/tasks/{task.id}/', json=create_task_data([1], True), headers={**header, 'If-Match': etag})
+        
+        assert response.status_code == 200
+        assert response.headers.get('ETag').startswith('"2-')
+        
+        # 以舊的 ETag 更新：已被修改，拒絕覆寫
+        response = client.put(f'/tasks/{task.id}/', json=create_task_data([2], True), headers={**header, 'If-Match': etag})
+        
+        assert response.status_code == 412
+        assert client.get(f'/tasks/{task.id}/', headers=header).json().get('tags')[0].get('id') == 1
+    
+    def test_delete_task_if_match(self, client: TestClient, token_header, create_user, create_task):
+        user: User = create_user()
+        task: Task = create_task(user.id)
+        task_id = task.id
+        header = token_header(user.username)
+        
+        etag = client.get(f'/tasks/{task_id}/', headers=header).headers.get('ETag')
+        client.put(f'/tasks/{task_id}/', json=create_task_data([], True), headers=header)
+        
+        response = client.delete(f'/tasks/{task_id}/', headers={**header, 'If-Match': etag})
+        assert response.status_code == 412
+        
+        etag = client.get(f'/tasks/{task_id}/', headers=header).headers.get('ETag')
+        response = client.delete(f'/tasks/{task_id}/', headers={**header, 'If-Match': etag})
         assert response.status_code == 204
\ No newline at end of file
@@ -3,7 +3,8 @@ from fastapi import UploadFile
 
 from tests.fixtures.auth import *
 from tests.fixtures.generals import *
-from app.core.models import Role
+from app.core.models import Role, Difficulty, Priority
+from app.services import TaskStatsService
 
 
 class TestUserGet:
@@ -27,6 +28,60 @@ class TestUserGet:
         assert response.status_code == 200
         assert len(response.json().get('items')) == 1
 
+    def test_list_users_constant_queries(self, client: TestClient, token_header, create_user, create_task, link_tags, count_queries):
+        header = token_header('admin')
+        client.get('/users/', headers=header)
+        
+        def list_users(count: int):
+            for _ in range(count):
+                user: User = create_user()
+                link_tags(create_task(user.id).id, [1, 2])
+            
+            with count_queries() as statements:
+                response = client.get('/users/', headers=header)
+            
+            assert response.status_code == 200
+            assert all(len(task.get('tags')) == 2 for user in response.json().get('items') for task in user.get('tasks'))
+            return len(statements)
+        
+        assert list_users(2) == list_users(3)
+        
+    def test_list_users_sparse_fields(self, client: TestClient, token_header, create_user, create_task, count_queries):
+        user: User = create_user()
+        create_task(user.id)
+        header = token_header('admin')
+        
+        with count_queries() as statements:
+            response = client.get('/users/?fields=username&include=role', headers=header)
+        
+        assert response.status_code == 200
+        assert all(set(item) == {'id', 'username', 'role'} for item in response.json().get('items'))
+        page_query = next(statement for statement in statements if 'LIMIT' in statement)
+        assert 'users.email' not in page_query
+        assert not any('FROM tasks' in statement for statement in statements)
+        
+    def test_list_users_fail_unknown_field(self, client: TestClient, token_header):
+        header = token_header('admin')
+        
+        response = client.get('/users/?fields=password', headers=header)
+        
+        assert response.status_code == 400
+        
+    def test_list_users_cursor_success(self, client: TestClient, token_header, create_user):
+        for _ in range(4):
+            create_user()
+        header = token_header('admin')
+        
+        ids, cursor = [], None
+        for _ in range(3):
+            response = client.get('/users/cursor/?size=2' + (f'&cursor={cursor}' if cursor else ''), headers=header)
+            assert response.status_code == 200
+            ids += [item.get('id') for item in response.json().get('items')]
+            cursor = response.json().get('next_cursor')
+        
+        assert ids == [1, 2, 3, 4, 5]
+        assert cursor is None
+        
     def test_list_users_fail_no_auth(self, client: TestClient):
         response = client.get('/users/')
 
@@ -41,6 +96,33 @@ class TestUserGet:
         
         assert response.status_code == 200
         assert response.json().get('username') == user.username
+    
+    def test_get_user_role(self, client: TestClient, token_header, create_user):
+        user: User = create_user()
+        
+        me = client.get('/users/me/', headers=token_header(user.username)).json()
+        users = client.get('/users/', headers=token_header('admin')).json().get('items')
+        
+        assert me.get('role') == {'id': Role.USER, 'name': '一般使用者'}
+        assert [item.get('role') for item in users] == [{'id': Role.ADMIN, 'name': '管理員'}, {'id': Role.USER, 'name': '一般使用者'}]
+    
+    def test_get_user_me_not_modified(self, client: TestClient, token_header, create_user, count_queries):
+        user: User = create_user()
+        header = token_header(user.username)
+        
+        etag = client.get('/users/me/', headers=header).headers.get('ETag')
+        with count_queries() as statements:
+            response = client.get('/users/me/', headers={**header, 'If-None-Match': etag})
+        
+        assert response.status_code == 304
+        assert [statement.split()[0] for statement in statements] == ['SELECT']
+        
+        # 任務的寫入遞增 collection_version
+        client.post('/tasks/', json=create_task_data([], True), headers=header)
+        response = client.get('/users/me/', headers={**header, 'If-None-Match': etag})
+        
+        assert response.status_code == 200
+        assert len(response.json().get('tasks')) == 1
         
     def test_get_user_me_fail_no_auth(self, client: TestClient):
         response = client.get('/users/me/')
@@ -142,4 +224,86 @@ class TestUserDelete:
         header = token_header('admin')
         response = client.delete(f'/users/5/', headers=header)
         
-        assert response.status_code == 404
\ No newline at end of file
+        assert response.status_code == 404
+
+
+class TestUserStats:
+    def test_get_stats_tracks_task_writes(self, client: TestClient, db: Session, token_header, create_user):
+        user: User = create_user()
+        header = token_header(user.username)
+        
+        def post_task(**values):
+            data = create_task_data([1], json_format=True)
+            data.update(values)
+            return client.post('/tasks/', json=data, headers=header).json()
+        
+        high = post_task(priority='HIGH', deadline=datetime.now().isoformat())
+        hard = post_task(difficulty='HARD')
+        done = post_task(is_completed=True)
+        removed = post_task()
+        client.put(f'/tasks/{hard.get("id")}/', json={**create_task_data([1], json_format=True), 'difficulty': 'HARD', 'is_completed': True}, headers=header)
+        client.patch('/tasks/bulk/', json={'ids': [done.get('id')], 'values': {'is_completed': False, 'priority': 'LOW'}}, headers=header)
+        client.delete(f'/tasks/{removed.get("id")}/', headers=header)
+        client.request('DELETE', '/tasks/bulk/', params={'ids': [high.get('id')]}, headers=header)
+        post_task(priority='HIGH', deadline=datetime.now().isoformat())
+        
+        response = client.get('/users/me/stats/', headers=header)
+        
+        assert response.status_code == 200
+        assert response.json() == {
+            'total': 3,
+            'open': 2,
+            'completed': 1,
+            'due_this_week': 1,
+            'by_priority': {
+                'LOW': {'open': 1, 'completed': 0},
+                'MEDIUM': {'open': 0, 'completed': 1},
+                'HIGH': {'open': 1, 'completed': 0}
+            },
+            'by_difficulty': {
+                'EASY': {'open': 0, 'completed': 0},
+                'MEDIUM': {'open': 2, 'completed': 0},
+                'HARD': {'open': 0, 'completed': 1}
+            }
+        }
+        assert TaskStatsService.rebuild(db, [user.id], fix=False) == []
+    
+    def test_get_stats_constant_queries(self, client: TestClient, token_header, create_user, count_queries):
+        user: User = create_user()
+        header = token_header(user.username)
+        client.get('/users/me/stats/', headers=header)
+        
+        def get_stats(count: int):
+            for _ in range(count):
+                client.post('/tasks/', json=create_task_data([1], json_format=True), headers=header)
+            
+            with count_queries() as statements:
+                response = client.get('/users/me/stats/', headers=header)
+            assert response.status_code == 200
+            return len(statements)
+        
+        assert get_stats(1) == get_stats(10) == 2
+    
+    def test_get_stats_fail_no_auth(self, client: TestClient):
+        response = client.get('/users/me/stats/')
+        
+        assert response.status_code == 401
+    
+    def test_rebuild_reports_and_repairs_drift(self, db: Session, create_user, create_task):
+        user: User = create_user()
+        # 直接寫入資料庫的任務不會更新統計
+        create_task(user.id)
+        create_task(user.id)
+        
+        drift = TaskStatsService.rebuild(db, fix=False)
+        
+        assert drift == [{
+            'user_id': user.id,
+            'is_completed': False,
+            'priority': Priority.MEDIUM,
+            'difficulty': Difficulty.MEDIUM,
+            'expected': 2,
+            'actual': 0
+        }]
+        assert TaskStatsService.rebuild(db) == drift
+        assert TaskStatsService.rebuild(db, fix=False) == []